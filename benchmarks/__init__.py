@@ -0,0 +1 @@
+"""Performance benchmarks for the nanobot hot path (not shipped in the wheel)."""
@@ -0,0 +1,235 @@
+"""
+End-to-end AgentLoop benchmark: mock channel -> bus -> agent -> bus -> mock channel.
+
+Usage:
+    python -m benchmarks.agent_loop --sessions 50 --messages 10 --output bench.json
+    python -m benchmarks.agent_loop --compare baseline.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from unittest import mock
+
+from benchmarks.mocks import MockChannel, MockProvider
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.manager import ChannelManager
+from nanobot.config.schema import Config
+from nanobot.session.manager import Session, SessionManager
+
+
+class TimedSessionManager(SessionManager):
+    """SessionManager that keeps its files in a scratch dir and times disk I/O."""
+
+    def __init__(self, workspace: Path, sessions_dir: Path):
+        super().__init__(workspace)
+        self.sessions_dir = sessions_dir
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        self.save_times: list[float] = []
+        self.load_times: list[float] = []
+
+    def save(self, session: Session) -> None:
+        start = time.perf_counter()
+        super().save(session)
+        self.save_times.append(time.perf_counter() - start)
+
+    def _load(self, key: str) -> Session | None:
+        start = time.perf_counter()
+        try:
+            return super()._load(key)
+        finally:
+            self.load_times.append(time.perf_counter() - start)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+async def run_benchmark(
+    sessions: int = 20,
+    messages: int = 5,
+    latency_s: float = 0.0,
+    memory_window: int = 50,
+    workdir: Path | None = None,
+) -> dict[str, Any]:
+    """Run one benchmark pass and return machine-readable results."""
+    # HOME points into the scratch dir so media and caches stay out of the real ~/.nanobot
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp, mock.patch.dict(os.environ, {"HOME": tmp}):
+        root = Path(tmp)
+        workspace = root / "workspace"
+        workspace.mkdir()
+
+        bus = MessageBus()
+        provider = MockProvider(latency_s=latency_s)
+        session_manager = TimedSessionManager(workspace, root / "sessions")
+        agent = AgentLoop(
+            bus=bus,
+            provider=provider,
+            workspace=workspace,
+            memory_window=memory_window,
+            session_manager=session_manager,
+        )
+        channels = ChannelManager(Config(), bus)
+        channel = MockChannel(bus)
+        channels.channels[channel.name] = channel
+
+        total = sessions * messages
+        channel.expect(total)
+
+        tracemalloc.start()
+        mem_start, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+
+        agent_task = asyncio.create_task(agent.run())
+        channels_task = asyncio.create_task(channels.start_all())
+
+        # Interleave sessions: round-robin one message per chat at a time
+        for i in range(messages):
+            for s in range(sessions):
+                await channel.inject(f"chat{s}", f"benchmark message {i} from chat {s}")
+
+        await channel.wait_all(timeout=max(60.0, total * (latency_s * 4 + 0.5)))
+        duration = time.perf_counter() - start
+        mem_end, mem_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        agent.stop()
+        await channels.stop_all()
+        await asyncio.gather(agent_task, channels_task, return_exceptions=True)
+        # Let in-flight consolidations settle before the workspace is removed
+        await asyncio.wait_for(agent.drain(), timeout=5.0)
+
+        # Pair the k-th reply of each chat with its k-th request
+        replies: dict[str, list[float]] = {}
+        for msg in channel.received:
+            replies.setdefault(msg.chat_id, []).append(msg.metadata["_received_at"])
+        latencies = [
+            got - sent
+            for chat_id, sent_times in channel.sent_at.items()
+            for sent, got in zip(sent_times, replies.get(chat_id, []))
+        ]
+
+        session_bytes = sum(p.stat().st_size for p in session_manager.sessions_dir.glob("*.jsonl"))
+        saves = session_manager.save_times
+
+        return {
+            "benchmark": "agent_loop",
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {
+                "sessions": sessions,
+                "messages_per_session": messages,
+                "llm_latency_s": latency_s,
+                "memory_window": memory_window,
+            },
+            "results": {
+                "messages": len(channel.received),
+                "duration_s": round(duration, 4),
+                "throughput_msgs_per_s": round(len(channel.received) / duration, 2) if duration else 0.0,
+                "latency_ms": {
+                    "mean": _ms(statistics.fmean(latencies)) if latencies else 0.0,
+                    "p50": _ms(_percentile(latencies, 50)),
+                    "p90": _ms(_percentile(latencies, 90)),
+                    "p99": _ms(_percentile(latencies, 99)),
+                    "max": _ms(max(latencies, default=0.0)),
+                },
+                "memory_kb": {
+                    "start": round(mem_start / 1024, 1),
+                    "end": round(mem_end / 1024, 1),
+                    "peak": round(mem_peak / 1024, 1),
+                    "growth": round((mem_end - mem_start) / 1024, 1),
+                },
+                "session_io": {
+                    "saves": len(saves),
+                    "save_total_ms": _ms(sum(saves)),
+                    "save_mean_ms": _ms(statistics.fmean(saves)) if saves else 0.0,
+                    "save_p99_ms": _ms(_percentile(saves, 99)),
+                    "loads": len(session_manager.load_times),
+                    "load_total_ms": _ms(sum(session_manager.load_times)),
+                    "bytes_on_disk": session_bytes,
+                },
+                "llm": {
+                    "calls": provider.calls,
+                    "prompt_tokens": provider.prompt_tokens,
+                    "completion_tokens": provider.total_completion_tokens,
+                },
+            },
+        }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Return human-readable regressions of current vs. baseline beyond tolerance."""
+    regressions = []
+    cur, base = current["results"], baseline["results"]
+
+    if cur["throughput_msgs_per_s"] < base["throughput_msgs_per_s"] * (1 - tolerance):
+        regressions.append(
+            f"throughput {cur['throughput_msgs_per_s']} < baseline {base['throughput_msgs_per_s']}"
+        )
+    for key in ("p50", "p99"):
+        if cur["latency_ms"][key] > base["latency_ms"][key] * (1 + tolerance):
+            regressions.append(f"latency {key} {cur['latency_ms'][key]}ms > baseline {base['latency_ms'][key]}ms")
+    if cur["session_io"]["save_mean_ms"] > base["session_io"]["save_mean_ms"] * (1 + tolerance):
+        regressions.append(
+            f"session save {cur['session_io']['save_mean_ms']}ms > baseline {base['session_io']['save_mean_ms']}ms"
+        )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the AgentLoop hot path with a mock LLM.")
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent chat sessions")
+    parser.add_argument("--messages", type=int, default=5, help="Messages per session")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock LLM latency per call (seconds)")
+    parser.add_argument("--memory-window", type=int, default=50, help="AgentLoop memory_window")
+    parser.add_argument("--output", type=Path, help="Write JSON results to this file")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    from loguru import logger
+    logger.disable("nanobot")
+
+    result = asyncio.run(run_benchmark(
+        sessions=args.sessions,
+        messages=args.messages,
+        latency_s=args.latency,
+        memory_window=args.memory_window,
+    ))
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(result, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION: {r}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
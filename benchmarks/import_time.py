@@ -0,0 +1,104 @@
+"""
+Import-time benchmark for CLI startup paths.
+
+Each target is imported in a fresh interpreter (best of --repeat runs) and we
+record wall time plus which heavy optional modules got loaded along the way.
+
+Usage:
+    python -m benchmarks.import_time --output imports.json
+    python -m benchmarks.import_time --strict   # exit 1 if a heavy module leaks in
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+# Modules each startup path imports (roughly what the CLI command touches)
+TARGETS: dict[str, list[str]] = {
+    "cli": ["nanobot.cli.commands"],
+    "cron_list": ["nanobot.cli.commands", "nanobot.config.loader", "nanobot.cron.service"],
+    "agent": ["nanobot.cli.commands", "nanobot.agent.loop", "nanobot.providers.litellm_provider"],
+    "gateway": [
+        "nanobot.cli.commands", "nanobot.agent.loop", "nanobot.channels.manager",
+        "nanobot.providers.litellm_provider", "nanobot.cron.service", "nanobot.heartbeat.service",
+    ],
+}
+
+# Heavy modules that no startup path should import eagerly
+HEAVY_MODULES = ("litellm", "telegram", "lark_oapi", "slack_sdk", "dingtalk_stream", "botpy", "socketio")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(modules: list[str], repeat: int = 3) -> dict[str, Any]:
+    """Import modules in fresh interpreters; return best wall time and leaked heavy modules."""
+    best: float | None = None
+    loaded: list[str] = []
+    code = _PROBE.format(modules=modules, heavy=HEAVY_MODULES)
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True, text=True, check=True,
+        )
+        data = json.loads(proc.stdout.strip().splitlines()[-1])
+        best = data["seconds"] if best is None else min(best, data["seconds"])
+        loaded = data["loaded"]
+    return {"modules": modules, "best_ms": round((best or 0.0) * 1000, 1), "heavy_loaded": loaded}
+
+
+def top_imports(module: str, limit: int = 15) -> list[dict[str, Any]]:
+    """Slowest imports (cumulative µs) for one module according to -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = line.split(":", 1)[1].split("|")
+            rows.append({"module": name.strip(), "cumulative_us": int(cumulative)})
+        except ValueError:
+            continue  # header line
+    return sorted(rows, key=lambda r: r["cumulative_us"], reverse=True)[:limit]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure CLI import/startup time.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per target (best is kept)")
+    parser.add_argument("--output", type=Path, help="Write JSON results to this file")
+    parser.add_argument("--strict", action="store_true", help="Exit 1 if a heavy module is imported eagerly")
+    args = parser.parse_args(argv)
+
+    results = {
+        "benchmark": "import_time",
+        "python": sys.version.split()[0],
+        "targets": {name: measure(mods, args.repeat) for name, mods in TARGETS.items()},
+        "slowest_cli_imports": top_imports("nanobot.cli.commands"),
+    }
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+    leaks = {name: r["heavy_loaded"] for name, r in results["targets"].items() if r["heavy_loaded"]}
+    if args.strict and leaks:
+        print(f"Heavy modules imported at startup: {leaks}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
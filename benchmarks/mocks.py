@@ -0,0 +1,133 @@
+"""Deterministic mock provider and channel for driving AgentLoop in benchmarks."""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from nanobot.bus.events import OutboundMessage
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.base import BaseChannel
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+
+
+@dataclass
+class ScriptStep:
+    """One scripted LLM turn: either tool calls or a final text reply."""
+    content: str | None = None
+    tool_calls: list[tuple[str, dict[str, Any]]] = field(default_factory=list)
+
+
+# Default script: one cheap tool round-trip, then a final answer.
+DEFAULT_SCRIPT = (
+    ScriptStep(tool_calls=[("list_dir", {"path": "."})]),
+    ScriptStep(content="Done. Here is a short benchmark reply."),
+)
+
+
+class MockProvider(LLMProvider):
+    """
+    LLMProvider that replays a fixed script with configurable latency.
+
+    The step within a turn is derived from the number of assistant tool-call
+    messages already present, so concurrent sessions stay deterministic.
+    Memory-consolidation prompts get a small valid JSON response.
+    """
+
+    def __init__(
+        self,
+        script: tuple[ScriptStep, ...] | list[ScriptStep] = DEFAULT_SCRIPT,
+        latency_s: float = 0.0,
+        completion_tokens: int = 32,
+        chars_per_token: int = 4,
+    ):
+        super().__init__(api_key="mock", api_base=None)
+        self.script = list(script)
+        self.latency_s = latency_s
+        self.completion_tokens = completion_tokens
+        self.chars_per_token = chars_per_token
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.total_completion_tokens = 0
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+
+        self.calls += 1
+        prompt_chars = sum(len(json.dumps(m.get("content", ""))) for m in messages)
+        usage = {
+            "prompt_tokens": prompt_chars // self.chars_per_token,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": prompt_chars // self.chars_per_token + self.completion_tokens,
+        }
+        self.prompt_tokens += usage["prompt_tokens"]
+        self.total_completion_tokens += usage["completion_tokens"]
+
+        system = messages[0].get("content", "") if messages else ""
+        if isinstance(system, str) and "memory consolidation agent" in system:
+            content = json.dumps({
+                "history_entry": "[2026-01-01 00:00] Benchmark conversation summarized.",
+                "memory_patch": [{"op": "add", "section": "Benchmark", "text": "- Benchmark facts."}],
+            })
+            return LLMResponse(content=content, usage=usage)
+
+        step_index = sum(1 for m in messages if m.get("tool_calls"))
+        step = self.script[min(step_index, len(self.script) - 1)]
+        if step.tool_calls and tools:
+            calls = [
+                ToolCallRequest(id=f"call_{step_index}_{i}", name=name, arguments=args)
+                for i, (name, args) in enumerate(step.tool_calls)
+            ]
+            return LLMResponse(content=step.content, tool_calls=calls, usage=usage)
+        return LLMResponse(content=step.content or "ok", usage=usage)
+
+    def get_default_model(self) -> str:
+        return "mock/benchmark"
+
+
+class MockChannel(BaseChannel):
+    """Channel that injects synthetic inbound messages and timestamps replies."""
+
+    name = "mock"
+
+    def __init__(self, bus: MessageBus):
+        super().__init__(config=None, bus=bus)
+        self.sent_at: dict[str, list[float]] = {}
+        self.received: list[OutboundMessage] = []
+        self._done = asyncio.Event()
+        self._expected = 0
+
+    async def start(self) -> None:
+        self._running = True
+        await self._done.wait()
+
+    async def stop(self) -> None:
+        self._running = False
+        self._done.set()
+
+    def expect(self, count: int) -> None:
+        """Set the number of replies after which wait_all() returns."""
+        self._expected = count
+
+    async def inject(self, chat_id: str, content: str) -> None:
+        """Publish a user message for chat_id and record the send time."""
+        self.sent_at.setdefault(chat_id, []).append(time.perf_counter())
+        await self._handle_message(sender_id=f"user-{chat_id}", chat_id=chat_id, content=content)
+
+    async def send(self, msg: OutboundMessage) -> None:
+        msg.metadata["_received_at"] = time.perf_counter()
+        self.received.append(msg)
+        if self._expected and len(self.received) >= self._expected:
+            self._done.set()
+
+    async def wait_all(self, timeout: float | None = None) -> None:
+        await asyncio.wait_for(self._done.wait(), timeout=timeout)
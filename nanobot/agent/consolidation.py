@@ -0,0 +1,122 @@
+"""Background scheduler for memory consolidation jobs."""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+
+from loguru import logger
+
+ConsolidationJob = Callable[[], Awaitable[None]]
+
+
+class ConsolidationScheduler:
+    """
+    Runs memory consolidation in the background without piling up work.
+
+    - Per session key, jobs run one at a time. A trigger that arrives while a
+      job is queued or running is coalesced into a single follow-up run.
+      Jobs that span several sessions (batched consolidation) take those
+      sessions' keys with hold(), so they never overlap per-session jobs.
+    - A global semaphore caps how many jobs run at once across sessions.
+    - Jobs are low priority: before taking a slot they wait (up to max_defer
+      seconds) until no interactive turn is in progress.
+    """
+
+    def __init__(self, max_concurrent: int = 1, max_defer: float = 30.0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_defer = max_defer
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._queues: dict[str, deque[tuple[ConsolidationJob, bool]]] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+        self._running = 0
+        self._busy: set[str] = set()
+        self._released = asyncio.Condition()
+        self._active_turns = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def backlog(self) -> int:
+        """Number of jobs queued or running."""
+        return self._running + sum(len(q) for q in self._queues.values())
+
+    def submit(self, key: str, job: ConsolidationJob, coalesce: bool = True) -> None:
+        """
+        Queue a consolidation job for a session.
+
+        Args:
+            key: Session key; jobs with the same key never overlap.
+            job: Zero-argument factory returning the coroutine to run.
+            coalesce: If True, replace a still-queued coalescable job for this
+                key instead of adding another run. Use False for jobs that
+                carry their own data (e.g. archiving a cleared session).
+        """
+        queue = self._queues.setdefault(key, deque())
+        if coalesce and queue and queue[-1][1]:
+            queue[-1] = (job, True)
+            logger.debug(f"Consolidation for {key} coalesced with pending run")
+        else:
+            queue.append((job, coalesce))
+
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._drain(key))
+
+    @contextmanager
+    def interactive(self) -> Iterator[None]:
+        """Mark an interactive turn in progress; queued jobs wait for it to end."""
+        self._active_turns += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._active_turns -= 1
+            if self._active_turns == 0:
+                self._idle.set()
+
+    @asynccontextmanager
+    async def hold(self, keys: Iterable[str]) -> AsyncIterator[None]:
+        """Wait until none of these session keys has a job running, then keep them busy."""
+        keys = set(keys)
+        # All keys are taken at once, so jobs holding overlapping sets cannot deadlock
+        async with self._released:
+            await self._released.wait_for(lambda: not keys & self._busy)
+            self._busy |= keys
+        try:
+            yield
+        finally:
+            async with self._released:
+                self._busy -= keys
+                self._released.notify_all()
+
+    async def join(self) -> None:
+        """Wait until every queued job has finished."""
+        while self._workers:
+            await asyncio.gather(*self._workers.values(), return_exceptions=True)
+
+    async def _drain(self, key: str) -> None:
+        queue = self._queues[key]
+        try:
+            while queue:
+                await self._wait_idle()
+                async with self._slots, self.hold([key]):
+                    # Pop only once a slot is held so triggers keep coalescing while we wait
+                    job, _ = queue.popleft()
+                    self._running += 1
+                    try:
+                        await job()
+                    except Exception as e:
+                        logger.error(f"Memory consolidation for {key} failed: {e}")
+                    finally:
+                        self._running -= 1
+        finally:
+            self._queues.pop(key, None)
+            self._workers.pop(key, None)
+
+    async def _wait_idle(self) -> None:
+        if self._idle.is_set():
+            return
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=self.max_defer)
+        except asyncio.TimeoutError:
+            logger.debug("Consolidation deferred past max_defer; running alongside active turn")
@@ -1,13 +1,17 @@
 """Context builder for assembling agent prompts."""
 
-import base64
-import mimetypes
 import platform
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
+from nanobot.agent.images import ImageEncoder
 from nanobot.agent.memory import MemoryStore
 from nanobot.agent.skills import SkillsLoader
+from nanobot.agent.vector_memory import make_embedder
+from nanobot.utils.helpers import get_data_path
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import MemoryConfig
 
 
 class ContextBuilder:
@@ -20,17 +24,35 @@ class ContextBuilder:
     
     BOOTSTRAP_FILES = ["AGENTS.md", "SOUL.md", "USER.md", "TOOLS.md", "IDENTITY.md"]
     
-    def __init__(self, workspace: Path):
+    def __init__(
+        self,
+        workspace: Path,
+        memory_config: "MemoryConfig | None" = None,
+        image_cache_dir: Path | None = None,
+    ):
         self.workspace = workspace
-        self.memory = MemoryStore(workspace)
+        self.images = ImageEncoder(image_cache_dir or get_data_path() / "cache" / "images")
+        embedder = None
+        top_k = 8
+        if memory_config is not None and memory_config.mode == "retrieval":
+            embedder = make_embedder(memory_config.embedder)
+            top_k = memory_config.top_k
+        self.memory = MemoryStore(workspace, embedder=embedder, top_k=top_k)
         self.skills = SkillsLoader(workspace)
     
-    def build_system_prompt(self, skill_names: list[str] | None = None) -> str:
+    def build_system_prompt(
+        self,
+        skill_names: list[str] | None = None,
+        query: str | None = None,
+        memory_scope: str | None = None,
+    ) -> str:
         """
         Build the system prompt from bootstrap files, memory, and skills.
         
         Args:
             skill_names: Optional list of skills to include.
+            query: Current user message, used to retrieve relevant memory.
+            memory_scope: Session key whose memory namespace is added to the global one.
         
         Returns:
             Complete system prompt.
@@ -38,7 +60,7 @@ class ContextBuilder:
         parts = []
         
         # Core identity
-        parts.append(self._get_identity())
+        parts.append(self._get_identity(memory_scope))
         
         # Bootstrap files
         bootstrap = self._load_bootstrap_files()
@@ -46,7 +68,7 @@ class ContextBuilder:
             parts.append(bootstrap)
         
         # Memory context
-        memory = self.memory.get_memory_context()
+        memory = self.memory.get_memory_context(query, session_key=memory_scope)
         if memory:
             parts.append(f"# Memory\n\n{memory}")
         
@@ -70,8 +92,8 @@ Skills with available="false" need dependencies installed first - you can try in
         
         return "\n\n---\n\n".join(parts)
     
-    def _get_identity(self) -> str:
-        """Get the core identity section."""
+    def _get_identity(self, memory_scope: str | None = None) -> str:
+        """Get the core identity section (memory paths point at memory_scope's namespace)."""
         from datetime import datetime
         import time as _time
         now = datetime.now().strftime("%Y-%m-%d %H:%M (%A)")
@@ -79,11 +101,13 @@ Skills with available="false" need dependencies installed first - you can try in
         workspace_path = str(self.workspace.expanduser().resolve())
         system = platform.system()
         runtime = f"{'macOS' if system == 'Darwin' else system} {platform.machine()}, Python {platform.python_version()}"
+        memory_file = self.memory.session_memory_file(memory_scope).expanduser().resolve()
+        history_file = self.memory.session_history_file(memory_scope).expanduser().resolve()
         
         return f"""# nanobot 🐈
 
 You are nanobot, a helpful AI assistant. You have access to tools that allow you to:
-- Read, write, and edit files
+- Read, write, and edit files, and search the workspace
 - Execute shell commands
 - Search the web and fetch web pages
 - Send messages to users on chat channels
@@ -97,8 +121,8 @@ You are nanobot, a helpful AI assistant. You have access to tools that allow you
 
 ## Workspace
 Your workspace is at: {workspace_path}
-- Long-term memory: {workspace_path}/memory/MEMORY.md
-- History log: {workspace_path}/memory/HISTORY.md (grep-searchable)
+- Long-term memory: {memory_file}
+- History log: {history_file} (searchable with memory_search)
 - Custom skills: {workspace_path}/skills/{{skill-name}}/SKILL.md
 
 IMPORTANT: When responding to direct questions or conversations, reply directly with your text response.
@@ -106,8 +130,8 @@ Only use the 'message' tool when you need to send a message to a specific chat c
 For normal conversation, just respond with text - do not call the message tool.
 
 Always be helpful, accurate, and concise. When using tools, think step by step: what you know, what you need, and why you chose this tool.
-When remembering something important, write to {workspace_path}/memory/MEMORY.md
-To recall past events, grep {workspace_path}/memory/HISTORY.md"""
+When remembering something important, write to {memory_file}
+To recall past events, use the memory_search tool"""
     
     def _load_bootstrap_files(self) -> str:
         """Load all bootstrap files from workspace."""
@@ -129,6 +153,7 @@ To recall past events, grep {workspace_path}/memory/HISTORY.md"""
         media: list[str] | None = None,
         channel: str | None = None,
         chat_id: str | None = None,
+        memory_scope: str | None = None,
     ) -> list[dict[str, Any]]:
         """
         Build the complete message list for an LLM call.
@@ -140,6 +165,7 @@ To recall past events, grep {workspace_path}/memory/HISTORY.md"""
             media: Optional list of local file paths for images/media.
             channel: Current channel (telegram, feishu, etc.).
             chat_id: Current chat/user ID.
+            memory_scope: Session key for per-session memory (None = global memory only).
 
         Returns:
             List of messages including system prompt.
@@ -147,9 +173,16 @@ To recall past events, grep {workspace_path}/memory/HISTORY.md"""
         messages = []
 
         # System prompt
-        system_prompt = self.build_system_prompt(skill_names)
+        system_prompt = self.build_system_prompt(skill_names, query=current_message, memory_scope=memory_scope)
         if channel and chat_id:
             system_prompt += f"\n\n## Current Session\nChannel: {channel}\nChat ID: {chat_id}"
+        if memory_scope:
+            chat_memory = self.memory.session_memory_file(memory_scope)
+            system_prompt += (
+                f"\nChat memory: {chat_memory} (facts about this chat only; "
+                f"{self.memory.memory_file} is shared by all chats)"
+                f"\nChat history: {self.memory.session_history_file(memory_scope)}"
+            )
         messages.append({"role": "system", "content": system_prompt})
 
         # History
@@ -162,18 +195,15 @@ To recall past events, grep {workspace_path}/memory/HISTORY.md"""
         return messages
 
     def _build_user_content(self, text: str, media: list[str] | None) -> str | list[dict[str, Any]]:
-        """Build user message content with optional base64-encoded images."""
+        """Build user message content with optional base64-encoded (downscaled, cached) images."""
         if not media:
             return text
         
         images = []
         for path in media:
-            p = Path(path)
-            mime, _ = mimetypes.guess_type(path)
-            if not p.is_file() or not mime or not mime.startswith("image/"):
-                continue
-            b64 = base64.b64encode(p.read_bytes()).decode()
-            images.append({"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64}"}})
+            url = self.images.data_url(path)
+            if url:
+                images.append({"type": "image_url", "image_url": {"url": url}})
         
         if not images:
             return text
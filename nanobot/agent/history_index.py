@@ -0,0 +1,229 @@
+"""Full-text index over HISTORY.md entries (SQLite FTS5)."""
+
+import re
+import sqlite3
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+from loguru import logger
+
+_TIMESTAMP_RE = re.compile(r"^\[(\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2})?)")
+_PERIOD_RE = re.compile(r"^\[(\d{4})-(?:W(\d{2})|(\d{2}))\]")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_SCHEMA_VERSION = "3"
+
+
+def split_history_entries(text: str) -> list[str]:
+    """Split history text into entries (separated by blank lines)."""
+    return [entry.strip() for entry in text.split("\n\n") if entry.strip()]
+
+
+def entry_timestamp(entry: str) -> str:
+    """
+    Leading "[YYYY-MM-DD HH:MM]" of an entry, normalized; "" if absent.
+
+    Rollup summaries ("[YYYY-Www]", "[YYYY-MM]") map to the first day of
+    their week or month, so since/until filters still apply to them.
+    """
+    if m := _TIMESTAMP_RE.match(entry):
+        return m.group(1).replace("T", " ")
+    if m := _PERIOD_RE.match(entry):
+        year, week, month = m.groups()
+        try:
+            if week:
+                return date.fromisocalendar(int(year), int(week), 1).isoformat()
+            return date(int(year), int(month), 1).isoformat()
+        except ValueError:
+            return ""
+    return ""
+
+
+@dataclass(frozen=True)
+class HistoryHit:
+    """One matching history entry."""
+    timestamp: str
+    text: str
+    score: float
+    source: str = "HISTORY.md"
+
+
+class HistoryIndex:
+    """
+    Incrementally maintained inverted index of HISTORY.md (and its archives).
+
+    The files stay the source of truth. For each file the index remembers how
+    many bytes were indexed and only parses what was appended since; if a file
+    shrank or was rewritten, its entries are re-indexed from scratch. Falls
+    back to LIKE queries when the SQLite build lacks FTS5.
+    """
+
+    def __init__(self, history_file: Path, db_path: Path, archive_dir: Path | None = None):
+        self.history_file = history_file
+        self.db_path = db_path
+        self.archive_dir = archive_dir
+        self._conn: sqlite3.Connection | None = None
+        self._fts = True
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if row is None or row[0] != _SCHEMA_VERSION:
+            for table in ("entries_fts", "entries"):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute("DELETE FROM meta")
+            conn.execute("INSERT INTO meta (key, value) VALUES ('schema', ?)", (_SCHEMA_VERSION,))
+        conn.execute("CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY, source TEXT, ts TEXT, body TEXT)")
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_ts ON entries (ts)")
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_source ON entries (source)")
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5("
+                "body, content='entries', content_rowid='id', tokenize='unicode61')"
+            )
+        except sqlite3.OperationalError:
+            logger.warning("SQLite FTS5 unavailable; memory_search falls back to substring matching")
+            self._fts = False
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _get_meta(self, key: str, default: str = "") -> str:
+        row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._connect().execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _sources(self) -> dict[str, Path]:
+        sources = {"HISTORY.md": self.history_file}
+        if self.archive_dir is not None and self.archive_dir.is_dir():
+            root = self.history_file.parent
+            for path in sorted(self.archive_dir.glob("*.md")):
+                sources[path.relative_to(root).as_posix()] = path
+        return sources
+
+    def sync(self) -> int:
+        """Index entries appended since the last sync. Returns entries added."""
+        conn = self._connect()
+        sources = self._sources()
+        added = 0
+        for source, path in sources.items():
+            added += self._sync_file(source, path)
+        # Forget archives that were deleted
+        for (source,) in conn.execute("SELECT DISTINCT source FROM entries").fetchall():
+            if source not in sources:
+                self._reset(source)
+        conn.commit()
+        return added
+
+    def _sync_file(self, source: str, path: Path) -> int:
+        if not path.exists():
+            if self._get_meta(f"offset:{source}", "0") != "0":
+                self._reset(source)
+            return 0
+
+        size = path.stat().st_size
+        offset = int(self._get_meta(f"offset:{source}", "0"))
+        with open(path, "rb") as f:
+            head = f.read(256)
+            # A shrunk file or a changed prefix means the file was rewritten
+            if size < offset or not head.startswith(bytes.fromhex(self._get_meta(f"head:{source}"))):
+                self._reset(source)
+                offset = 0
+            if size == offset:
+                return 0
+            f.seek(offset)
+            chunk = f.read()
+
+        # Only index complete entries (terminated by a blank line)
+        end = chunk.rfind(b"\n\n")
+        if end < 0:
+            return 0
+        complete = chunk[: end + 2]
+        entries = split_history_entries(complete.decode("utf-8", errors="replace"))
+        for body in entries:
+            self._insert(source, body)
+        self._set_meta(f"offset:{source}", str(offset + len(complete)))
+        self._set_meta(f"head:{source}", head.hex())
+        return len(entries)
+
+    def _reset(self, source: str) -> None:
+        conn = self._connect()
+        if self._fts:
+            conn.execute(
+                "INSERT INTO entries_fts (entries_fts, rowid, body) "
+                "SELECT 'delete', id, body FROM entries WHERE source = ?",
+                (source,),
+            )
+        conn.execute("DELETE FROM entries WHERE source = ?", (source,))
+        conn.execute("DELETE FROM meta WHERE key IN (?, ?)", (f"offset:{source}", f"head:{source}"))
+
+    def _insert(self, source: str, body: str) -> None:
+        conn = self._connect()
+        cur = conn.execute(
+            "INSERT INTO entries (source, ts, body) VALUES (?, ?, ?)", (source, entry_timestamp(body), body)
+        )
+        if self._fts:
+            conn.execute("INSERT INTO entries_fts (rowid, body) VALUES (?, ?)", (cur.lastrowid, body))
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        since: str | None = None,
+        until: str | None = None,
+    ) -> list[HistoryHit]:
+        """
+        Ranked search over history entries.
+
+        Args:
+            query: Free-text keywords; entries matching more/rarer terms rank higher.
+            limit: Maximum number of hits.
+            since: Only entries on or after this date (YYYY-MM-DD[ HH:MM]).
+            until: Only entries on or before this date (YYYY-MM-DD[ HH:MM]).
+        """
+        self.sync()
+        terms = _TOKEN_RE.findall(query.lower())
+        if not terms:
+            return []
+
+        filters, params = [], []
+        if since:
+            filters.append("e.ts >= ?")
+            params.append(since)
+        if until:
+            filters.append("e.ts <= ?")
+            # Date-only bound includes the whole day
+            params.append(until if len(until) > 10 else until + " 99:99")
+        where = "".join(f" AND {f}" for f in filters)
+
+        conn = self._connect()
+        if self._fts:
+            match = " OR ".join(f'"{t}"' for t in terms)
+            rows = conn.execute(
+                "SELECT e.ts, e.body, bm25(entries_fts) AS rank, e.source FROM entries_fts "
+                f"JOIN entries e ON e.id = entries_fts.rowid WHERE entries_fts MATCH ?{where} "
+                "ORDER BY rank, e.id DESC LIMIT ?",
+                (match, *params, limit),
+            ).fetchall()
+            return [HistoryHit(ts, body, -rank, source) for ts, body, rank, source in rows]
+
+        like = " OR ".join("lower(e.body) LIKE ?" for _ in terms)
+        rows = conn.execute(
+            f"SELECT e.ts, e.body, e.source FROM entries e WHERE ({like}){where} ORDER BY e.id DESC",
+            (*(f"%{t}%" for t in terms), *params),
+        ).fetchall()
+        scored = [
+            HistoryHit(ts, body, float(sum(body.lower().count(t) for t in terms)), source)
+            for ts, body, source in rows
+        ]
+        return sorted(scored, key=lambda h: h.score, reverse=True)[:limit]
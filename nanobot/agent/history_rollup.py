@@ -0,0 +1,201 @@
+"""Hierarchical rollup and rotation of HISTORY.md."""
+
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+from nanobot.agent.history_index import entry_timestamp, split_history_entries
+from nanobot.agent.memory import MemoryStore
+from nanobot.utils.helpers import atomic_write_text, ensure_dir, file_lock
+
+_WEEK_RE = re.compile(r"^\[(\d{4})-W(\d{2})\]")
+_MONTH_RE = re.compile(r"^\[\d{4}-\d{2}\]")
+
+# (level, period, entries) -> summary paragraph, or None to skip this group
+Summarizer = Callable[[str, str, list[str]], Awaitable[str | None]]
+
+
+@dataclass
+class RollupGroup:
+    """Entries that collapse into one summary."""
+    level: str  # "week" or "month"
+    period: str  # "2026-W03" or "2026-01"
+    entries: list[str] = field(default_factory=list)
+    archives: dict[str, list[str]] = field(default_factory=dict)  # archive month -> entries
+
+
+class HistoryRollup:
+    """
+    Compresses old HISTORY.md entries so the working file stays small.
+
+    - Dated entries from ISO weeks that ended more than keep_days ago are
+      replaced by one "[YYYY-Www]" weekly summary.
+    - Weekly summaries from months that ended more than keep_weeks ago are
+      replaced by one "[YYYY-MM]" monthly summary.
+    - Everything rolled up is moved verbatim to memory/archive/YYYY-MM.md, and
+      memory/archive/manifest.json records each rollup, so memory_search and
+      the agent can still reach archived detail.
+
+    Summaries are journaled to memory/archive/rollup.pending.json before any
+    file is touched; archiving and the HISTORY.md rewrite are idempotent, so
+    an interrupted run is finished by the next one without duplicates.
+
+    With a session_key, the same happens inside that session's namespace
+    (memory/sessions/<session>/HISTORY.md and its own archive/ directory).
+    """
+
+    def __init__(
+        self,
+        memory: MemoryStore,
+        summarize: Summarizer,
+        keep_days: int = 14,
+        keep_weeks: int = 8,
+        interval: timedelta = timedelta(hours=24),
+        session_key: str | None = None,
+    ):
+        self.memory = memory
+        self.summarize = summarize
+        self.keep_days = keep_days
+        self.keep_weeks = keep_weeks
+        self.interval = interval
+        self.session_key = session_key
+        self.history_file = memory.session_history_file(session_key)
+        self.archive_dir = memory.session_archive_dir(session_key)
+        self.manifest_file = self.archive_dir / "manifest.json"
+        self.pending_file = self.archive_dir / "rollup.pending.json"
+
+    def load_manifest(self) -> dict:
+        if self.manifest_file.exists():
+            try:
+                return json.loads(self.manifest_file.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                logger.warning(f"Ignoring corrupt rollup manifest: {self.manifest_file}")
+        return {"last_run": None, "rollups": []}
+
+    def due(self, now: datetime | None = None) -> bool:
+        """True if the last run is older than the rollup interval."""
+        last = self.load_manifest().get("last_run")
+        if not last:
+            return True
+        return (now or datetime.now()) - datetime.fromisoformat(last) >= self.interval
+
+    def plan(self, entries: list[str], today: date) -> list[RollupGroup]:
+        """Group entries that are old enough to roll up."""
+        day_cutoff = today - timedelta(days=self.keep_days)
+        month_cutoff = today - timedelta(weeks=self.keep_weeks)
+        groups: dict[tuple[str, str], RollupGroup] = {}
+
+        def add(level: str, period: str, archive: str, entry: str) -> None:
+            group = groups.setdefault((level, period), RollupGroup(level, period))
+            group.entries.append(entry)
+            group.archives.setdefault(archive, []).append(entry)
+
+        for entry in entries:
+            if m := _WEEK_RE.match(entry):
+                monday = date.fromisocalendar(int(m.group(1)), int(m.group(2)), 1)
+                if _month_end(monday) < month_cutoff:
+                    month = monday.strftime("%Y-%m")
+                    add("month", month, month, entry)
+            elif _MONTH_RE.match(entry):
+                continue  # Monthly summaries are final
+            elif ts := entry_timestamp(entry):
+                day = date.fromisoformat(ts[:10])
+                year, week, weekday = day.isocalendar()
+                if day + timedelta(days=7 - weekday) < day_cutoff:
+                    add("week", f"{year}-W{week:02d}", day.strftime("%Y-%m"), entry)
+
+        return list(groups.values())
+
+    async def run(self, now: datetime | None = None) -> int:
+        """Roll up old history. Returns the number of summaries written."""
+        now = now or datetime.now()
+        if self.pending_file.exists():
+            await self._recover()
+        text = self.history_file.read_text(encoding="utf-8") if self.history_file.exists() else ""
+        groups = self.plan(split_history_entries(text), now.date())
+
+        rollups = []
+        for group in groups:
+            summary = await self.summarize(group.level, group.period, group.entries)
+            if not summary or not summary.strip():
+                logger.warning(f"History rollup for {group.period} skipped: empty summary")
+                continue
+            files = [f"archive/{month}.md" for month in sorted(group.archives)]
+            label = "Weekly" if group.level == "week" else "Monthly"
+            rollups.append({
+                "entry": (
+                    f"[{group.period}] {label} summary of {len(group.entries)} entries "
+                    f"(detail: {', '.join(files)}). {summary.strip()}"
+                ),
+                "entries": group.entries,
+                "archives": group.archives,
+                "record": {
+                    "level": group.level,
+                    "period": group.period,
+                    "entries": len(group.entries),
+                    "files": files,
+                    "summary": summary.strip(),
+                    "created": now.isoformat(),
+                },
+            })
+
+        pending = {"last_run": now.isoformat(), "rollups": rollups}
+        ensure_dir(self.archive_dir)
+        if rollups:
+            atomic_write_text(self.pending_file, json.dumps(pending, ensure_ascii=False))
+        await self._commit(pending)
+        if rollups:
+            logger.info(f"History rollup: {len(rollups)} summaries written, "
+                        f"{sum(len(r['entries']) for r in rollups)} entries archived")
+        return len(rollups)
+
+    async def _recover(self) -> None:
+        """Finish a run that was interrupted after its summaries were journaled."""
+        try:
+            pending = json.loads(self.pending_file.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            logger.warning(f"Discarding unreadable rollup journal: {self.pending_file}")
+            self.pending_file.unlink(missing_ok=True)
+            return
+        logger.info(f"Completing interrupted history rollup ({len(pending['rollups'])} summaries)")
+        await self._commit(pending)
+
+    async def _commit(self, pending: dict) -> None:
+        """Apply a journaled run. Every step is safe to repeat."""
+        for rollup in pending["rollups"]:
+            await self._archive(rollup["archives"])
+        if pending["rollups"]:
+            await self._rewrite_history(pending["rollups"])
+        manifest = self.load_manifest()
+        for rollup in pending["rollups"]:
+            if rollup["record"] not in manifest["rollups"]:
+                manifest["rollups"].append(rollup["record"])
+        manifest["last_run"] = pending["last_run"]
+        atomic_write_text(self.manifest_file, json.dumps(manifest, indent=2, ensure_ascii=False) + "\n")
+        self.pending_file.unlink(missing_ok=True)
+
+    async def _archive(self, archives: dict[str, list[str]]) -> None:
+        for month, entries in sorted(archives.items()):
+            path = self.archive_dir / f"{month}.md"
+            async with file_lock(path):
+                existing = set(split_history_entries(path.read_text(encoding="utf-8"))) if path.exists() else set()
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("".join(e + "\n\n" for e in entries if e not in existing))
+
+    async def _rewrite_history(self, rollups: list[dict]) -> None:
+        replace = {r["entries"][0]: r["entry"] for r in rollups}
+        drop = {e for r in rollups for e in r["entries"][1:]}
+        history = self.history_file
+        async with file_lock(history):
+            # Re-read: entries may have been appended while we were summarizing
+            current = split_history_entries(history.read_text(encoding="utf-8")) if history.exists() else []
+            kept = [replace.get(e, e) for e in current if e not in drop]
+            atomic_write_text(history, "".join(e + "\n\n" for e in kept))
+
+
+def _month_end(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
@@ -0,0 +1,161 @@
+"""Image attachment pipeline: downscale, re-encode and cache by content hash."""
+
+import base64
+import hashlib
+import importlib.util
+import io
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from loguru import logger
+
+# Pillow is optional (the "images" extra) and imported on first use
+PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None
+_warned_no_pil = False
+
+# Vision models downscale anything larger than roughly this on their side anyway
+DEFAULT_MAX_EDGE = 1568
+_EXT_MIME = {".jpg": "image/jpeg", ".png": "image/png", ".gif": "image/gif", ".webp": "image/webp"}
+
+
+class ImageEncoder:
+    """
+    Turns local image files into data URLs sized for vision models.
+
+    Images are downscaled so the longest edge is at most max_edge, EXIF-rotated
+    and re-encoded (JPEG, or PNG when there is transparency); the result is
+    kept on disk keyed by a hash of the source bytes and encoding settings,
+    plus an in-memory memo keyed by path/size/mtime so repeated turns skip
+    both hashing and encoding. The disk cache is kept under max_cache_bytes
+    by evicting least-recently-used files. Without Pillow, the original bytes
+    are used. Safe to call from worker threads.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_edge: int = DEFAULT_MAX_EDGE,
+        quality: int = 85,
+        memo_size: int = 64,
+        max_cache_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.cache_dir = cache_dir
+        self.max_edge = max_edge
+        self.quality = quality
+        self.max_cache_bytes = max_cache_bytes
+        self._memo: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        self._memo_size = memo_size
+        self._lock = threading.Lock()
+        self._cache_total: int | None = None
+
+    def data_url(self, path: str | Path) -> str | None:
+        """Data URL for an image file, or None if it is not a readable image."""
+        p = Path(path)
+        mime, _ = mimetypes.guess_type(str(p))
+        if not p.is_file() or not mime or not mime.startswith("image/"):
+            return None
+
+        st = p.stat()
+        memo_key = (str(p.resolve()), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            if (url := self._memo.get(memo_key)) is not None:
+                self._memo.move_to_end(memo_key)
+                return url
+
+        raw = p.read_bytes()
+        mime, data = self._encode_cached(raw, mime)
+        url = f"data:{mime};base64,{base64.b64encode(data).decode()}"
+        with self._lock:
+            self._memo[memo_key] = url
+            if len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+        return url
+
+    def _encode_cached(self, raw: bytes, mime: str) -> tuple[str, bytes]:
+        global _warned_no_pil
+        if not PIL_AVAILABLE:
+            if not _warned_no_pil:
+                _warned_no_pil = True
+                logger.info("Pillow is not installed; images are sent without downscaling "
+                            "(pip install 'nanobot-ai[images]')")
+            return mime, raw
+        digest = hashlib.sha256(raw).hexdigest()
+        stem = f"{digest[:32]}-{self.max_edge}-{self.quality}"
+        for ext, cached_mime in _EXT_MIME.items():
+            cached = self.cache_dir / f"{stem}{ext}"
+            try:
+                data = cached.read_bytes()
+            except OSError:
+                continue
+            os.utime(cached)  # Mark as recently used for eviction
+            return cached_mime, data
+
+        try:
+            mime, data = self._encode(raw, mime)
+        except Exception as e:
+            logger.warning(f"Image re-encode failed, sending original: {e}")
+            return mime, raw
+
+        ext = next((e for e, m in _EXT_MIME.items() if m == mime), None)
+        if ext:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp = self.cache_dir / f".{stem}{ext}.tmp"
+                tmp.write_bytes(data)
+                tmp.replace(self.cache_dir / f"{stem}{ext}")
+                self._evict(len(data))
+            except OSError as e:
+                logger.debug(f"Image cache write failed: {e}")
+        return mime, data
+
+    def _evict(self, added: int) -> None:
+        """Drop least-recently-used cache files once the cache exceeds max_cache_bytes."""
+        with self._lock:
+            if self._cache_total is not None:
+                self._cache_total += added
+                if self._cache_total <= self.max_cache_bytes:
+                    return
+            files = []
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.startswith("."):
+                        files.append((entry.path, entry.stat()))
+            total = sum(st.st_size for _, st in files)
+            # Evict down to 90% of the limit so we do not evict on every write
+            target = int(self.max_cache_bytes * 0.9) if total > self.max_cache_bytes else total
+            for path, st in sorted(files, key=lambda item: item[1].st_mtime):
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                    total -= st.st_size
+                except OSError:
+                    pass
+            self._cache_total = total
+
+    def _encode(self, raw: bytes, mime: str) -> tuple[str, bytes]:
+        from PIL import Image, ImageOps
+
+        with Image.open(io.BytesIO(raw)) as img:
+            if getattr(img, "is_animated", False):
+                return mime, raw
+            img = ImageOps.exif_transpose(img)
+            resized = max(img.size) > self.max_edge
+            if resized:
+                img.thumbnail((self.max_edge, self.max_edge), Image.Resampling.LANCZOS)
+
+            out = io.BytesIO()
+            if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+                img.save(out, format="PNG", optimize=True)
+                new_mime = "image/png"
+            else:
+                img.convert("RGB").save(out, format="JPEG", quality=self.quality, optimize=True)
+                new_mime = "image/jpeg"
+
+        data = out.getvalue()
+        if not resized and len(data) >= len(raw):
+            return mime, raw
+        return new_mime, data
@@ -2,8 +2,9 @@
 
 import asyncio
 import json
+import time
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
@@ -11,16 +12,41 @@ from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.providers.base import LLMProvider
 from nanobot.agent.context import ContextBuilder
+from nanobot.agent.consolidation import ConsolidationScheduler
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
+from nanobot.agent.tools.search import FileIndex, GlobFilesTool, GrepFilesTool
+from nanobot.agent.tools.sandbox import ResourceLimits
 from nanobot.agent.tools.shell import ExecTool
 from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
+from nanobot.agent.tools.web_cache import WebCache
 from nanobot.agent.tools.message import MessageTool
 from nanobot.agent.tools.spawn import SpawnTool
 from nanobot.agent.tools.cron import CronTool
+from nanobot.agent.tools.memory import MemorySearchTool
 from nanobot.agent.memory import MemoryStore
+from nanobot.agent.history_rollup import HistoryRollup
 from nanobot.agent.subagent import SubagentManager
+from nanobot.metrics.registry import record_llm_call
 from nanobot.session.manager import Session, SessionManager
+from nanobot.utils.helpers import get_data_path, run_io
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import MemoryConfig, WebFetchConfig
+
+
+_MEMORY_PATCH_FORMAT = """Each edit is one of:
+   {"op": "add", "section": "<heading>", "text": "- new fact"}
+   {"op": "update", "section": "<heading>", "old": "<existing line, or its key like '- Location:'>", "text": "- replacement"}
+   {"op": "delete", "section": "<heading>", "old": "<existing line>"}  (omit "old" to delete the whole section)"""
+
+
+def _parse_json_reply(content: str | None) -> dict[str, Any]:
+    """Parse a JSON-only LLM reply, tolerating markdown fences."""
+    text = (content or "").strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
+    return json.loads(text)
 
 
 class AgentLoop:
@@ -47,11 +73,14 @@ class AgentLoop:
         memory_window: int = 50,
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
+        web_fetch_config: "WebFetchConfig | None" = None,
         cron_service: "CronService | None" = None,
         restrict_to_workspace: bool = False,
         session_manager: SessionManager | None = None,
+        max_concurrent_consolidations: int = 1,
+        memory_config: "MemoryConfig | None" = None,
     ):
-        from nanobot.config.schema import ExecToolConfig
+        from nanobot.config.schema import ExecToolConfig, MemoryConfig, WebFetchConfig
         from nanobot.cron.service import CronService
         self.bus = bus
         self.provider = provider
@@ -63,10 +92,15 @@ class AgentLoop:
         self.memory_window = memory_window
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
+        self.web_fetch_config = web_fetch_config or WebFetchConfig()
+        self.web_cache = WebCache(
+            get_data_path() / "cache" / "web", max_bytes=self.web_fetch_config.cache_mb * 1024 * 1024
+        ) if self.web_fetch_config.cache_mb > 0 else None
         self.cron_service = cron_service
         self.restrict_to_workspace = restrict_to_workspace
+        self.memory_config = memory_config or MemoryConfig()
 
-        self.context = ContextBuilder(workspace)
+        self.context = ContextBuilder(workspace, memory_config=self.memory_config)
         self.sessions = session_manager or SessionManager(workspace)
         self.tools = ToolRegistry()
         self.subagents = SubagentManager(
@@ -78,10 +112,16 @@ class AgentLoop:
             max_tokens=self.max_tokens,
             brave_api_key=brave_api_key,
             exec_config=self.exec_config,
+            web_fetch_config=self.web_fetch_config,
+            web_cache=self.web_cache,
             restrict_to_workspace=restrict_to_workspace,
         )
         
         self._running = False
+        self._consolidator = ConsolidationScheduler(max_concurrent=max_concurrent_consolidations)
+        self._batch_pending: dict[str, Session] = {}
+        self._batch_timer: asyncio.TimerHandle | None = None
+        self._rollups: dict[str | None, HistoryRollup] = {}
         self._register_default_tools()
     
     def _register_default_tools(self) -> None:
@@ -92,17 +132,34 @@ class AgentLoop:
         self.tools.register(WriteFileTool(allowed_dir=allowed_dir))
         self.tools.register(EditFileTool(allowed_dir=allowed_dir))
         self.tools.register(ListDirTool(allowed_dir=allowed_dir))
+        file_index = FileIndex(self.workspace)
+        self.tools.register(GlobFilesTool(self.workspace, file_index, allowed_dir=allowed_dir))
+        self.tools.register(GrepFilesTool(self.workspace, file_index, allowed_dir=allowed_dir))
         
         # Shell tool
         self.tools.register(ExecTool(
             working_dir=str(self.workspace),
             timeout=self.exec_config.timeout,
             restrict_to_workspace=self.restrict_to_workspace,
+            max_output_bytes=self.exec_config.max_output_bytes,
+            limits=ResourceLimits(**self.exec_config.limits.model_dump()),
+            progress_interval=self.exec_config.progress_interval,
+            progress_callback=self.bus.publish_outbound,
+            persistent_sessions=self.exec_config.persistent_sessions,
+            max_sessions=self.exec_config.max_sessions,
+            session_idle_timeout=self.exec_config.session_idle_timeout,
         ))
         
         # Web tools
         self.tools.register(WebSearchTool(api_key=self.brave_api_key))
-        self.tools.register(WebFetchTool())
+        self.tools.register(WebFetchTool(
+            max_chars=self.web_fetch_config.max_chars,
+            max_bytes=self.web_fetch_config.max_download_mb * 1024 * 1024,
+            cache=self.web_cache,
+        ))
+        
+        # Memory recall
+        self.tools.register(MemorySearchTool(self.context.memory))
         
         # Message tool
         message_tool = MessageTool(send_callback=self.bus.publish_outbound)
@@ -116,7 +173,7 @@ class AgentLoop:
         if self.cron_service:
             self.tools.register(CronTool(self.cron_service))
     
-    def _set_tool_context(self, channel: str, chat_id: str) -> None:
+    def _set_tool_context(self, channel: str, chat_id: str, session_key: str | None = None) -> None:
         """Update context for all tools that need routing info."""
         if message_tool := self.tools.get("message"):
             if isinstance(message_tool, MessageTool):
@@ -130,6 +187,14 @@ class AgentLoop:
             if isinstance(cron_tool, CronTool):
                 cron_tool.set_context(channel, chat_id)
 
+        if exec_tool := self.tools.get("exec"):
+            if isinstance(exec_tool, ExecTool):
+                exec_tool.set_context(channel, chat_id, session_key)
+
+        if memory_tool := self.tools.get("memory_search"):
+            if isinstance(memory_tool, MemorySearchTool):
+                memory_tool.set_context(self._memory_scope(session_key) if session_key else None)
+
     async def _run_agent_loop(self, initial_messages: list[dict]) -> tuple[str | None, list[str]]:
         """
         Run the agent iteration loop.
@@ -148,6 +213,7 @@ class AgentLoop:
         while iteration < self.max_iterations:
             iteration += 1
 
+            start = time.perf_counter()
             response = await self.provider.chat(
                 messages=messages,
                 tools=self.tools.get_definitions(),
@@ -155,6 +221,7 @@ class AgentLoop:
                 temperature=self.temperature,
                 max_tokens=self.max_tokens,
             )
+            record_llm_call("agent", time.perf_counter() - start, response.finish_reason, response.usage)
 
             if response.has_tool_calls:
                 tool_call_dicts = [
@@ -200,7 +267,8 @@ class AgentLoop:
                     timeout=1.0
                 )
                 try:
-                    response = await self._process_message(msg)
+                    with self._consolidator.interactive():
+                        response = await self._process_message(msg)
                     if response:
                         await self.bus.publish_outbound(response)
                 except Exception as e:
@@ -217,6 +285,26 @@ class AgentLoop:
         """Stop the agent loop."""
         self._running = False
         logger.info("Agent loop stopping")
+
+    async def close(self) -> None:
+        """Stop the agent loop, close the exec tool's persistent shells and the provider's connections."""
+        self.stop()
+        if exec_tool := self.tools.get("exec"):
+            if isinstance(exec_tool, ExecTool):
+                await exec_tool.close()
+        await self.provider.aclose()
+
+    async def drain(self) -> None:
+        """Flush any pending consolidation batch and wait for all background memory jobs to finish."""
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._flush_batch()
+        await self._consolidator.join()
+
+    @property
+    def consolidation_backlog(self) -> int:
+        """Number of memory consolidation jobs queued or running."""
+        return self._consolidator.backlog
     
     async def _process_message(self, msg: InboundMessage, session_key: str | None = None) -> OutboundMessage | None:
         """
@@ -253,7 +341,9 @@ class AgentLoop:
                 temp_session.messages = messages_to_archive
                 await self._consolidate_memory(temp_session, archive_all=True)
 
-            asyncio.create_task(_consolidate_and_cleanup())
+            self._consolidator.submit(session.key, _consolidate_and_cleanup, coalesce=False)
+            if isinstance(exec_tool := self.tools.get("exec"), ExecTool):
+                await exec_tool.reset_session(session.key)
             return OutboundMessage(channel=msg.channel, chat_id=msg.chat_id,
                                   content="New session started. Memory consolidation in progress.")
         if cmd == "/help":
@@ -261,15 +351,18 @@ class AgentLoop:
                                   content="🐈 nanobot commands:\n/new — Start a new conversation\n/help — Show available commands")
         
         if len(session.messages) > self.memory_window:
-            asyncio.create_task(self._consolidate_memory(session))
+            self._request_consolidation(session)
 
-        self._set_tool_context(msg.channel, msg.chat_id)
-        initial_messages = self.context.build_messages(
+        self._set_tool_context(msg.channel, msg.chat_id, key)
+        # Reads bootstrap/memory files and may embed the query; keep it off the loop
+        initial_messages = await run_io(
+            self.context.build_messages,
             history=session.get_history(max_messages=self.memory_window),
             current_message=msg.content,
             media=msg.media if msg.media else None,
             channel=msg.channel,
             chat_id=msg.chat_id,
+            memory_scope=self._memory_scope(key),
         )
         final_content, tools_used = await self._run_agent_loop(initial_messages)
 
@@ -312,12 +405,14 @@ class AgentLoop:
         
         session_key = f"{origin_channel}:{origin_chat_id}"
         session = self.sessions.get_or_create(session_key)
-        self._set_tool_context(origin_channel, origin_chat_id)
-        initial_messages = self.context.build_messages(
+        self._set_tool_context(origin_channel, origin_chat_id, session_key)
+        initial_messages = await run_io(
+            self.context.build_messages,
             history=session.get_history(max_messages=self.memory_window),
             current_message=msg.content,
             channel=origin_channel,
             chat_id=origin_chat_id,
+            memory_scope=self._memory_scope(session_key),
         )
         final_content, _ = await self._run_agent_loop(initial_messages)
 
@@ -363,30 +458,35 @@ class AgentLoop:
                 return
             logger.info(f"Memory consolidation started: {len(session.messages)} total, {len(old_messages)} new to consolidate, {keep_count} keep")
 
-        lines = []
-        for m in old_messages:
-            if not m.get("content"):
-                continue
-            tools = f" [tools: {', '.join(m['tools_used'])}]" if m.get("tools_used") else ""
-            lines.append(f"[{m.get('timestamp', '?')[:16]}] {m['role'].upper()}{tools}: {m['content']}")
-        conversation = "\n".join(lines)
-        current_memory = memory.read_long_term()
+        conversation = self._format_conversation(old_messages)
+        scope = self._memory_scope(session.key)
+        current_memory, memory_version = memory.read_long_term_versioned(scope)
+        shared = ""
+        if scope is not None and (global_memory := memory.read_long_term()):
+            shared = f"\n## Shared Memory (read-only, do not repeat these facts)\n{global_memory}\n"
+
+        if self.memory_config.update_mode == "patch":
+            memory_instructions = f"""2. "memory_patch": A list of edits to long-term memory with any new facts: user location, preferences, personal info, habits, project context, technical decisions, tools/services used. {_MEMORY_PATCH_FORMAT}
+   Return [] if nothing new. Only if the memory needs restructuring, return "memory_update" with the complete new document instead of "memory_patch"."""
+        else:
+            memory_instructions = """2. "memory_update": The updated long-term memory content. Add any new facts: user location, preferences, personal info, habits, project context, technical decisions, tools/services used. If nothing new, return the existing content unchanged."""
 
         prompt = f"""You are a memory consolidation agent. Process this conversation and return a JSON object with exactly two keys:
 
 1. "history_entry": A paragraph (2-5 sentences) summarizing the key events/decisions/topics. Start with a timestamp like [YYYY-MM-DD HH:MM]. Include enough detail to be useful when found by grep search later.
 
-2. "memory_update": The updated long-term memory content. Add any new facts: user location, preferences, personal info, habits, project context, technical decisions, tools/services used. If nothing new, return the existing content unchanged.
+{memory_instructions}
 
 ## Current Long-term Memory
 {current_memory or "(empty)"}
-
+{shared}
 ## Conversation to Process
 {conversation}
 
 Respond with ONLY valid JSON, no markdown fences."""
 
         try:
+            start = time.perf_counter()
             response = await self.provider.chat(
                 messages=[
                     {"role": "system", "content": "You are a memory consolidation agent. Respond only with valid JSON."},
@@ -394,16 +494,12 @@ Respond with ONLY valid JSON, no markdown fences."""
                 ],
                 model=self.model,
             )
-            text = (response.content or "").strip()
-            if text.startswith("```"):
-                text = text.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
-            result = json.loads(text)
+            record_llm_call("consolidation", time.perf_counter() - start, response.finish_reason, response.usage)
+            result = _parse_json_reply(response.content)
 
             if entry := result.get("history_entry"):
-                memory.append_history(entry)
-            if update := result.get("memory_update"):
-                if update != current_memory:
-                    memory.write_long_term(update)
+                await memory.append_history_locked(entry, session_key=scope)
+            await self._apply_memory_result(memory, result, current_memory, memory_version, scope, session.key)
 
             if archive_all:
                 session.last_consolidated = 0
@@ -412,6 +508,192 @@ Respond with ONLY valid JSON, no markdown fences."""
             logger.info(f"Memory consolidation done: {len(session.messages)} messages, last_consolidated={session.last_consolidated}")
         except Exception as e:
             logger.error(f"Memory consolidation failed: {e}")
+            return
+
+        self._schedule_rollup(scope)
+
+    def _schedule_rollup(self, scope: str | None) -> None:
+        """Queue a history rollup for one memory namespace if enabled and due."""
+        if self.memory_config.rollup_after_days <= 0:
+            return
+        rollup = self._rollups.get(scope)
+        if rollup is None:
+            rollup = self._rollups[scope] = HistoryRollup(
+                self.context.memory,
+                self._summarize_history,
+                keep_days=self.memory_config.rollup_after_days,
+                keep_weeks=self.memory_config.rollup_monthly_after_weeks,
+                session_key=scope,
+            )
+        if rollup.due():
+            key = "memory:rollup" if scope is None else f"memory:rollup:{scope}"
+            self._consolidator.submit(key, rollup.run)
+
+    async def _apply_memory_result(
+        self,
+        memory: MemoryStore,
+        result: dict[str, Any],
+        current: str,
+        version: str,
+        scope: str | None,
+        label: str,
+    ) -> None:
+        """Apply the "memory_patch" or "memory_update" of a consolidation reply to one memory file."""
+        if isinstance(patch := result.get("memory_patch"), list):
+            if patch:
+                applied = await memory.patch_long_term(patch, session_key=scope)
+                logger.debug(f"Session {label}: applied {applied}/{len(patch)} memory edits")
+        elif isinstance(update := result.get("memory_update"), str) and update.strip():
+            if update != current:
+                if not await memory.update_long_term(update, current, version, session_key=scope):
+                    logger.info(f"Session {label}: MEMORY.md changed during consolidation, merged update")
+
+    def _request_consolidation(self, session: Session) -> None:
+        """Consolidate a session now, or queue it for the next cross-session batch."""
+        if self.memory_config.batch_window_s <= 0:
+            self._consolidator.submit(session.key, lambda: self._consolidate_memory(session))
+            return
+        self._batch_pending[session.key] = session
+        if self._batch_timer is None:
+            self._batch_timer = asyncio.get_running_loop().call_later(
+                self.memory_config.batch_window_s, self._flush_batch
+            )
+
+    def _flush_batch(self) -> None:
+        self._batch_timer = None
+        if self._batch_pending:
+            keys = list(self._batch_pending)[: self.memory_config.batch_max_sessions]
+            sessions = [self._batch_pending.pop(k) for k in keys]
+            self._consolidator.submit("memory:batch", lambda: self._consolidate_batch(sessions), coalesce=False)
+            if self._batch_pending:
+                self._flush_batch()
+
+    async def _consolidate_batch(self, sessions: list[Session]) -> None:
+        """Consolidate several sessions in one LLM call, sharing the memory context once."""
+        # Hold the sessions' own keys so /new archiving or a direct run never overlaps this one
+        async with self._consolidator.hold(s.key for s in sessions):
+            await self._consolidate_sessions(sessions)
+
+    async def _consolidate_sessions(self, sessions: list[Session]) -> None:
+        keep_count = self.memory_window // 2
+        work: list[tuple[Session, int, str]] = []
+        for session in sessions:
+            end = len(session.messages) - keep_count
+            if end > session.last_consolidated:
+                conversation = self._format_conversation(session.messages[session.last_consolidated:end])
+                if conversation:
+                    work.append((session, end, conversation))
+        if len(work) <= 1:
+            for session, _, _ in work:
+                await self._consolidate_memory(session)
+            return
+
+        memory = MemoryStore(self.workspace)
+        scoped = self.memory_config.scope == "session"
+        full = self.memory_config.update_mode == "full"
+        field = "memory_update" if full else "memory_patch"
+        chat_memory: dict[str, tuple[str, str]] = {}
+        blocks = []
+        for session, _, conversation in work:
+            block = f"### Session {session.key}\n"
+            if scoped:
+                chat_memory[session.key] = memory.read_long_term_versioned(session.key)
+                block += f"Chat memory:\n{chat_memory[session.key][0] or '(empty)'}\n\n"
+            blocks.append(block + f"Conversation:\n{conversation}")
+        shared_memory, shared_version = memory.read_long_term_versioned()
+        if scoped:
+            memory_target = (
+                f'"{field}" inside each session object ('
+                + ("the complete updated memory of that chat" if full else "edits to that chat's memory")
+                + "; the long-term memory below is shared and read-only)"
+            )
+        else:
+            memory_target = f'a top-level "{field}" (' + (
+                "the complete updated long-term memory below" if full else "edits to the shared long-term memory below"
+            ) + ")"
+        memory_format = (
+            "Omit it if nothing is new." if full else f"{_MEMORY_PATCH_FORMAT}\n  Use [] if nothing new."
+        )
+        placeholder = '"..."' if full else "[...]"
+        prompt = f"""You are a memory consolidation agent. Process the conversations of {len(work)} sessions and return a JSON object:
+
+{{"sessions": {{"<session key>": {{"history_entry": "...", "{field}": {placeholder}}}}}, "{field}": {placeholder}}}
+
+- "history_entry" (one per session): A paragraph (2-5 sentences) summarizing the key events/decisions/topics of that session. Start with a timestamp like [YYYY-MM-DD HH:MM]. Include enough detail to be useful when found by grep search later.
+- New facts (user location, preferences, personal info, habits, project context, technical decisions, tools/services used) go into {memory_target}. {memory_format}
+
+## Current Long-term Memory
+{shared_memory or "(empty)"}
+
+## Sessions
+{chr(10).join(blocks)}
+
+Respond with ONLY valid JSON, no markdown fences."""
+
+        try:
+            start = time.perf_counter()
+            response = await self.provider.chat(
+                messages=[
+                    {"role": "system", "content": "You are a memory consolidation agent. Respond only with valid JSON."},
+                    {"role": "user", "content": prompt},
+                ],
+                model=self.model,
+            )
+            record_llm_call("consolidation", time.perf_counter() - start, response.finish_reason, response.usage)
+            result = _parse_json_reply(response.content)
+        except Exception as e:
+            logger.error(f"Batched memory consolidation failed: {e}")
+            return
+
+        per_session = result.get("sessions") or {}
+        for session, end, _ in work:
+            item = per_session.get(session.key) or {}
+            scope = self._memory_scope(session.key)
+            if entry := item.get("history_entry"):
+                await memory.append_history_locked(entry, session_key=scope)
+            if scoped:
+                await self._apply_memory_result(memory, item, *chat_memory[session.key], scope, session.key)
+            if item:
+                session.last_consolidated = end
+        if not scoped:
+            await self._apply_memory_result(memory, result, shared_memory, shared_version, None, "batch")
+        logger.info(f"Batched memory consolidation done: {len(work)} sessions in one call")
+
+        for scope in dict.fromkeys(self._memory_scope(session.key) for session, _, _ in work):
+            self._schedule_rollup(scope)
+
+    @staticmethod
+    def _format_conversation(messages: list[dict[str, Any]]) -> str:
+        lines = []
+        for m in messages:
+            if not m.get("content"):
+                continue
+            tools = f" [tools: {', '.join(m['tools_used'])}]" if m.get("tools_used") else ""
+            lines.append(f"[{m.get('timestamp', '?')[:16]}] {m['role'].upper()}{tools}: {m['content']}")
+        return "\n".join(lines)
+
+    def _memory_scope(self, session_key: str) -> str | None:
+        """Session key to use as memory namespace, or None when memory is global."""
+        return session_key if self.memory_config.scope == "session" else None
+
+    async def _summarize_history(self, level: str, period: str, entries: list[str]) -> str | None:
+        """Summarize history entries for one week/month (used by the history rollup)."""
+        joined = "\n\n".join(entries)
+        prompt = f"""Summarize these {"daily history entries" if level == "week" else "weekly summaries"} for {period} into one paragraph (3-6 sentences). Keep names, dates, decisions and facts that would be useful when searching later. Do not add a timestamp prefix.
+
+{joined}"""
+        start = time.perf_counter()
+        response = await self.provider.chat(
+            messages=[
+                {"role": "system", "content": "You are a memory summarization agent. Respond with the summary only."},
+                {"role": "user", "content": prompt},
+            ],
+            model=self.model,
+        )
+        record_llm_call("rollup", time.perf_counter() - start, response.finish_reason, response.usage)
+        if response.finish_reason == "error":
+            return None
+        return response.content
 
     async def process_direct(
         self,
@@ -439,5 +721,6 @@ Respond with ONLY valid JSON, no markdown fences."""
             content=content
         )
         
-        response = await self._process_message(msg, session_key=session_key)
+        with self._consolidator.interactive():
+            response = await self._process_message(msg, session_key=session_key)
         return response.content if response else ""
@@ -1,30 +1,329 @@
 """Memory system for persistent agent memory."""
 
+import hashlib
+import re
+from difflib import SequenceMatcher
 from pathlib import Path
+from typing import Any
 
-from nanobot.utils.helpers import ensure_dir
+from nanobot.agent.history_index import HistoryHit, HistoryIndex, split_history_entries
+from nanobot.agent.vector_memory import Embedder, MemoryChunk, VectorIndex, chunk_markdown
+from nanobot.utils.helpers import atomic_write_text, ensure_dir, file_lock, safe_filename
 
 
 class MemoryStore:
-    """Two-layer memory: MEMORY.md (long-term facts) + HISTORY.md (grep-searchable log)."""
+    """Two-layer memory: MEMORY.md (long-term facts) + HISTORY.md (grep-searchable log).
 
-    def __init__(self, workspace: Path):
+    Long-term memory has a global layer (memory/MEMORY.md) and optional
+    per-session layers (memory/sessions/<session>/MEMORY.md); methods that take
+    `session_key` act on that session's layer, or on the global one if None.
+    A session's history lives in its own memory/sessions/<session>/HISTORY.md
+    and is never searched or retrieved from another session.
+
+    With an embedder, the prompt gets only the top-k memory/history chunks
+    relevant to the current message instead of the whole MEMORY.md.
+    """
+
+    def __init__(self, workspace: Path, embedder: Embedder | None = None, top_k: int = 8):
         self.memory_dir = ensure_dir(workspace / "memory")
         self.memory_file = self.memory_dir / "MEMORY.md"
         self.history_file = self.memory_dir / "HISTORY.md"
+        self.archive_dir = self.memory_dir / "archive"
+        self.top_k = top_k
+        self._history_indexes: dict[str | None, HistoryIndex] = {}
+        self._vector_index = (
+            VectorIndex(self.memory_dir / ".vector_index.db", embedder) if embedder else None
+        )
+
+    def session_dir(self, session_key: str | None) -> Path:
+        """Directory of a session's namespace (memory/ itself if session_key is None)."""
+        if session_key is None:
+            return self.memory_dir
+        return self.memory_dir / "sessions" / safe_filename(session_key.replace(":", "_"))
+
+    def session_memory_file(self, session_key: str | None) -> Path:
+        """MEMORY.md for a session's namespace (the global file if session_key is None)."""
+        return self.session_dir(session_key) / "MEMORY.md"
+
+    def session_history_file(self, session_key: str | None) -> Path:
+        """HISTORY.md for a session's namespace (the global file if session_key is None)."""
+        return self.session_dir(session_key) / "HISTORY.md"
+
+    def session_archive_dir(self, session_key: str | None) -> Path:
+        """Rolled-up history archives of a session's namespace (memory/archive if None)."""
+        return self.session_dir(session_key) / "archive"
 
-    def read_long_term(self) -> str:
-        if self.memory_file.exists():
-            return self.memory_file.read_text(encoding="utf-8")
+    def read_long_term(self, session_key: str | None = None) -> str:
+        path = self.session_memory_file(session_key)
+        if path.exists():
+            return path.read_text(encoding="utf-8")
         return ""
 
-    def write_long_term(self, content: str) -> None:
-        self.memory_file.write_text(content, encoding="utf-8")
+    def read_long_term_versioned(self, session_key: str | None = None) -> tuple[str, str]:
+        """Read MEMORY.md together with a version token for update_long_term."""
+        content = self.read_long_term(session_key)
+        return content, content_version(content)
+
+    def write_long_term(self, content: str, session_key: str | None = None) -> None:
+        path = self.session_memory_file(session_key)
+        ensure_dir(path.parent)
+        atomic_write_text(path, content)
+
+    async def update_long_term(
+        self, content: str, base: str, base_version: str, session_key: str | None = None
+    ) -> bool:
+        """
+        Write MEMORY.md unless it changed since `base` was read.
+
+        If another writer got there first, the edit base -> content is merged
+        onto the current file instead of overwriting it.
+
+        Returns:
+            True if the write applied cleanly, False if it had to be merged.
+        """
+        async with file_lock(self.session_memory_file(session_key)):
+            current = self.read_long_term(session_key)
+            clean = content_version(current) == base_version
+            merged = content if clean else merge_update(base, content, current)
+            if merged != current:
+                self.write_long_term(merged, session_key)
+            return clean
+
+    async def patch_long_term(self, ops: list[dict[str, Any]], session_key: str | None = None) -> int:
+        """
+        Apply structured edits (see apply_memory_patch) to MEMORY.md.
 
-    def append_history(self, entry: str) -> None:
-        with open(self.history_file, "a", encoding="utf-8") as f:
+        The patch is applied to whatever the file holds when the lock is taken,
+        so concurrent writers never clobber each other. Returns ops applied.
+        """
+        async with file_lock(self.session_memory_file(session_key)):
+            current = self.read_long_term(session_key)
+            patched, applied = apply_memory_patch(current, ops)
+            if patched != current:
+                self.write_long_term(patched, session_key)
+            return applied
+
+    def append_history(self, entry: str, session_key: str | None = None) -> None:
+        path = self.session_history_file(session_key)
+        ensure_dir(path.parent)
+        with open(path, "a", encoding="utf-8") as f:
             f.write(entry.rstrip() + "\n\n")
 
-    def get_memory_context(self) -> str:
-        long_term = self.read_long_term()
-        return f"## Long-term Memory\n{long_term}" if long_term else ""
+    async def append_history_locked(self, entry: str, session_key: str | None = None) -> None:
+        """Append a history entry while holding the HISTORY.md lock."""
+        async with file_lock(self.session_history_file(session_key)):
+            self.append_history(entry, session_key)
+
+    def search_history(
+        self,
+        query: str,
+        limit: int = 10,
+        since: str | None = None,
+        until: str | None = None,
+        session_key: str | None = None,
+    ) -> list[HistoryHit]:
+        """
+        Ranked full-text search over one namespace's history (index is synced on each call).
+
+        Each namespace covers its own HISTORY.md and archives only.
+        """
+        index = self._history_indexes.get(session_key)
+        if index is None:
+            directory = self.session_dir(session_key)
+            index = HistoryIndex(
+                self.session_history_file(session_key),
+                directory / ".history_index.db",
+                archive_dir=self.session_archive_dir(session_key),
+            )
+            if session_key is not None:
+                ensure_dir(directory)
+            self._history_indexes[session_key] = index
+        return index.search(query, limit=limit, since=since, until=until)
+
+    def retrieve(self, query: str, k: int | None = None, session_key: str | None = None) -> list[MemoryChunk]:
+        """
+        Top-k chunks of MEMORY.md and HISTORY.md most relevant to query (retrieval mode only).
+
+        With a session_key the sources are the shared MEMORY.md plus that
+        session's MEMORY.md and HISTORY.md; the global HISTORY.md is left out.
+        """
+        if self._vector_index is None:
+            return []
+        sources = {"MEMORY.md": (self.memory_file, chunk_markdown)}
+        if session_key is None:
+            sources["HISTORY.md"] = (self.history_file, split_history_entries)
+        else:
+            for path, splitter in ((self.session_memory_file(session_key), chunk_markdown),
+                                   (self.session_history_file(session_key), split_history_entries)):
+                sources[path.relative_to(self.memory_dir).as_posix()] = (path, splitter)
+        for source, (path, splitter) in sources.items():
+            self._vector_index.sync_file(source, path, splitter)
+        return self._vector_index.search(query, k or self.top_k, sources=set(sources))
+
+    def get_memory_context(self, query: str | None = None, session_key: str | None = None) -> str:
+        if self._vector_index is not None and query:
+            chunks = self.retrieve(query, session_key=session_key)
+            if not chunks:
+                return ""
+            body = "\n\n".join(f"[{c.source}] {c.text}" for c in chunks)
+            return f"## Relevant Memory\n{body}"
+        parts = []
+        if long_term := self.read_long_term():
+            parts.append(f"## Long-term Memory\n{long_term}")
+        if session_key is not None and (scoped := self.read_long_term(session_key)):
+            parts.append(f"## Memory for This Chat\n{scoped}")
+        return "\n\n".join(parts)
+
+
+def content_version(content: str) -> str:
+    """Version token for optimistic concurrency checks on memory files."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def merge_update(base: str, ours: str, theirs: str) -> str:
+    """
+    Line-based three-way merge: replay the edit base -> ours onto theirs.
+
+    Lines we removed are dropped from theirs; lines we added are inserted before
+    the nearest following line that also exists in theirs (or appended).
+    Lines theirs added are kept.
+    """
+    if theirs == base or theirs == ours:
+        return ours
+    if ours == base:
+        return theirs
+
+    base_lines = base.splitlines()
+    our_lines = ours.splitlines()
+    result = theirs.splitlines()
+    opcodes = SequenceMatcher(None, base_lines, our_lines, autojunk=False).get_opcodes()
+
+    removed = {
+        line
+        for tag, i1, i2, _, _ in opcodes if tag in ("replace", "delete")
+        for line in base_lines[i1:i2] if line.strip()
+    }
+    kept = set(our_lines)
+    result = [line for line in result if line not in removed or line in kept]
+
+    for tag, _, _, j1, j2 in opcodes:
+        if tag not in ("replace", "insert"):
+            continue
+        present = set(result)
+        block = [line for line in our_lines[j1:j2] if not line.strip() or line not in present]
+        if not any(line.strip() for line in block):
+            continue
+        pos = len(result)
+        for anchor in our_lines[j2:]:
+            if anchor.strip() and anchor in present:
+                pos = result.index(anchor)
+                break
+        result[pos:pos] = block
+
+    text = "\n".join(result)
+    return text + "\n" if ours.endswith("\n") or theirs.endswith("\n") else text
+
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*$")
+
+
+def apply_memory_patch(content: str, ops: list[dict[str, Any]]) -> tuple[str, int]:
+    """
+    Apply structured edits to a markdown memory document.
+
+    Each op is a dict with "op" ("add" | "update" | "delete"), an optional
+    "section" (heading text), "old" (an existing line, or its key prefix such
+    as "- Location:") and "text" (new line(s)). Facts are lines; sections are
+    markdown headings. An update whose target is missing becomes an add; a
+    delete without "old" removes the whole section.
+
+    Returns:
+        Tuple of (new content, number of ops applied).
+    """
+    lines = content.splitlines()
+    applied = 0
+    for op in ops:
+        if isinstance(op, dict) and _apply_op(lines, op):
+            applied += 1
+    text = "\n".join(lines).strip("\n")
+    return (text + "\n" if text else ""), applied
+
+
+def _apply_op(lines: list[str], op: dict[str, Any]) -> bool:
+    kind = str(op.get("op", "")).lower()
+    section = str(op.get("section") or "").strip() or None
+    old = str(op.get("old") or "").strip()
+    new = [line for line in str(op.get("text") or "").strip("\n").splitlines()]
+
+    bounds = _section_bounds(lines, section) if section else (-1, len(lines))
+    if kind == "delete":
+        if bounds is None:
+            return False
+        if not old:
+            if section is None:
+                return False
+            del lines[bounds[0]:bounds[1]]
+            return True
+        idx = _find_line(lines, bounds, old)
+        if idx is None:
+            return False
+        del lines[idx]
+        return True
+
+    if kind not in ("add", "update") or not any(line.strip() for line in new):
+        return False
+    if kind == "update" and old and bounds is not None:
+        idx = _find_line(lines, bounds, old)
+        if idx is not None:
+            lines[idx:idx + 1] = new
+            return True
+
+    # add (or update without a match)
+    if bounds is None:
+        if lines and lines[-1].strip():
+            lines.append("")
+        lines.extend([f"## {section}", *new])
+        return True
+    existing = {_norm(line) for line in lines[bounds[0] + 1:bounds[1]]}
+    new = [line for line in new if _norm(line) not in existing]
+    if not new:
+        return False
+    end = bounds[1]
+    while end > bounds[0] + 1 and not lines[end - 1].strip():
+        end -= 1
+    lines[end:end] = new
+    return True
+
+
+def _section_bounds(lines: list[str], section: str) -> tuple[int, int] | None:
+    """(heading index, end index) of a section, matched case-insensitively."""
+    target = section.lstrip("#").strip().lower()
+    for i, line in enumerate(lines):
+        m = _HEADING_RE.match(line)
+        if m and m.group(2).lower() == target:
+            level = len(m.group(1))
+            for j in range(i + 1, len(lines)):
+                other = _HEADING_RE.match(lines[j])
+                if other and len(other.group(1)) <= level:
+                    return i, j
+            return i, len(lines)
+    return None
+
+
+def _find_line(lines: list[str], bounds: tuple[int, int], old: str) -> int | None:
+    """Index of the line equal to `old` (or starting with it, as a key) within bounds."""
+    target = _norm(old)
+    if not target:
+        return None
+    candidates = range(bounds[0] + 1, bounds[1])
+    for i in candidates:
+        if _norm(lines[i]) == target:
+            return i
+    for i in candidates:
+        if not _HEADING_RE.match(lines[i]) and _norm(lines[i]).startswith(target):
+            return i
+    return None
+
+
+def _norm(line: str) -> str:
+    return line.strip().lstrip("-*").strip().lower()
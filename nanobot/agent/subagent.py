@@ -2,9 +2,10 @@
 
 import asyncio
 import json
+import time
 import uuid
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
@@ -13,8 +14,15 @@ from nanobot.bus.queue import MessageBus
 from nanobot.providers.base import LLMProvider
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
+from nanobot.agent.tools.search import FileIndex, GlobFilesTool, GrepFilesTool
+from nanobot.agent.tools.sandbox import ResourceLimits
 from nanobot.agent.tools.shell import ExecTool
 from nanobot.agent.tools.web import WebSearchTool, WebFetchTool
+from nanobot.agent.tools.web_cache import WebCache
+from nanobot.metrics.registry import record_llm_call
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import WebFetchConfig
 
 
 class SubagentManager:
@@ -36,9 +44,11 @@ class SubagentManager:
         max_tokens: int = 4096,
         brave_api_key: str | None = None,
         exec_config: "ExecToolConfig | None" = None,
+        web_fetch_config: "WebFetchConfig | None" = None,
+        web_cache: WebCache | None = None,
         restrict_to_workspace: bool = False,
     ):
-        from nanobot.config.schema import ExecToolConfig
+        from nanobot.config.schema import ExecToolConfig, WebFetchConfig
         self.provider = provider
         self.workspace = workspace
         self.bus = bus
@@ -47,6 +57,8 @@ class SubagentManager:
         self.max_tokens = max_tokens
         self.brave_api_key = brave_api_key
         self.exec_config = exec_config or ExecToolConfig()
+        self.web_fetch_config = web_fetch_config or WebFetchConfig()
+        self.web_cache = web_cache
         self.restrict_to_workspace = restrict_to_workspace
         self._running_tasks: dict[str, asyncio.Task[None]] = {}
     
@@ -107,13 +119,22 @@ class SubagentManager:
             tools.register(WriteFileTool(allowed_dir=allowed_dir))
             tools.register(EditFileTool(allowed_dir=allowed_dir))
             tools.register(ListDirTool(allowed_dir=allowed_dir))
+            file_index = FileIndex(self.workspace)
+            tools.register(GlobFilesTool(self.workspace, file_index, allowed_dir=allowed_dir))
+            tools.register(GrepFilesTool(self.workspace, file_index, allowed_dir=allowed_dir))
             tools.register(ExecTool(
                 working_dir=str(self.workspace),
                 timeout=self.exec_config.timeout,
                 restrict_to_workspace=self.restrict_to_workspace,
+                max_output_bytes=self.exec_config.max_output_bytes,
+                limits=ResourceLimits(**self.exec_config.limits.model_dump()),
             ))
             tools.register(WebSearchTool(api_key=self.brave_api_key))
-            tools.register(WebFetchTool())
+            tools.register(WebFetchTool(
+                max_chars=self.web_fetch_config.max_chars,
+                max_bytes=self.web_fetch_config.max_download_mb * 1024 * 1024,
+                cache=self.web_cache,
+            ))
             
             # Build messages with subagent-specific prompt
             system_prompt = self._build_subagent_prompt(task)
@@ -130,6 +151,7 @@ class SubagentManager:
             while iteration < max_iterations:
                 iteration += 1
                 
+                start = time.perf_counter()
                 response = await self.provider.chat(
                     messages=messages,
                     tools=tools.get_definitions(),
@@ -137,6 +159,7 @@ class SubagentManager:
                     temperature=self.temperature,
                     max_tokens=self.max_tokens,
                 )
+                record_llm_call("subagent", time.perf_counter() - start, response.finish_reason, response.usage)
                 
                 if response.has_tool_calls:
                     # Add assistant message with tool calls
@@ -237,6 +260,7 @@ You are a subagent spawned by the main agent to complete a specific task.
 
 ## What You Can Do
 - Read and write files in the workspace
+- Find files and search their contents (glob_files, grep_files)
 - Execute shell commands
 - Search the web and fetch web pages
 - Complete the task thoroughly
@@ -1,9 +1,27 @@
-"""File system tools: read, write, edit."""
+"""File system tools: read, write, edit, list."""
 
+import fnmatch
+import mmap
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from nanobot.agent.tools.base import Tool
+from nanobot.utils.helpers import atomic_write_text, file_lock, run_io
+
+# Largest tool result read_file returns; roughly 30k tokens of text
+MAX_READ_BYTES = 128 * 1024
+# Files at least this large are memory-mapped instead of read into memory
+MMAP_THRESHOLD = 4 * 1024 * 1024
+BINARY_SNIFF_BYTES = 8192
+# Directories that are never worth descending into when listing or searching
+DEFAULT_IGNORES = (
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache", ".tox", ".idea", ".DS_Store",
+)
 
 
 def _resolve_path(path: str, allowed_dir: Path | None = None) -> Path:
@@ -15,10 +33,20 @@ def _resolve_path(path: str, allowed_dir: Path | None = None) -> Path:
 
 
 class ReadFileTool(Tool):
-    """Tool to read file contents."""
+    """
+    Tool to read file contents.
+
+    Disk I/O runs on the shared I/O thread pool (as in all filesystem tools),
+    so slow disks do not stall the event loop. Reads are capped at max_bytes:
+    whole-file reads of larger files return a head/tail preview, and line or
+    byte ranges page through the rest. Files above MMAP_THRESHOLD are
+    memory-mapped so seeking to a line range does not load the file into
+    memory.
+    """
     
-    def __init__(self, allowed_dir: Path | None = None):
+    def __init__(self, allowed_dir: Path | None = None, max_bytes: int = MAX_READ_BYTES):
         self._allowed_dir = allowed_dir
+        self.max_bytes = max_bytes
 
     @property
     def name(self) -> str:
@@ -26,7 +54,10 @@ class ReadFileTool(Tool):
     
     @property
     def description(self) -> str:
-        return "Read the contents of a file at the given path."
+        return (
+            "Read the contents of a file at the given path. Large files return a head/tail "
+            "preview; use offset/limit (lines) or byte_offset/byte_limit to read a range."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -36,26 +67,249 @@ class ReadFileTool(Tool):
                 "path": {
                     "type": "string",
                     "description": "The file path to read"
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "First line to read (1-based)",
+                    "minimum": 1
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of lines to read",
+                    "minimum": 1
+                },
+                "byte_offset": {
+                    "type": "integer",
+                    "description": "Start reading at this byte position (instead of a line range)",
+                    "minimum": 0
+                },
+                "byte_limit": {
+                    "type": "integer",
+                    "description": "Maximum number of bytes to read from byte_offset",
+                    "minimum": 1
                 }
             },
             "required": ["path"]
         }
     
-    async def execute(self, path: str, **kwargs: Any) -> str:
+    async def execute(
+        self,
+        path: str,
+        offset: int | None = None,
+        limit: int | None = None,
+        byte_offset: int | None = None,
+        byte_limit: int | None = None,
+        **kwargs: Any,
+    ) -> str:
         try:
-            file_path = _resolve_path(path, self._allowed_dir)
-            if not file_path.exists():
-                return f"Error: File not found: {path}"
-            if not file_path.is_file():
-                return f"Error: Not a file: {path}"
-            
-            content = file_path.read_text(encoding="utf-8")
-            return content
+            return await run_io(self._read_file, path, offset, limit, byte_offset, byte_limit)
         except PermissionError as e:
             return f"Error: {e}"
         except Exception as e:
             return f"Error reading file: {str(e)}"
 
+    def _read_file(
+        self,
+        path: str,
+        offset: int | None,
+        limit: int | None,
+        byte_offset: int | None,
+        byte_limit: int | None,
+    ) -> str:
+        file_path = _resolve_path(path, self._allowed_dir)
+        if not file_path.exists():
+            return f"Error: File not found: {path}"
+        if not file_path.is_file():
+            return f"Error: Not a file: {path}"
+
+        size = file_path.stat().st_size
+        with open(file_path, "rb") as f:
+            if _is_binary(f.read(BINARY_SNIFF_BYTES)):
+                return f"Error: {path} appears to be a binary file ({size} bytes)"
+            if size == 0:
+                return ""
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    return self._read(buf, size, offset, limit, byte_offset, byte_limit)
+            f.seek(0)
+            return self._read(f.read(), size, offset, limit, byte_offset, byte_limit)
+
+    def _read(
+        self,
+        buf: bytes | mmap.mmap,
+        size: int,
+        offset: int | None,
+        limit: int | None,
+        byte_offset: int | None,
+        byte_limit: int | None,
+    ) -> str:
+        if byte_offset is not None or byte_limit is not None:
+            start = byte_offset or 0
+            if start >= size:
+                return f"Error: byte_offset {start} is past the end of the file ({size} bytes)"
+            end = min(size, start + min(byte_limit or self.max_bytes, self.max_bytes))
+            text = _decode(buf[start:end])
+            if end < size:
+                text += f"\n\n[Showing bytes {start}-{end} of {size}. Use byte_offset={end} to continue.]"
+            return text
+
+        if offset is None and limit is None:
+            if size <= self.max_bytes:
+                return _decode(buf[:])
+            half = self.max_bytes // 2
+            head = buf[:half]
+            head = head[: head.rfind(b"\n") + 1] or head
+            tail = buf[size - half:]
+            tail = tail[tail.find(b"\n") + 1:] or tail
+            return (
+                f"{_decode(head)}\n[... file is {size} bytes; showing the first and last "
+                f"{half // 1024} KiB. Use offset/limit or byte_offset/byte_limit to read more ...]\n\n"
+                f"{_decode(tail)}"
+            )
+
+        first = offset or 1
+        start = 0
+        for _ in range(first - 1):
+            start = buf.find(b"\n", start) + 1
+            # start == size: the file ends with the newline that closed the last line
+            if start == 0 or start >= size:
+                return f"Error: offset {first} is past the end of the file"
+        end = start
+        lines = 0
+        while end < size and (limit is None or lines < limit):
+            nl = buf.find(b"\n", end)
+            next_end = size if nl < 0 else nl + 1
+            if next_end - start > self.max_bytes:
+                # Stop at the cap, but always return at least part of one line
+                if lines == 0:
+                    end = start + self.max_bytes
+                break
+            end = next_end
+            lines += 1
+
+        text = _decode(buf[start:end])
+        if end < size:
+            last = first + lines - 1
+            if lines:
+                text += f"\n\n[Showing lines {first}-{last}. Use offset={last + 1} to continue.]"
+            else:
+                text += f"\n\n[Line {first} is longer than {self.max_bytes} bytes; showing its start.]"
+        return text
+
+
+def _is_binary(sample: bytes) -> bool:
+    """Heuristic: NUL bytes or undecodable content in the first block means binary."""
+    if b"\x00" in sample:
+        return True
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the end of the sample is fine
+        return e.start < len(sample) - 3
+    return False
+
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,\d+)? \+\d+(?:,\d+)? @@")
+
+
+@dataclass
+class _Hunk:
+    start: int
+    old: list[str] = field(default_factory=list)
+    new: list[str] = field(default_factory=list)
+    new_no_eol: bool = False
+
+
+def _parse_hunks(diff: str) -> list[_Hunk]:
+    hunks: list[_Hunk] = []
+    hunk: _Hunk | None = None
+    lines = diff.splitlines()
+    headers = 0
+    last = ""
+    for i, line in enumerate(lines):
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            headers += 1
+            if headers > 1:
+                raise ValueError("patch touches more than one file; send one patch per file")
+            hunk = None
+            continue
+        if line.startswith(("diff ", "index ")) or (hunk is None and line.startswith("+++ ")):
+            hunk = None
+            continue
+        if m := _HUNK_RE.match(line):
+            hunk = _Hunk(int(m.group(1)))
+            hunks.append(hunk)
+        elif hunk is None:
+            continue
+        elif line.startswith("\\"):
+            if last in (" ", "+"):
+                hunk.new_no_eol = True
+        elif line[:1] in (" ", ""):
+            hunk.old.append(line[1:])
+            hunk.new.append(line[1:])
+        elif line[0] == "-":
+            hunk.old.append(line[1:])
+        elif line[0] == "+":
+            hunk.new.append(line[1:])
+        else:
+            raise ValueError(f"unexpected line in hunk: {line[:60]!r}")
+        last = line[:1] or " "
+    return hunks
+
+
+def _find_block(lines: list[str], block: list[str], expected: int, lo: int) -> int | None:
+    """Index where `block` occurs in `lines` at or after lo, nearest to `expected`."""
+    hi = len(lines) - len(block)
+    if hi < lo:
+        return None
+    expected = min(max(expected, lo), hi)
+    for distance in range(max(expected - lo, hi - expected) + 1):
+        for i in (expected - distance, expected + distance):
+            if lo <= i <= hi and all(lines[i + j].rstrip("\r\n") == b for j, b in enumerate(block)):
+                return i
+    return None
+
+
+def apply_unified_diff(content: str, diff: str) -> tuple[str, int]:
+    """
+    Apply a single-file unified diff. Returns (new content, hunks applied).
+
+    Hunks are located by their context and removed lines, starting at the
+    line number in the hunk header and searching outward, so slightly wrong
+    line numbers (common in hand- or model-written diffs) still apply; the
+    line counts in headers are ignored. Raises ValueError if a hunk does not
+    match.
+    """
+    hunks = _parse_hunks(diff)
+    if not hunks:
+        raise ValueError("patch contains no @@ hunks")
+    lines = content.splitlines(keepends=True)
+    newline = "\r\n" if "\r\n" in content else "\n"
+
+    out: list[str] = []
+    pos = 0
+    for n, hunk in enumerate(hunks, 1):
+        if not hunk.old:
+            # Pure insertion: the header names the line it goes after
+            idx = min(max(hunk.start, pos), len(lines))
+        else:
+            idx = _find_block(lines, hunk.old, hunk.start - 1, pos)
+        if idx is None:
+            raise ValueError(f"hunk {n} (@@ -{hunk.start}) does not match the file")
+        end = idx + len(hunk.old)
+        out.extend(lines[pos:idx])
+        added = [line + newline for line in hunk.new]
+        at_eof_without_newline = end == len(lines) and lines and not lines[-1].endswith("\n")
+        if added and (hunk.new_no_eol or at_eof_without_newline):
+            added[-1] = added[-1][: -len(newline)]
+        out.extend(added)
+        pos = end
+    out.extend(lines[pos:])
+    return "".join(out), len(hunks)
+
 
 class WriteFileTool(Tool):
     """Tool to write content to a file."""
@@ -90,18 +344,30 @@ class WriteFileTool(Tool):
     
     async def execute(self, path: str, content: str, **kwargs: Any) -> str:
         try:
-            file_path = _resolve_path(path, self._allowed_dir)
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(content, encoding="utf-8")
+            file_path = await run_io(_resolve_path, path, self._allowed_dir)
+            async with file_lock(file_path):
+                await run_io(self._write, file_path, content)
             return f"Successfully wrote {len(content)} bytes to {path}"
         except PermissionError as e:
             return f"Error: {e}"
         except Exception as e:
             return f"Error writing file: {str(e)}"
 
+    @staticmethod
+    def _write(file_path: Path, content: str) -> None:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(file_path, content)
+
 
 class EditFileTool(Tool):
-    """Tool to edit a file by replacing text."""
+    """
+    Tool to edit a file by replacing text.
+
+    Besides a single old_text/new_text replacement, accepts a list of edits
+    or a unified diff. Every change is validated against the file first and
+    the result is written once, atomically; if any edit or hunk does not
+    apply, the file is left untouched.
+    """
     
     def __init__(self, allowed_dir: Path | None = None):
         self._allowed_dir = allowed_dir
@@ -112,7 +378,11 @@ class EditFileTool(Tool):
     
     @property
     def description(self) -> str:
-        return "Edit a file by replacing old_text with new_text. The old_text must exist exactly in the file."
+        return (
+            "Edit a file by replacing old_text with new_text. The old_text must exist exactly once in the file. "
+            "To make several changes in one call, pass `edits` (a list of old_text/new_text pairs, applied in "
+            "order) or `patch` (a unified diff for this file). Nothing is written unless every change applies."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -130,39 +400,118 @@ class EditFileTool(Tool):
                 "new_text": {
                     "type": "string",
                     "description": "The text to replace with"
+                },
+                "edits": {
+                    "type": "array",
+                    "description": "Several replacements applied in order, all or nothing",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "old_text": {"type": "string"},
+                            "new_text": {"type": "string"}
+                        },
+                        "required": ["old_text", "new_text"]
+                    }
+                },
+                "patch": {
+                    "type": "string",
+                    "description": "Unified diff (@@ hunks) to apply to this file, all or nothing"
                 }
             },
-            "required": ["path", "old_text", "new_text"]
+            "required": ["path"]
         }
     
-    async def execute(self, path: str, old_text: str, new_text: str, **kwargs: Any) -> str:
+    async def execute(
+        self,
+        path: str,
+        old_text: str | None = None,
+        new_text: str | None = None,
+        edits: list[dict[str, str]] | None = None,
+        patch: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        modes = sum(x is not None for x in (old_text, edits, patch))
+        if modes != 1:
+            return "Error: provide exactly one of old_text/new_text, edits or patch"
+        if old_text is not None and new_text is None:
+            return "Error: new_text is required with old_text"
         try:
-            file_path = _resolve_path(path, self._allowed_dir)
-            if not file_path.exists():
-                return f"Error: File not found: {path}"
-            
-            content = file_path.read_text(encoding="utf-8")
-            
-            if old_text not in content:
-                return f"Error: old_text not found in file. Make sure it matches exactly."
-            
-            # Count occurrences
-            count = content.count(old_text)
-            if count > 1:
-                return f"Warning: old_text appears {count} times. Please provide more context to make it unique."
-            
-            new_content = content.replace(old_text, new_text, 1)
-            file_path.write_text(new_content, encoding="utf-8")
-            
-            return f"Successfully edited {path}"
+            file_path = await run_io(_resolve_path, path, self._allowed_dir)
+            async with file_lock(file_path):
+                if patch is not None:
+                    return await run_io(self._patch, file_path, path, patch)
+                if edits is not None:
+                    return await run_io(self._edit_many, file_path, path, edits)
+                return await run_io(self._edit, file_path, path, old_text, new_text)
         except PermissionError as e:
             return f"Error: {e}"
         except Exception as e:
             return f"Error editing file: {str(e)}"
 
+    @staticmethod
+    def _edit(file_path: Path, path: str, old_text: str, new_text: str) -> str:
+        if not file_path.exists():
+            return f"Error: File not found: {path}"
+        content = file_path.read_text(encoding="utf-8")
+        
+        if old_text not in content:
+            return f"Error: old_text not found in file. Make sure it matches exactly."
+        
+        # Count occurrences
+        count = content.count(old_text)
+        if count > 1:
+            return f"Warning: old_text appears {count} times. Please provide more context to make it unique."
+        
+        new_content = content.replace(old_text, new_text, 1)
+        atomic_write_text(file_path, new_content)
+        return f"Successfully edited {path}"
+
+    @staticmethod
+    def _edit_many(file_path: Path, path: str, edits: list[dict[str, str]]) -> str:
+        if not file_path.exists():
+            return f"Error: File not found: {path}"
+        if not edits:
+            return "Error: edits is empty"
+        content = file_path.read_text(encoding="utf-8")
+
+        # Later edits see the result of earlier ones
+        problems = []
+        for i, edit in enumerate(edits, 1):
+            count = content.count(edit["old_text"]) if edit["old_text"] else 0
+            if count == 1:
+                content = content.replace(edit["old_text"], edit["new_text"], 1)
+            elif count == 0:
+                problems.append(f"edit {i}: old_text not found")
+            else:
+                problems.append(f"edit {i}: old_text appears {count} times")
+        if problems:
+            return "Error: no changes made; " + "; ".join(problems)
+
+        atomic_write_text(file_path, content)
+        return f"Successfully applied {len(edits)} edits to {path}"
+
+    @staticmethod
+    def _patch(file_path: Path, path: str, patch: str) -> str:
+        if not file_path.exists():
+            return f"Error: File not found: {path}"
+        content = file_path.read_text(encoding="utf-8")
+        try:
+            new_content, hunks = apply_unified_diff(content, patch)
+        except ValueError as e:
+            return f"Error: no changes made; {e}"
+        atomic_write_text(file_path, new_content)
+        return f"Successfully applied {hunks} hunks to {path}"
+
 
 class ListDirTool(Tool):
-    """Tool to list directory contents."""
+    """
+    Tool to list directory contents.
+
+    Walks with os.scandir up to `depth` levels, listing entries lazily in
+    name order with sizes and modification times, and pages the output with
+    offset/limit so huge trees never produce huge tool results. Directories
+    matching DEFAULT_IGNORES or `ignore` are listed but not descended into.
+    """
     
     def __init__(self, allowed_dir: Path | None = None):
         self._allowed_dir = allowed_dir
@@ -173,7 +522,10 @@ class ListDirTool(Tool):
     
     @property
     def description(self) -> str:
-        return "List the contents of a directory."
+        return (
+            "List the contents of a directory with sizes and modification times. "
+            "Set depth > 1 to list subdirectories recursively; page large listings with offset/limit."
+        )
     
     @property
     def parameters(self) -> dict[str, Any]:
@@ -183,29 +535,102 @@ class ListDirTool(Tool):
                 "path": {
                     "type": "string",
                     "description": "The directory path to list"
+                },
+                "depth": {
+                    "type": "integer",
+                    "description": "How many levels to list (1 = this directory only)",
+                    "minimum": 1,
+                    "maximum": 10
+                },
+                "ignore": {
+                    "type": "array",
+                    "description": "Glob patterns of names to leave out (e.g. '*.pyc')",
+                    "items": {"type": "string"}
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Number of entries to skip (for paging)",
+                    "minimum": 0
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum entries to return (default 200)",
+                    "minimum": 1,
+                    "maximum": 2000
                 }
             },
             "required": ["path"]
         }
     
-    async def execute(self, path: str, **kwargs: Any) -> str:
+    async def execute(
+        self,
+        path: str,
+        depth: int = 1,
+        ignore: list[str] | None = None,
+        offset: int = 0,
+        limit: int = 200,
+        **kwargs: Any,
+    ) -> str:
         try:
-            dir_path = _resolve_path(path, self._allowed_dir)
-            if not dir_path.exists():
-                return f"Error: Directory not found: {path}"
-            if not dir_path.is_dir():
-                return f"Error: Not a directory: {path}"
-            
-            items = []
-            for item in sorted(dir_path.iterdir()):
-                prefix = "📁 " if item.is_dir() else "📄 "
-                items.append(f"{prefix}{item.name}")
-            
-            if not items:
-                return f"Directory {path} is empty"
-            
-            return "\n".join(items)
+            return await run_io(self._list, path, depth, ignore or [], offset, limit)
         except PermissionError as e:
             return f"Error: {e}"
         except Exception as e:
             return f"Error listing directory: {str(e)}"
+
+    def _list(self, path: str, depth: int, ignore: list[str], offset: int, limit: int) -> str:
+        dir_path = _resolve_path(path, self._allowed_dir)
+        if not dir_path.exists():
+            return f"Error: Directory not found: {path}"
+        if not dir_path.is_dir():
+            return f"Error: Not a directory: {path}"
+        
+        items = []
+        more = False
+        for i, line in enumerate(self._walk(dir_path, "", depth, ignore)):
+            if i < offset:
+                continue
+            if len(items) == limit:
+                more = True
+                break
+            items.append(line)
+        
+        if not items:
+            return f"Directory {path} is empty" if offset == 0 else f"No entries after offset {offset}"
+        if more:
+            items.append(f"... (more entries; use offset={offset + limit} to continue)")
+        return "\n".join(items)
+
+    def _walk(self, dir_path: Path, prefix: str, depth: int, ignore: list[str]) -> Iterator[str]:
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            yield f"⚠️ {prefix or '.'}: {e.strerror or e}"
+            return
+        for entry in entries:
+            if any(fnmatch.fnmatch(entry.name, pattern) for pattern in ignore):
+                continue
+            rel = f"{prefix}{entry.name}"
+            try:
+                is_dir = entry.is_dir()
+                st = entry.stat()
+            except OSError:
+                yield f"📄 {rel}"
+                continue
+            modified = datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m-%d %H:%M")
+            if not is_dir:
+                yield f"📄 {rel}  ({_format_size(st.st_size)}, {modified})"
+                continue
+            skipped = entry.name in DEFAULT_IGNORES and depth > 1
+            yield f"📁 {rel}/  ({modified}{', not expanded' if skipped else ''})"
+            if depth > 1 and not skipped and not entry.is_symlink():
+                yield from self._walk(Path(entry.path), f"{rel}/", depth - 1, ignore)
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
@@ -0,0 +1,82 @@
+"""Memory search tool: ranked recall over HISTORY.md."""
+
+from typing import Any
+
+from nanobot.agent.memory import MemoryStore
+from nanobot.agent.tools.base import Tool
+
+
+class MemorySearchTool(Tool):
+    """Tool to search past events in the history log."""
+
+    def __init__(self, memory: MemoryStore, max_chars: int = 500):
+        self._memory = memory
+        self._max_chars = max_chars
+        self._session_key: str | None = None
+
+    def set_context(self, session_key: str | None) -> None:
+        """Set the memory namespace to search (None = global history)."""
+        self._session_key = session_key
+
+    @property
+    def name(self) -> str:
+        return "memory_search"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Search past conversations (memory/HISTORY.md and memory/archive/) by keywords. "
+            "Returns the best-matching history entries, optionally filtered by date."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Keywords to search for"
+                },
+                "since": {
+                    "type": "string",
+                    "description": "Only entries on or after this date (YYYY-MM-DD)"
+                },
+                "until": {
+                    "type": "string",
+                    "description": "Only entries on or before this date (YYYY-MM-DD)"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum results (default 5)",
+                    "minimum": 1,
+                    "maximum": 50
+                }
+            },
+            "required": ["query"]
+        }
+
+    async def execute(
+        self,
+        query: str,
+        since: str | None = None,
+        until: str | None = None,
+        limit: int = 5,
+        **kwargs: Any
+    ) -> str:
+        try:
+            hits = self._memory.search_history(
+                query, limit=limit, since=since, until=until, session_key=self._session_key
+            )
+        except Exception as e:
+            return f"Error searching memory: {str(e)}"
+
+        if not hits:
+            return f"No history entries match: {query}"
+        lines = []
+        for hit in hits:
+            text = hit.text if len(hit.text) <= self._max_chars else hit.text[: self._max_chars] + "..."
+            if hit.source != "HISTORY.md":
+                text = f"(from {hit.source}) {text}"
+            lines.append(text)
+        return "\n\n".join(lines)
@@ -1,8 +1,10 @@
 """Tool registry for dynamic tool management."""
 
+import time
 from typing import Any
 
 from nanobot.agent.tools.base import Tool
+from nanobot.metrics.registry import TOOL_CALLS, TOOL_DURATION
 
 
 class ToolRegistry:
@@ -51,15 +53,23 @@ class ToolRegistry:
         """
         tool = self._tools.get(name)
         if not tool:
+            TOOL_CALLS.inc(tool="unknown", status="not_found")
             return f"Error: Tool '{name}' not found"
 
+        start = time.perf_counter()
+        status = "ok"
         try:
             errors = tool.validate_params(params)
             if errors:
+                status = "invalid"
                 return f"Error: Invalid parameters for tool '{name}': " + "; ".join(errors)
             return await tool.execute(**params)
         except Exception as e:
+            status = "error"
             return f"Error executing {name}: {str(e)}"
+        finally:
+            TOOL_CALLS.inc(tool=name, status=status)
+            TOOL_DURATION.observe(time.perf_counter() - start, tool=name)
     
     @property
     def tool_names(self) -> list[str]:
@@ -0,0 +1,221 @@
+"""Resource limits, cgroup placement and usage accounting for exec commands."""
+
+import itertools
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from loguru import logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+_scope_ids = itertools.count(1)
+
+
+@dataclass
+class ResourceLimits:
+    """
+    Per-command limits; 0 means unlimited.
+
+    rlimits apply to every process the command starts, individually:
+    cpu_seconds (SIGXCPU, then SIGKILL a second later), memory_mb (address
+    space), max_file_size_mb (SIGXFSZ) and max_processes (RLIMIT_NPROC,
+    which the kernel counts across all processes of the user, so leave
+    headroom for the gateway itself). When a writable cgroup v2 parent is
+    available, memory_mb, max_processes and cpu_percent are also enforced
+    for the command's whole process tree.
+
+    Limits and priorities are set by the shell itself (see shell_prefix)
+    rather than in a preexec_fn, which is unsafe in a threaded process.
+    """
+    cpu_seconds: int = 0
+    memory_mb: int = 0
+    max_processes: int = 0
+    max_file_size_mb: int = 0
+    cpu_percent: int = 0
+    nice: int = 0
+    idle_io: bool = False
+    cgroup_parent: str = ""
+
+    @property
+    def active(self) -> bool:
+        return any((
+            self.cpu_seconds, self.memory_mb, self.max_processes, self.max_file_size_mb,
+            self.cpu_percent, self.nice, self.idle_io,
+        ))
+
+    def shell_prefix(self, shell: str = "/bin/sh") -> str:
+        """
+        Shell snippet that applies the limits and priorities to the shell and its children.
+
+        `shell` selects units: bash outside POSIX mode counts `ulimit -f` in
+        1024-byte blocks, sh (dash, or bash as sh) in 512-byte blocks. A limit
+        the shell cannot set (e.g. above an existing hard limit) is skipped;
+        the existing, stricter one stays in force.
+        """
+        if os.name != "posix":
+            return ""
+        parts = []
+        if self.cpu_seconds:
+            # Soft limit first: the hard limit may not drop below it
+            parts.append(f"ulimit -S -t {self.cpu_seconds}; ulimit -H -t {self.cpu_seconds + 1}")
+        if self.memory_mb:
+            parts.append(f"ulimit -v {self.memory_mb * 1024}")
+        if self.max_file_size_mb:
+            block = 1024 if Path(shell).name == "bash" else 512
+            parts.append(f"ulimit -f {self.max_file_size_mb * 1024 * 1024 // block}")
+        if self.max_processes:
+            # bash: -u; dash: -p
+            parts.append(f"{{ ulimit -u {self.max_processes} || ulimit -p {self.max_processes}; }}")
+        prefix = "".join(f"{part} 2>/dev/null; " for part in parts)
+        if self.nice and shutil.which("renice"):
+            prefix += f"renice -n {self.nice} -p $$ >/dev/null 2>&1; "
+        if self.idle_io and shutil.which("ionice"):
+            prefix += "ionice -c 3 -p $$ >/dev/null 2>&1; "
+        return prefix
+
+    def describe_exit(self, code: int | None) -> str:
+        """Hint for exit statuses that usually mean a limit was hit."""
+        signals = {24: f"CPU time limit ({self.cpu_seconds}s)", 25: f"file size limit ({self.max_file_size_mb} MB)"}
+        if code is None:
+            return ""
+        sig = -code if code < 0 else code - 128 if code > 128 else 0
+        if sig in signals and (self.cpu_seconds if sig == 24 else self.max_file_size_mb):
+            return f" (killed: {signals[sig]} exceeded)"
+        if sig == 9 and self.memory_mb:
+            return f" (killed; possibly the {self.memory_mb} MB memory limit)"
+        return ""
+
+
+class CgroupScope:
+    """
+    A throwaway cgroup v2 child for one command.
+
+    Only used when the parent group is writable and already delegates the
+    needed controllers (e.g. a systemd unit with Delegate=yes, or a group
+    named in cgroup_parent); otherwise create() returns None and the rlimits
+    alone apply.
+    """
+
+    # The command's stdin must be a pipe: the parent writes a line to it once
+    # add() is done, so nothing the command starts can escape the group.
+    SHELL_PREFIX = "read -r _cgroup_ready; unset _cgroup_ready; "
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @classmethod
+    def create(cls, limits: ResourceLimits) -> "CgroupScope | None":
+        if not (limits.memory_mb or limits.max_processes or limits.cpu_percent):
+            return None
+        parent = Path(limits.cgroup_parent) if limits.cgroup_parent else _own_cgroup()
+        if parent is None or not os.access(parent, os.W_OK):
+            return None
+        try:
+            controllers = (parent / "cgroup.subtree_control").read_text().split()
+        except OSError:
+            return None
+        wanted = {"memory": limits.memory_mb, "pids": limits.max_processes, "cpu": limits.cpu_percent}
+        if any(value and name not in controllers for name, value in wanted.items()):
+            return None
+
+        path = parent / f"nanobot-exec-{os.getpid()}-{next(_scope_ids)}"
+        try:
+            path.mkdir()
+            if limits.memory_mb:
+                (path / "memory.max").write_text(str(limits.memory_mb * 1024 * 1024))
+                if (path / "memory.swap.max").exists():
+                    (path / "memory.swap.max").write_text("0")
+            if limits.max_processes:
+                (path / "pids.max").write_text(str(limits.max_processes))
+            if limits.cpu_percent:
+                (path / "cpu.max").write_text(f"{limits.cpu_percent * 1000} 100000")
+        except OSError as e:
+            logger.debug(f"cgroup setup failed, using rlimits only: {e}")
+            try:
+                path.rmdir()
+            except OSError:
+                pass
+            return None
+        return cls(path)
+
+    def add(self, pid: int) -> bool:
+        """Move a process into the group (called by the parent right after spawning)."""
+        try:
+            (self.path / "cgroup.procs").write_text(str(pid))
+            return True
+        except OSError as e:
+            logger.debug(f"Could not move {pid} into {self.path}: {e}")
+            return False
+
+    def usage(self) -> dict[str, float]:
+        out: dict[str, float] = {}
+        try:
+            for line in (self.path / "cpu.stat").read_text().splitlines():
+                key, _, value = line.partition(" ")
+                if key == "usage_usec":
+                    out["cpu_s"] = int(value) / 1e6
+        except OSError:
+            pass
+        try:
+            out["peak_mb"] = int((self.path / "memory.peak").read_text()) / (1024 * 1024)
+        except (OSError, ValueError):
+            pass
+        return out
+
+    def close(self) -> None:
+        try:
+            if (self.path / "cgroup.kill").exists():
+                (self.path / "cgroup.kill").write_text("1")
+            self.path.rmdir()
+        except OSError as e:
+            logger.debug(f"Could not remove {self.path}: {e}")
+
+
+def _own_cgroup() -> Path | None:
+    try:
+        for line in Path("/proc/self/cgroup").read_text().splitlines():
+            if line.startswith("0::"):
+                return CGROUP_ROOT / line[3:].lstrip("/")
+    except OSError:
+        pass
+    return None
+
+
+class UsageMeter:
+    """
+    Measures wall time and CPU time of one command.
+
+    CPU time comes from the command's cgroup when it has one; otherwise it
+    is the growth of RUSAGE_CHILDREN, which also counts other commands that
+    finished concurrently, so it is reported as approximate.
+    """
+
+    def __init__(self, scope: CgroupScope | None = None):
+        self.scope = scope
+        self._wall = time.monotonic()
+        self._cpu = _children_cpu()
+
+    def summary(self) -> str:
+        parts = [f"wall {time.monotonic() - self._wall:.1f}s"]
+        stats = self.scope.usage() if self.scope else {}
+        if "cpu_s" in stats:
+            parts.append(f"cpu {stats['cpu_s']:.2f}s")
+        elif resource is not None:
+            parts.append(f"cpu ~{_children_cpu() - self._cpu:.2f}s")
+        if "peak_mb" in stats:
+            parts.append(f"peak memory {stats['peak_mb']:.0f} MB")
+        return f"[usage: {', '.join(parts)}]"
+
+
+def _children_cpu() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
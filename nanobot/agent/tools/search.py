@@ -0,0 +1,329 @@
+"""Search tools: glob_files and grep_files over a cached workspace file index."""
+
+import fnmatch
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.filesystem import BINARY_SNIFF_BYTES, DEFAULT_IGNORES, _resolve_path
+from nanobot.utils.helpers import run_io
+
+# grep_files skips files larger than this
+MAX_GREP_FILE_BYTES = 2 * 1024 * 1024
+MAX_LINE_CHARS = 240
+
+
+@dataclass(frozen=True)
+class FileEntry:
+    """One indexed file; path is relative to the index root, in posix form."""
+    path: str
+    size: int
+    mtime: float
+
+
+@dataclass
+class _DirState:
+    mtime_ns: int
+    files: list[str]
+    subdirs: list[str]
+
+
+class FileIndex:
+    """
+    Incrementally maintained list of files under a root directory.
+
+    A directory's mtime changes whenever entries are added, removed or
+    renamed in it, so a refresh re-lists only directories whose mtime moved
+    and reuses the cached listing of the rest. Refreshes within `ttl`
+    seconds of the previous one are skipped entirely. Ignore rules are
+    DEFAULT_IGNORES plus simple name/glob patterns from the root .gitignore.
+
+    Only names are cached: editing a file in place does not touch its
+    directory's mtime, so size and mtime are read when files are selected.
+    """
+
+    def __init__(self, root: Path, ttl: float = 2.0, max_files: int = 200_000):
+        self.root = root.resolve()
+        self.ttl = ttl
+        self.max_files = max_files
+        self._dirs: dict[str, _DirState] = {}
+        self._ignores: list[str] = []
+        self._refreshed_at = 0.0
+        self.truncated = False
+
+    def paths(self) -> list[str]:
+        """Relative paths of all indexed files (refreshing the index if it is stale)."""
+        self.refresh()
+        out: list[str] = []
+        for state in self._dirs.values():
+            out.extend(state.files)
+        return out
+
+    def files(self) -> list[FileEntry]:
+        """All indexed files with their current size and mtime."""
+        return _stat_files(self.root, self.paths())
+
+    def refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and self._dirs and now - self._refreshed_at < self.ttl:
+            return
+        self._ignores = list(DEFAULT_IGNORES) + self._read_gitignore()
+        seen: dict[str, _DirState] = {}
+        pending = [""]
+        count = 0
+        self.truncated = False
+        while pending:
+            rel = pending.pop()
+            state = self._scan_dir(rel)
+            if state is None:
+                continue
+            seen[rel] = state
+            count += len(state.files)
+            if count >= self.max_files:
+                self.truncated = True
+                break
+            pending.extend(state.subdirs)
+        self._dirs = seen
+        self._refreshed_at = now
+
+    def _scan_dir(self, rel: str) -> _DirState | None:
+        path = self.root / rel if rel else self.root
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
+            return None
+        cached = self._dirs.get(rel)
+        if cached is not None and cached.mtime_ns == mtime_ns:
+            return cached
+
+        files: list[str] = []
+        subdirs: list[str] = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    child = f"{rel}/{entry.name}" if rel else entry.name
+                    if self._ignored(entry.name, child):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(child)
+                        elif entry.is_file():
+                            files.append(child)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return _DirState(mtime_ns, files, subdirs)
+
+    def _ignored(self, name: str, rel: str) -> bool:
+        for pattern in self._ignores:
+            if "/" in pattern:
+                if fnmatch.fnmatch(rel, pattern.strip("/")):
+                    return True
+            elif fnmatch.fnmatch(name, pattern):
+                return True
+        return False
+
+    def _read_gitignore(self) -> list[str]:
+        path = self.root / ".gitignore"
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except (OSError, UnicodeDecodeError):
+            return []
+        # Negations and nested .gitignore files are not supported
+        return [line.strip().rstrip("/") for line in lines
+                if line.strip() and not line.startswith(("#", "!"))]
+
+
+def _stat_files(base: Path, paths: list[str], strip: int = 0) -> list[FileEntry]:
+    """FileEntry for each path that still exists, relative to base minus `strip` leading chars."""
+    out: list[FileEntry] = []
+    for path in paths:
+        try:
+            st = os.stat(base / path)
+        except OSError:
+            continue
+        out.append(FileEntry(path[strip:], st.st_size, st.st_mtime))
+    return out
+
+
+def glob_to_regex(pattern: str) -> re.Pattern[str]:
+    """Compile a glob with ** support; patterns without "/" match file names at any depth."""
+    if "/" not in pattern:
+        pattern = "**/" + pattern
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+class _SearchTool(Tool):
+    """Shared path handling for the search tools."""
+
+    def __init__(self, workspace: Path, index: FileIndex | None = None, allowed_dir: Path | None = None):
+        self._workspace = workspace
+        self._index = index or FileIndex(workspace)
+        self._allowed_dir = allowed_dir
+
+    def _select(self, path: str | None, glob: str | None) -> tuple[Path, list[FileEntry]]:
+        """Files under `path` (default: workspace), relative to that path, filtered by glob."""
+        base = _resolve_path(path or str(self._workspace), self._allowed_dir)
+        if not base.is_dir():
+            raise NotADirectoryError(f"Not a directory: {path}")
+        root = self._index.root
+        if base == root or base.is_relative_to(root):
+            prefix = "" if base == root else base.relative_to(root).as_posix() + "/"
+            paths = [p for p in self._index.paths() if p.startswith(prefix)]
+        else:
+            root, prefix, paths = base, "", FileIndex(base).paths()
+        if glob:
+            regex = glob_to_regex(glob)
+            paths = [p for p in paths if regex.match(p[len(prefix):])]
+        # Stat only the selected files, so in-place edits are always reflected
+        return base, _stat_files(root, paths, len(prefix))
+
+
+class GlobFilesTool(_SearchTool):
+    """Find files by glob pattern."""
+
+    @property
+    def name(self) -> str:
+        return "glob_files"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Find files by glob pattern (e.g. '**/*.py', 'src/**/test_*.py', '*.md'), most recently "
+            "modified first. Skips .git, node_modules, virtualenvs and .gitignore'd paths."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "pattern": {"type": "string", "description": "Glob pattern; without '/' it matches file names at any depth"},
+                "path": {"type": "string", "description": "Directory to search (default: workspace)"},
+                "limit": {"type": "integer", "description": "Maximum results (default 100)", "minimum": 1, "maximum": 1000},
+            },
+            "required": ["pattern"],
+        }
+
+    async def execute(self, pattern: str, path: str | None = None, limit: int = 100, **kwargs: Any) -> str:
+        try:
+            base, entries = await run_io(self._select, path, pattern)
+        except PermissionError as e:
+            return f"Error: {e}"
+        except Exception as e:
+            return f"Error searching files: {e}"
+        if not entries:
+            return f"No files matching '{pattern}' in {base}"
+        entries.sort(key=lambda e: e.mtime, reverse=True)
+        lines = [e.path for e in entries[:limit]]
+        if len(entries) > limit:
+            lines.append(f"... ({len(entries) - limit} more; narrow the pattern or raise limit)")
+        return "\n".join(lines)
+
+
+class GrepFilesTool(_SearchTool):
+    """Search file contents by regular expression."""
+
+    @property
+    def name(self) -> str:
+        return "grep_files"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Search file contents with a regular expression. Returns 'path:line: text' matches. "
+            "Use glob to restrict which files are searched (e.g. '*.py'). Binary and very large files are skipped."
+        )
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "pattern": {"type": "string", "description": "Regular expression (Python syntax)"},
+                "path": {"type": "string", "description": "Directory to search (default: workspace)"},
+                "glob": {"type": "string", "description": "Only search files matching this glob"},
+                "ignore_case": {"type": "boolean", "description": "Case-insensitive match"},
+                "limit": {"type": "integer", "description": "Maximum matching lines (default 100)", "minimum": 1, "maximum": 1000},
+            },
+            "required": ["pattern"],
+        }
+
+    async def execute(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        ignore_case: bool = False,
+        limit: int = 100,
+        **kwargs: Any,
+    ) -> str:
+        try:
+            regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+        except re.error as e:
+            return f"Error: invalid regex: {e}"
+        try:
+            base, entries = await run_io(self._select, path, glob)
+        except PermissionError as e:
+            return f"Error: {e}"
+        except Exception as e:
+            return f"Error searching files: {e}"
+
+        entries = sorted((e for e in entries if e.size <= MAX_GREP_FILE_BYTES), key=lambda e: e.path)
+        # One worker scans in path order, so the first `limit` matches are deterministic
+        # and the rest of the I/O pool stays free for other tool calls
+        matches = await run_io(self._scan, base, entries, regex, limit)
+        if not matches:
+            return f"No matches for '{pattern}' in {base}"
+        lines = [f"{p}:{n}: {text}" for p, n, text in matches[:limit]]
+        if len(matches) >= limit:
+            lines.append(f"... (stopped at {limit} matches; narrow the search or raise limit)")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _scan(
+        base: Path, entries: list[FileEntry], regex: re.Pattern[str], limit: int
+    ) -> list[tuple[str, int, str]]:
+        matches: list[tuple[str, int, str]] = []
+        for entry in entries:
+            if len(matches) >= limit:
+                break
+            try:
+                data = (base / entry.path).read_bytes()
+            except OSError:
+                continue
+            if b"\x00" in data[:BINARY_SNIFF_BYTES]:
+                continue
+            text = data.decode("utf-8", errors="replace")
+            # Cheap whole-file check before splitting into lines
+            if not regex.search(text):
+                continue
+            for lineno, line in enumerate(text.splitlines(), 1):
+                if regex.search(line):
+                    matches.append((entry.path, lineno, line.strip()[:MAX_LINE_CHARS]))
+                    if len(matches) >= limit:
+                        break
+        return matches
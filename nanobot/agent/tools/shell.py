@@ -3,14 +3,106 @@
 import asyncio
 import os
 import re
+import shlex
+import signal
+import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
 
 from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.sandbox import CgroupScope, ResourceLimits, UsageMeter
+from nanobot.agent.tools.shell_session import (
+    KILL_GRACE,
+    READ_CHUNK,
+    ShellSessionPool,
+    default_shell,
+)
+from nanobot.bus.events import OutboundMessage
+
+
+class _StreamCapture:
+    """Keeps the first and last bytes of a stream, within a fixed byte budget."""
+
+    def __init__(self, budget: int):
+        self.head_limit = budget * 3 // 5
+        self.tail_limit = budget - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def feed(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            if len(self.tail) > self.tail_limit:
+                del self.tail[: len(self.tail) - self.tail_limit]
+
+    def last_line(self) -> str:
+        data = self.tail or self.head
+        lines = bytes(data).decode("utf-8", errors="replace").strip().splitlines()
+        return lines[-1] if lines else ""
+
+    def render(self) -> str:
+        omitted = self.total - len(self.head) - len(self.tail)
+        head = bytes(self.head).decode("utf-8", errors="replace")
+        tail = bytes(self.tail).decode("utf-8", errors="replace")
+        if omitted <= 0:
+            return head + tail
+        return f"{head}\n... (truncated, {omitted} bytes omitted) ...\n{tail}"
+
+
+def _kill_group(process: asyncio.subprocess.Process) -> None:
+    """Kill the process and everything it started (its process group on POSIX)."""
+    if process.returncode is not None:
+        return
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _wait_exit(process: asyncio.subprocess.Process, timeout: float) -> bool:
+    """
+    Wait for the process itself to exit. Unlike wait(), this does not also
+    wait for its pipes to close, which an escaped grandchild may keep open.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while process.returncode is None:
+        if loop.time() >= deadline:
+            return False
+        await asyncio.sleep(0.05)
+    return True
 
 
 class ExecTool(Tool):
-    """Tool to execute shell commands."""
+    """
+    Tool to execute shell commands.
+
+    Output is read incrementally and only the head and tail of each stream
+    are kept (max_output_bytes), so chatty commands cannot exhaust memory; a
+    command producing more than kill_after_bytes in total is killed early.
+    Timeouts and early kills take down the whole process group. With a
+    progress_callback, commands running longer than progress_interval
+    seconds post periodic status updates to the current chat.
+
+    With persistent_sessions, commands from the same agent session run in one
+    long-lived shell (see ShellSession), so cd, environment variables and
+    activated virtualenvs persist between calls.
+
+    `limits` (see ResourceLimits) caps CPU, memory, processes and file size
+    per command, lowers its CPU/I/O priority, places it in its own cgroup
+    when one can be created, and appends a usage line to the result.
+    """
     
     def __init__(
         self,
@@ -19,6 +111,14 @@ class ExecTool(Tool):
         deny_patterns: list[str] | None = None,
         allow_patterns: list[str] | None = None,
         restrict_to_workspace: bool = False,
+        max_output_bytes: int = 10_000,
+        kill_after_bytes: int = 16 * 1024 * 1024,
+        progress_interval: float = 30,
+        progress_callback: Callable[[OutboundMessage], Awaitable[None]] | None = None,
+        persistent_sessions: bool = False,
+        max_sessions: int = 8,
+        session_idle_timeout: float = 900,
+        limits: ResourceLimits | None = None,
     ):
         self.timeout = timeout
         self.working_dir = working_dir
@@ -34,15 +134,24 @@ class ExecTool(Tool):
         ]
         self.allow_patterns = allow_patterns or []
         self.restrict_to_workspace = restrict_to_workspace
+        self.max_output_bytes = max_output_bytes
+        self.kill_after_bytes = kill_after_bytes
+        self.progress_interval = progress_interval
+        self.progress_callback = progress_callback
+        self.limits = limits or ResourceLimits()
+        self.sessions = ShellSessionPool(
+            max_sessions,
+            session_idle_timeout,
+            init=self.limits.shell_prefix(default_shell()),
+        ) if persistent_sessions else None
+        self._channel = ""
+        self._chat_id = ""
+        self._session_key = ""
     
     @property
     def name(self) -> str:
         return "exec"
     
-    @property
-    def description(self) -> str:
-        return "Execute a shell command and return its output. Use with caution."
-    
     @property
     def parameters(self) -> dict[str, Any]:
         return {
@@ -60,53 +169,227 @@ class ExecTool(Tool):
             "required": ["command"]
         }
     
+    @property
+    def description(self) -> str:
+        if self.sessions is None:
+            return "Execute a shell command and return its output. Use with caution."
+        return (
+            "Execute a shell command and return its output (stdout and stderr combined). Use with caution. "
+            "Commands run in a persistent shell for this conversation: cd, exported variables and "
+            "activated virtualenvs carry over to later calls."
+        )
+
+    def set_context(self, channel: str, chat_id: str, session_key: str | None = None) -> None:
+        """Set the chat that progress updates go to and the shell session to use."""
+        self._channel = channel
+        self._chat_id = chat_id
+        self._session_key = session_key or f"{channel}:{chat_id}"
+
+    async def reset_session(self, session_key: str) -> None:
+        """Close the persistent shell of an agent session, if any."""
+        if self.sessions is not None:
+            await self.sessions.close(session_key)
+
+    async def close(self) -> None:
+        """Close all persistent shells (on shutdown)."""
+        if self.sessions is not None:
+            await self.sessions.close_all()
+
     async def execute(self, command: str, working_dir: str | None = None, **kwargs: Any) -> str:
         cwd = working_dir or self.working_dir or os.getcwd()
         guard_error = self._guard_command(command, cwd)
         if guard_error:
             return guard_error
+        if self.sessions is not None and self._session_key:
+            return await self._execute_in_session(command, working_dir)
         
+        limits = self.limits
+        scope = CgroupScope.create(limits) if limits.active else None
+        meter = UsageMeter(scope) if limits.active else None
         try:
             process = await asyncio.create_subprocess_shell(
-                command,
+                (CgroupScope.SHELL_PREFIX if scope else "") + limits.shell_prefix() + command,
+                stdin=asyncio.subprocess.PIPE if scope else None,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 cwd=cwd,
+                # Own process group, so the whole pipeline can be killed at once
+                start_new_session=os.name == "posix",
             )
-            
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=self.timeout
-                )
-            except asyncio.TimeoutError:
-                process.kill()
-                return f"Error: Command timed out after {self.timeout} seconds"
+            if scope:
+                # The shell waits for this line, so it is in the group before starting anything
+                scope.add(process.pid)
+                try:
+                    process.stdin.write(b"\n")
+                    process.stdin.close()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+            stdout = _StreamCapture(self.max_output_bytes)
+            stderr = _StreamCapture(self.max_output_bytes // 2)
+            status = await self._collect(process, command, stdout, stderr)
             
             output_parts = []
+            if status == "timeout":
+                output_parts.append(f"Error: Command timed out after {self.timeout} seconds")
+            elif status == "flood":
+                output_parts.append(
+                    f"Error: Command killed after producing more than {self.kill_after_bytes} bytes of output"
+                )
             
-            if stdout:
-                output_parts.append(stdout.decode("utf-8", errors="replace"))
+            if stdout.total:
+                output_parts.append(stdout.render())
             
-            if stderr:
-                stderr_text = stderr.decode("utf-8", errors="replace")
+            if stderr.total:
+                stderr_text = stderr.render()
                 if stderr_text.strip():
                     output_parts.append(f"STDERR:\n{stderr_text}")
             
-            if process.returncode != 0:
-                output_parts.append(f"\nExit code: {process.returncode}")
-            
-            result = "\n".join(output_parts) if output_parts else "(no output)"
+            if status is None and process.returncode != 0:
+                output_parts.append(f"\nExit code: {process.returncode}{limits.describe_exit(process.returncode)}")
+            if meter:
+                output_parts.append(meter.summary())
             
-            # Truncate very long output
-            max_len = 10000
-            if len(result) > max_len:
-                result = result[:max_len] + f"\n... (truncated, {len(result) - max_len} more chars)"
-            
-            return result
+            return "\n".join(output_parts) if output_parts else "(no output)"
             
         except Exception as e:
             return f"Error executing command: {str(e)}"
+        finally:
+            if scope:
+                scope.close()
+
+    async def _collect(
+        self,
+        process: asyncio.subprocess.Process,
+        command: str,
+        stdout: "_StreamCapture",
+        stderr: "_StreamCapture",
+    ) -> str | None:
+        """
+        Read both pipes incrementally until the process exits.
+
+        Returns None on normal exit, "timeout" or "flood" if the process group
+        had to be killed.
+        """
+        limit = self.kill_after_bytes
+        flooded = asyncio.Event()
+
+        async def pump(stream: asyncio.StreamReader, capture: _StreamCapture) -> None:
+            # Keep draining after the limit is hit: the process only finishes
+            # (and wait() returns) once both pipes reach EOF
+            while chunk := await stream.read(READ_CHUNK):
+                capture.feed(chunk)
+                if stdout.total + stderr.total > limit:
+                    flooded.set()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        readers = asyncio.ensure_future(asyncio.gather(pump(process.stdout, stdout), pump(process.stderr, stderr)))
+        flood_wait = asyncio.ensure_future(flooded.wait())
+        status = None
+        try:
+            while not readers.done():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    status = "timeout"
+                    break
+                step = min(remaining, self.progress_interval) if self._progress_enabled else remaining
+                await asyncio.wait({readers, flood_wait}, timeout=step, return_when=asyncio.FIRST_COMPLETED)
+                if flooded.is_set():
+                    status = "flood"
+                    break
+                if not readers.done() and self._progress_enabled:
+                    await self._report_progress(command, self.timeout - (deadline - loop.time()), stdout)
+
+            if status is None:
+                # Pipes closed; the process itself may still be finishing
+                try:
+                    await asyncio.wait_for(process.wait(), timeout=max(deadline - loop.time(), 0.1))
+                except asyncio.TimeoutError:
+                    status = "timeout"
+            if status is not None:
+                _kill_group(process)
+                try:
+                    await asyncio.wait_for(asyncio.shield(readers), timeout=KILL_GRACE)
+                except asyncio.TimeoutError:
+                    # Something outside the group still holds the pipes open;
+                    # stop reading and keep what was captured so far
+                    readers.cancel()
+                if not await _wait_exit(process, KILL_GRACE):
+                    logger.warning(f"Command still running {KILL_GRACE}s after kill: {command[:80]}")
+        finally:
+            flood_wait.cancel()
+            if not readers.done():
+                readers.cancel()
+            await asyncio.gather(readers, flood_wait, return_exceptions=True)
+        return status
+
+    async def _execute_in_session(self, command: str, working_dir: str | None) -> str:
+        if working_dir:
+            # A subshell keeps the per-call directory from becoming the session's cwd
+            command = f"(cd {shlex.quote(working_dir)} || exit\n{command}\n)"
+        if self.restrict_to_workspace:
+            # The guard only sees this command, but the shell keeps the cwd an
+            # earlier one left behind (e.g. `cd ~`); pull it back first
+            root = shlex.quote(str(Path(self.working_dir or os.getcwd()).resolve()))
+            command = (
+                f'case "$(pwd -P)/" in {root}/*) ;; *) cd {root} && '
+                f'echo "(working directory reset to $PWD)";; esac; {command}'
+            )
+        output = _StreamCapture(self.max_output_bytes)
+        started = time.monotonic()
+        try:
+            session = await self.sessions.get(self._session_key, self.working_dir or os.getcwd())
+            async with session.lock:
+                code, status = await session.run(
+                    command,
+                    output.feed,
+                    timeout=self.timeout,
+                    max_bytes=self.kill_after_bytes,
+                    progress=(lambda: self._report_progress(command, time.monotonic() - started, output))
+                    if self._progress_enabled else None,
+                    progress_interval=self.progress_interval,
+                )
+        except Exception as e:
+            await self.sessions.close(self._session_key)
+            return f"Error executing command: {str(e)}"
+
+        output_parts = []
+        if status == "timeout":
+            output_parts.append(f"Error: Command timed out after {self.timeout} seconds; the shell session was restarted")
+        elif status == "flood":
+            output_parts.append(
+                f"Error: Command killed after producing more than {self.kill_after_bytes} bytes of output; "
+                "the shell session was restarted"
+            )
+        if output.total:
+            output_parts.append(output.render())
+        if status == "exited":
+            output_parts.append(f"\nExit code: {code} (the shell exited; the next command starts a new session)")
+        elif status is None and code != 0:
+            output_parts.append(f"\nExit code: {code}{self.limits.describe_exit(code)}")
+        return "\n".join(output_parts) if output_parts else "(no output)"
+
+    @property
+    def _progress_enabled(self) -> bool:
+        # Nothing consumes outbound messages in direct CLI mode
+        return bool(
+            self.progress_callback and self.progress_interval > 0 and self._chat_id and self._channel != "cli"
+        )
+
+    async def _report_progress(self, command: str, elapsed: float, stdout: "_StreamCapture") -> None:
+        last_line = stdout.last_line()
+        content = f"⏳ Still running after {int(elapsed)}s: `{command[:80]}`"
+        if last_line:
+            content += f"\n{last_line[:200]}"
+        try:
+            await self.progress_callback(OutboundMessage(
+                channel=self._channel,
+                chat_id=self._chat_id,
+                content=content,
+                metadata={"progress": True},
+            ))
+        except Exception as e:
+            logger.debug(f"Exec progress update failed: {e}")
 
     def _guard_command(self, command: str, cwd: str) -> str | None:
         """Best-effort safety guard for potentially destructive commands."""
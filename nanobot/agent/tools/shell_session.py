@@ -0,0 +1,208 @@
+"""Persistent shell sessions for the exec tool."""
+
+import asyncio
+import os
+import secrets
+import shlex
+import shutil
+import signal
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+READ_CHUNK = 64 * 1024
+KILL_GRACE = 5
+
+
+def default_shell() -> str:
+    """Shell used for persistent sessions: bash if installed, else sh."""
+    return shutil.which("bash") or "/bin/sh"
+
+
+class ShellSession:
+    """
+    One long-lived shell process that runs commands one at a time.
+
+    Each command is sent as `eval '<command>' </dev/null 2>&1` followed by a
+    printf of a random sentinel and the exit status, and output is read up
+    to that sentinel. eval runs in the shell itself, so cd, exported
+    variables and activated virtualenvs carry over to the next command,
+    while a syntax error only fails that one command. stdin is /dev/null so
+    a command cannot swallow the commands that follow it.
+    """
+
+    def __init__(self, cwd: str, shell: str | None = None, init: str = ""):
+        self.cwd = cwd
+        self.shell = shell or default_shell()
+        self.init = init
+        self.process: asyncio.subprocess.Process | None = None
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self) -> None:
+        argv = [self.shell, "--noprofile", "--norc"] if self.shell.endswith("bash") else [self.shell]
+        self.process = await asyncio.create_subprocess_exec(
+            *argv,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            cwd=self.cwd,
+            start_new_session=os.name == "posix",
+        )
+        if self.init:
+            self.process.stdin.write(f"{self.init}\n".encode())
+
+    async def run(
+        self,
+        command: str,
+        feed: Callable[[bytes], None],
+        timeout: float,
+        max_bytes: int,
+        progress: Callable[[], Awaitable[None]] | None = None,
+        progress_interval: float = 0,
+    ) -> tuple[int | None, str | None]:
+        """
+        Run one command, passing its output to `feed`.
+
+        Returns (exit code, status); status is None on normal completion,
+        "exited" if the command ended the shell, or "timeout"/"flood" if the
+        session had to be killed (the next command starts a fresh shell).
+        """
+        if not self.alive:
+            await self.start()
+        self.last_used = time.monotonic()
+        marker = f"__nanobot_{secrets.token_hex(8)}__"
+        script = f"eval {shlex.quote(command)} </dev/null 2>&1\nprintf '\\n{marker}%s\\n' \"$?\"\n"
+        self.process.stdin.write(script.encode())
+        await self.process.stdin.drain()
+
+        needle = f"\n{marker}".encode()
+        keep = len(needle)
+        pending = b""
+        total = 0
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        next_tick = loop.time() + progress_interval if progress and progress_interval > 0 else float("inf")
+        while True:
+            now = loop.time()
+            if now >= deadline:
+                await self.close()
+                return None, "timeout"
+            try:
+                chunk = await asyncio.wait_for(
+                    self.process.stdout.read(READ_CHUNK), timeout=min(deadline, next_tick) - now
+                )
+            except asyncio.TimeoutError:
+                if loop.time() >= next_tick:
+                    await progress()
+                    next_tick += progress_interval
+                continue
+
+            if not chunk:
+                # The command ended the shell (e.g. `exit`)
+                feed(pending)
+                code = await self.process.wait()
+                self.process = None
+                return code, "exited"
+
+            pending += chunk
+            idx = pending.find(needle)
+            if idx >= 0:
+                end = pending.find(b"\n", idx + keep)
+                if end < 0:
+                    continue
+                feed(pending[:idx])
+                status = pending[idx + keep:end].decode(errors="replace")
+                self.last_used = time.monotonic()
+                return (int(status) if status.isdigit() else None), None
+
+            # Hold back enough bytes to recognise a sentinel split across reads
+            if len(pending) > keep:
+                total += len(pending) - keep
+                feed(pending[:-keep])
+                pending = pending[-keep:]
+            if total > max_bytes:
+                await self.close()
+                return None, "flood"
+
+    async def close(self) -> None:
+        """Kill the shell and everything it started."""
+        process, self.process = self.process, None
+        if process is None:
+            return
+        if process.returncode is None:
+            try:
+                if os.name == "posix":
+                    os.killpg(process.pid, signal.SIGKILL)
+                else:
+                    process.kill()
+            except (ProcessLookupError, PermissionError):
+                pass
+        try:
+            # wait() only returns once the pipes are drained and closed
+            async def drain() -> None:
+                while await process.stdout.read(READ_CHUNK):
+                    pass
+                await process.wait()
+
+            await asyncio.wait_for(drain(), timeout=KILL_GRACE)
+        except Exception as e:
+            logger.debug(f"Shell session did not shut down cleanly: {e}")
+
+
+class ShellSessionPool:
+    """
+    Shell sessions by agent session key, capped in number and closed when idle.
+
+    Over the cap, the least recently used idle session is closed; sessions
+    running a command are never evicted, so the pool may briefly exceed
+    max_sessions while all of them are busy.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 8,
+        idle_timeout: float = 900,
+        init: str = "",
+    ):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.init = init
+        self._sessions: OrderedDict[str, ShellSession] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def get(self, key: str, cwd: str) -> ShellSession:
+        await self._reap()
+        session = self._sessions.get(key)
+        if session is None:
+            session = ShellSession(cwd, init=self.init)
+            self._sessions[key] = session
+            while len(self._sessions) > self.max_sessions:
+                idle = next((k for k, s in self._sessions.items() if k != key and not s.lock.locked()), None)
+                if idle is None:
+                    break
+                await self._sessions.pop(idle).close()
+        self._sessions.move_to_end(key)
+        return session
+
+    async def close(self, key: str) -> None:
+        if session := self._sessions.pop(key, None):
+            await session.close()
+
+    async def close_all(self) -> None:
+        for key in list(self._sessions):
+            await self.close(key)
+
+    async def _reap(self) -> None:
+        cutoff = time.monotonic() - self.idle_timeout
+        for key, session in list(self._sessions.items()):
+            if session.last_used < cutoff and not session.lock.locked():
+                await self.close(key)
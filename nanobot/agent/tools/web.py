@@ -1,33 +1,291 @@
 """Web tools: web_search and web_fetch."""
 
-import html
+import asyncio
 import json
 import os
-import re
-from typing import Any
+from typing import Any, Mapping
 from urllib.parse import urlparse
 
 import httpx
 
 from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.web_cache import CachedResponse, WebCache
+from nanobot.utils.helpers import run_io
 
 # Shared constants
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_7_2) AppleWebKit/537.36"
 MAX_REDIRECTS = 5  # Limit redirects to prevent DoS attacks
+MAX_FETCH_BYTES = 5 * 1024 * 1024  # Bytes read from the network per fetch
+CHUNK_SIZE = 64 * 1024
 
 
-def _strip_tags(text: str) -> str:
-    """Remove HTML tags and decode entities."""
-    text = re.sub(r'<script[\s\S]*?</script>', '', text, flags=re.I)
-    text = re.sub(r'<style[\s\S]*?</style>', '', text, flags=re.I)
-    text = re.sub(r'<[^>]+>', '', text)
-    return html.unescape(text).strip()
+# Tags whose content is dropped, and tags that start a new paragraph
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "head"}
+_BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "header", "footer", "aside", "nav",
+    "figure", "figcaption", "blockquote", "dl", "dt", "dd", "address", "form",
+}
+_INLINE_MARKS = {"strong": "**", "b": "**", "em": "*", "i": "*"}
 
 
-def _normalize(text: str) -> str:
-    """Normalize whitespace."""
-    text = re.sub(r'[ \t]+', ' ', text)
-    return re.sub(r'\n{3,}', '\n\n', text).strip()
+class _HTMLConverter:
+    """
+    Single-pass HTML to markdown (or plain text) converter.
+
+    The HTML is parsed once by lxml (in C) and output is written during one
+    walk over the tree, instead of one regex pass over the whole page per
+    construct. Handles headings, links, emphasis, nested lists, fenced code
+    blocks (whitespace preserved), blockquotes and tables; nested tables
+    are flattened into the enclosing cell.
+    """
+
+    def __init__(self, markdown: bool = True):
+        self.markdown = markdown
+        self.out: list[str] = []
+        self._sink = self.out       # Current cell while inside a table, else out
+        self._newlines = 2          # Trailing newlines in out (2 = start of document)
+        self._space = True          # Last char written was whitespace
+        self._skip = 0
+        self._pre = 0
+        self._fence_pending = False
+        self._lists: list[list[int]] = []   # [ordered, next number] per open list
+        self._links: list[tuple[list[str], int, str, int]] = []
+        self._quotes: list[int] = []        # Start index in out per open blockquote
+        self._tables = 0
+        self._rows: list[list[str]] = []
+        self._row: list[str] | None = None
+        self._cell: list[str] | None = None
+
+    def convert(self, html: str) -> str:
+        from lxml import etree
+
+        # Plain etree elements (not lxml.html's) skip a Python class lookup per node
+        root = etree.HTML(html)
+        if root is None:
+            return ""
+        start, end, data = self.handle_starttag, self.handle_endtag, self.handle_data
+        for event, el in etree.iterwalk(root, events=("start", "end")):
+            tag = el.tag
+            if event == "start":
+                if tag.__class__ is str:  # Comments and processing instructions are not
+                    start(tag, el.attrib)
+                    if el.text:
+                        data(el.text)
+            else:
+                if tag.__class__ is str:
+                    end(tag)
+                if el.tail and el is not root:
+                    data(el.tail)
+        self._end_table()
+        return "".join(self.out).strip()
+
+    # Output helpers
+    def _write(self, text: str, newlines: int = 0) -> None:
+        """Append text that ends with `newlines` line breaks (callers know, so no rescan)."""
+        self._sink.append(text)
+        self._space = text[-1] in " \n\t"
+        if self._sink is self.out:
+            self._newlines = newlines
+
+    def _break(self, n: int = 1) -> None:
+        if self._cell is not None:
+            if not self._space:
+                self._write(" ")
+            return
+        if self._newlines >= n:
+            return
+        if self.out and not self._pre and self.out[-1].endswith(" "):
+            self.out[-1] = self.out[-1].rstrip(" ")
+        self._write("\n" * (n - self._newlines), n)
+
+    def handle_starttag(self, tag: str, attrs: Mapping[str, str]) -> None:
+        if self._skip or tag in _SKIP_TAGS:
+            self._skip += tag in _SKIP_TAGS
+            return
+        md = self.markdown
+        if tag in _BLOCK_TAGS:
+            self._break(2)
+            if tag == "blockquote" and md and self._cell is None:
+                self._quotes.append(len(self.out))
+        elif tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            self._break(2)
+            if md:
+                self._write("#" * int(tag[1]) + " ")
+        elif tag == "br":
+            self._write("\n", self._newlines + 1) if self._pre else self._break(1)
+        elif tag == "hr":
+            self._break(2)
+            if md:
+                self._write("---")
+            self._break(2)
+        elif tag in ("ul", "ol"):
+            self._break(1 if self._lists else 2)
+            self._lists.append([tag == "ol", 1])
+        elif tag == "li":
+            self._break(1)
+            indent = "  " * max(len(self._lists) - 1, 0)
+            if self._lists and self._lists[-1][0]:
+                marker = f"{self._lists[-1][1]}. "
+                self._lists[-1][1] += 1
+            else:
+                marker = "- "
+            self._write(indent + marker)
+        elif tag == "pre":
+            self._break(2)
+            self._pre += 1
+            self._fence_pending = md
+            if md and (lang := _code_language(attrs)):
+                self._open_fence(lang)
+        elif tag == "code":
+            if self._pre:
+                if self._fence_pending:
+                    self._open_fence(_code_language(attrs))
+            elif md:
+                self._write("`")
+        elif tag in _INLINE_MARKS and md and not self._pre:
+            self._write(_INLINE_MARKS[tag])
+        elif tag == "a" and md:
+            href = attrs.get("href") or ""
+            if href and not href.startswith(("#", "javascript:")):
+                self._links.append((self._sink, len(self._sink), href, self._newlines))
+                self._write("[")
+        elif tag == "table":
+            self._tables += 1
+            if self._tables == 1:
+                self._break(2)
+                self._rows = []
+        elif tag == "tr" and self._tables == 1:
+            self._end_row()
+            self._row = []
+        elif tag in ("td", "th") and self._tables == 1:
+            self._end_cell()
+            if self._row is None:
+                self._row = []
+            self._cell = []
+            self._sink = self._cell
+            self._space = True
+        elif tag in ("td", "th", "tr") and self._cell is not None:
+            self._write(" ")
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._skip:
+            self._skip -= tag in _SKIP_TAGS
+            return
+        md = self.markdown
+        if tag in _BLOCK_TAGS or tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+            self._break(2)
+            if tag == "blockquote" and md and self._quotes and self._cell is None:
+                self._end_quote(self._quotes.pop())
+        elif tag in ("ul", "ol"):
+            if self._lists:
+                self._lists.pop()
+            self._break(1 if self._lists else 2)
+        elif tag == "li":
+            self._break(1)
+        elif tag == "pre" and self._pre:
+            self._pre -= 1
+            if md and not self._fence_pending:
+                self._break(1)
+                self._write("```")
+            self._fence_pending = False
+            self._break(2)
+        elif tag == "code" and not self._pre and md:
+            self._write("`")
+        elif tag in _INLINE_MARKS and md and not self._pre:
+            self._write(_INLINE_MARKS[tag])
+        elif tag == "a" and md and self._links:
+            sink, start, href, newlines = self._links.pop()
+            if not "".join(sink[start + 1:]).strip():  # No link text
+                del sink[start:]
+                self._space = not sink or sink[-1][-1].isspace()
+                if sink is self.out:
+                    self._newlines = newlines
+            elif sink is self._sink:
+                self._write(f"]({href})")
+        elif tag in ("td", "th") and self._tables == 1:
+            self._end_cell()
+        elif tag == "tr" and self._tables == 1:
+            self._end_row()
+        elif tag == "table" and self._tables:
+            self._tables -= 1
+            if not self._tables:
+                self._end_table()
+                self._break(2)
+
+    def handle_data(self, data: str) -> None:
+        if self._skip:
+            return
+        if self._pre:
+            if self._fence_pending:
+                self._open_fence("")
+            stripped = data.rstrip("\n")
+            self._write(data, len(data) - len(stripped) + (0 if stripped else self._newlines))
+            return
+        text = " ".join(data.split())
+        if data[:1].isspace() and not self._space:
+            text = " " + text
+        if data[-1:].isspace() and text.strip():
+            text += " "
+        if text.strip() or (text and not self._space):
+            self._write(text)
+
+    def _end_quote(self, start: int) -> None:
+        """Prefix every line written since `start` with "> " (nested quotes nest)."""
+        body = "".join(self.out[start:]).strip("\n")
+        del self.out[start:]
+        if body:
+            self._write("\n".join(f"> {line}" if line else ">" for line in body.split("\n")))
+        self._break(2)
+
+    def _open_fence(self, lang: str) -> None:
+        self._fence_pending = False
+        self._write(f"```{lang}\n", 1)
+
+    # Tables
+    def _end_cell(self) -> None:
+        if self._cell is None:
+            return
+        text = " ".join("".join(self._cell).split())
+        self._row.append(text.replace("|", "\\|") if self.markdown else text)
+        self._cell = None
+        self._sink = self.out
+
+    def _end_row(self) -> None:
+        self._end_cell()
+        if self._row:
+            self._rows.append(self._row)
+        self._row = None
+
+    def _end_table(self) -> None:
+        self._end_row()
+        rows, self._rows = self._rows, []
+        if not rows:
+            return
+        width = max(len(row) for row in rows)
+        lines = []
+        for i, row in enumerate(rows):
+            cells = row + [""] * (width - len(row))
+            if self.markdown:
+                lines.append("| " + " | ".join(cells) + " |")
+                if i == 0:
+                    lines.append("|" + " --- |" * width)
+            else:
+                lines.append(" | ".join(cells).rstrip())
+        self._break(2)
+        self._write("\n".join(lines))
+        self._break(2)
+
+
+def _code_language(attrs: Mapping[str, str]) -> str:
+    for cls in (attrs.get("class") or "").split():
+        if cls.startswith(("language-", "lang-")):
+            return cls.split("-", 1)[1]
+    return ""
+
+
+def _html_to_text(html: str, markdown: bool = True) -> str:
+    """Convert HTML to markdown, or to plain text with paragraph breaks."""
+    return _HTMLConverter(markdown).convert(html)
 
 
 def _validate_url(url: str) -> tuple[bool, str]:
@@ -105,12 +363,15 @@ class WebFetchTool(Tool):
         "required": ["url"]
     }
     
-    def __init__(self, max_chars: int = 50000):
+    def __init__(self, max_chars: int = 50000, cache: WebCache | None = None, max_bytes: int = MAX_FETCH_BYTES):
         self.max_chars = max_chars
+        self.cache = cache
+        self.max_bytes = max_bytes
+    
+    def _client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(follow_redirects=True, max_redirects=MAX_REDIRECTS, timeout=30.0)
     
     async def execute(self, url: str, extractMode: str = "markdown", maxChars: int | None = None, **kwargs: Any) -> str:
-        from readability import Document
-
         max_chars = maxChars or self.max_chars
 
         # Validate URL before fetching
@@ -119,45 +380,84 @@ class WebFetchTool(Tool):
             return json.dumps({"error": f"URL validation failed: {error_msg}", "url": url})
 
         try:
-            async with httpx.AsyncClient(
-                follow_redirects=True,
-                max_redirects=MAX_REDIRECTS,
-                timeout=30.0
-            ) as client:
-                r = await client.get(url, headers={"User-Agent": USER_AGENT})
-                r.raise_for_status()
-            
-            ctype = r.headers.get("content-type", "")
-            
-            # JSON
-            if "application/json" in ctype:
-                text, extractor = json.dumps(r.json(), indent=2), "json"
-            # HTML
-            elif "text/html" in ctype or r.text[:256].lower().startswith(("<!doctype", "<html")):
-                doc = Document(r.text)
-                content = self._to_markdown(doc.summary()) if extractMode == "markdown" else _strip_tags(doc.summary())
-                text = f"# {doc.title()}\n\n{content}" if doc.title() else content
-                extractor = "readability"
+            clipped = False
+            entry = await run_io(self.cache.lookup, url) if self.cache else None
+            body = await run_io(self.cache.body, entry) if entry else None
+            if body is not None and entry.is_fresh():
+                state = "hit"
             else:
-                text, extractor = r.text, "raw"
-            
-            truncated = len(text) > max_chars
+                headers = {"User-Agent": USER_AGENT}
+                if body is not None:
+                    headers.update(entry.validators())
+                async with self._client() as client, client.stream("GET", url, headers=headers) as r:
+                    not_modified = r.status_code == 304 and body is not None
+                    if not not_modified:
+                        r.raise_for_status()
+                        body, clipped = await self._read_capped(r)
+                if not_modified:
+                    entry = await run_io(self.cache.revalidated, entry, r.headers)
+                    state = "revalidated"
+                else:
+                    # A clipped body is only part of the page, so it is not cached
+                    entry = await run_io(
+                        self.cache.store, url, str(r.url), r.status_code, r.headers, body
+                    ) if self.cache and not clipped else None
+                    state = "miss"
+                    if entry is None:
+                        entry = CachedResponse(
+                            key="", url=url, final_url=str(r.url), status=r.status_code,
+                            headers={"content-type": r.headers.get("content-type", "")},
+                            body_sha="", stored_at=0, fresh_until=0,
+                        )
+
+            # Extracted text is cached per mode alongside the body
+            cached = bool(self.cache and entry.key)
+            extracted = await run_io(self.cache.get_extracted, entry, extractMode) if cached else None
+            if extracted is None:
+                # Parsing large pages is CPU-heavy; keep it off the event loop
+                extracted = await asyncio.to_thread(
+                    self._extract, body, entry.headers.get("content-type", ""), extractMode
+                )
+                if cached:
+                    await run_io(self.cache.put_extracted, entry, extractMode, extracted)
+
+            text = extracted["text"]
+            truncated = clipped or len(text) > max_chars
             if truncated:
                 text = text[:max_chars]
             
-            return json.dumps({"url": url, "finalUrl": str(r.url), "status": r.status_code,
-                              "extractor": extractor, "truncated": truncated, "length": len(text), "text": text})
+            return json.dumps({"url": url, "finalUrl": entry.final_url, "status": entry.status, "extractor": extracted["extractor"],
+                              "truncated": truncated, "length": len(text), "cache": state, "text": text})
         except Exception as e:
             return json.dumps({"error": str(e), "url": url})
     
-    def _to_markdown(self, html: str) -> str:
-        """Convert HTML to markdown."""
-        # Convert links, headings, lists before stripping tags
-        text = re.sub(r'<a\s+[^>]*href=["\']([^"\']+)["\'][^>]*>([\s\S]*?)</a>',
-                      lambda m: f'[{_strip_tags(m[2])}]({m[1]})', html, flags=re.I)
-        text = re.sub(r'<h([1-6])[^>]*>([\s\S]*?)</h\1>',
-                      lambda m: f'\n{"#" * int(m[1])} {_strip_tags(m[2])}\n', text, flags=re.I)
-        text = re.sub(r'<li[^>]*>([\s\S]*?)</li>', lambda m: f'\n- {_strip_tags(m[1])}', text, flags=re.I)
-        text = re.sub(r'</(p|div|section|article)>', '\n\n', text, flags=re.I)
-        text = re.sub(r'<(br|hr)\s*/?>', '\n', text, flags=re.I)
-        return _normalize(_strip_tags(text))
+    async def _read_capped(self, r: httpx.Response) -> tuple[bytes, bool]:
+        """Read at most max_bytes of the (decoded) body. Returns (body, clipped)."""
+        chunks: list[bytes] = []
+        size = 0
+        async for chunk in r.aiter_bytes(CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > self.max_bytes:
+                return b"".join(chunks)[:self.max_bytes], True
+        return b"".join(chunks), False
+    
+    def _extract(self, body: bytes, ctype: str, mode: str) -> dict[str, str]:
+        """Turn a response body into text; the result is what gets cached per mode."""
+        from readability import Document
+
+        # Rebuilt so httpx applies the same charset detection as for a live response
+        r = httpx.Response(200, content=body, headers={"content-type": ctype} if ctype else None)
+        # JSON (a clipped document falls through to raw text)
+        if "application/json" in ctype:
+            try:
+                return {"text": json.dumps(r.json(), indent=2), "extractor": "json"}
+            except ValueError:
+                pass
+        # HTML (sniffed from the first bytes rather than decoding the whole body)
+        elif "text/html" in ctype or body[:256].lstrip().lower().startswith((b"<!doctype", b"<html")):
+            doc = Document(r.text)
+            content = _html_to_text(doc.summary(), markdown=mode == "markdown")
+            text = f"# {doc.title()}\n\n{content}" if doc.title() else content
+            return {"text": text, "extractor": "readability"}
+        return {"text": r.text, "extractor": "raw"}
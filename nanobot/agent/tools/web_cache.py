@@ -0,0 +1,232 @@
+"""Disk-backed HTTP cache for web_fetch (responses and extracted text)."""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Mapping
+
+from loguru import logger
+
+from nanobot.utils.helpers import atomic_write_text, ensure_dir
+
+# Response headers kept with a cached entry
+_KEPT_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "date", "expires")
+# Request headers web_fetch sends identically on every call; a response that
+# varies on anything else cannot be reused from a cache keyed by URL alone
+_STABLE_REQUEST_HEADERS = frozenset({"accept", "accept-encoding", "user-agent"})
+# Upper bound for heuristic freshness when only Last-Modified is given
+HEURISTIC_MAX_AGE = 24 * 3600
+
+
+@dataclass
+class CachedResponse:
+    """Metadata of a cached 200 response."""
+    key: str
+    url: str
+    final_url: str
+    status: int
+    headers: dict[str, str]
+    body_sha: str
+    stored_at: float
+    fresh_until: float
+    no_cache: bool = False
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        return not self.no_cache and (now or time.time()) < self.fresh_until
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        out = {}
+        if etag := self.headers.get("etag"):
+            out["If-None-Match"] = etag
+        if modified := self.headers.get("last-modified"):
+            out["If-Modified-Since"] = modified
+        return out
+
+
+def _parse_cache_control(value: str) -> dict[str, str]:
+    directives = {}
+    for part in value.split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"')
+    return directives
+
+
+def _http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness(headers: Mapping[str, str], now: float) -> tuple[float, bool] | None:
+    """
+    (seconds the response stays fresh, must-revalidate flag), or None if it
+    must not be stored. Follows RFC 9111 for a private cache: max-age, then
+    Expires, then 10% of the Last-Modified age (capped at a day).
+    """
+    cc = _parse_cache_control(headers.get("cache-control", ""))
+    if "no-store" in cc:
+        return None
+    no_cache = "no-cache" in cc
+    date = _http_date(headers.get("date")) or now
+    if "max-age" in cc and cc["max-age"].isdigit():
+        age = headers.get("age", "0")
+        lifetime = int(cc["max-age"]) - (int(age) if age.isdigit() else 0)
+    elif (expires := _http_date(headers.get("expires"))) is not None:
+        lifetime = expires - date
+    elif (modified := _http_date(headers.get("last-modified"))) is not None:
+        lifetime = min((date - modified) / 10, HEURISTIC_MAX_AGE)
+    else:
+        lifetime = 0
+    return max(lifetime, 0), no_cache
+
+
+def _varies(headers: Mapping[str, str]) -> bool:
+    """True if the response depends on request headers web_fetch might change (or on anything, for `*`)."""
+    names = {name.strip().lower() for name in headers.get("vary", "").split(",") if name.strip()}
+    return not names <= _STABLE_REQUEST_HEADERS
+
+
+class WebCache:
+    """
+    HTTP cache for web_fetch, stored as files under one directory.
+
+    Each URL has `<key>.json` (metadata), `<key>.body` (raw response) and
+    `<key>.<mode>.json` (extracted text, tied to the body's hash so a 304
+    revalidation reuses it). Fresh entries are served without a request,
+    stale ones are revalidated with If-None-Match/If-Modified-Since, and the
+    directory is kept under max_bytes by evicting least-recently-used URLs.
+    Entries are keyed by URL only, so responses with `Vary: *` or a Vary on
+    request headers other than the fixed ones web_fetch sends are not stored.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 64 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()[:32]
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.root / f"{key}{suffix}"
+
+    def lookup(self, url: str) -> CachedResponse | None:
+        meta = self._path(self._key(url), ".json")
+        try:
+            entry = CachedResponse(**json.loads(meta.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+        try:
+            os.utime(meta)  # Mark as recently used for eviction
+        except OSError:
+            return None
+        if not self._path(entry.key, ".body").exists():
+            return None
+        return entry
+
+    def body(self, entry: CachedResponse) -> bytes | None:
+        try:
+            return self._path(entry.key, ".body").read_bytes()
+        except OSError:
+            return None
+
+    def store(
+        self, url: str, final_url: str, status: int, headers: Mapping[str, str], body: bytes
+    ) -> CachedResponse | None:
+        """Cache a 200 response if its headers allow it. Returns the entry, or None."""
+        now = time.time()
+        policy = freshness(headers, now)
+        if status != 200 or policy is None or len(body) > self.max_bytes // 8 or _varies(headers):
+            return None
+        lifetime, no_cache = policy
+        kept = {name: headers[name] for name in _KEPT_HEADERS if name in headers}
+        if lifetime <= 0 and not ("etag" in kept or "last-modified" in kept):
+            return None  # Could never be reused
+
+        key = self._key(url)
+        entry = CachedResponse(
+            key=key, url=url, final_url=final_url, status=status, headers=kept,
+            body_sha=hashlib.sha256(body).hexdigest(), stored_at=now,
+            fresh_until=now + lifetime, no_cache=no_cache,
+        )
+        try:
+            ensure_dir(self.root)
+            tmp = self._path(key, ".body.tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, self._path(key, ".body"))
+            atomic_write_text(self._path(key, ".json"), json.dumps(asdict(entry)))
+        except OSError as e:
+            logger.debug(f"Web cache write failed for {url}: {e}")
+            return None
+        self.evict()
+        return entry
+
+    def revalidated(self, entry: CachedResponse, headers: Mapping[str, str]) -> CachedResponse:
+        """Refresh an entry after a 304 Not Modified."""
+        now = time.time()
+        merged = {**entry.headers, **{n: headers[n] for n in _KEPT_HEADERS if n in headers}}
+        lifetime, no_cache = freshness(merged, now) or (0, True)
+        entry = CachedResponse(**{
+            **asdict(entry), "headers": merged, "stored_at": now,
+            "fresh_until": now + lifetime, "no_cache": no_cache,
+        })
+        try:
+            atomic_write_text(self._path(entry.key, ".json"), json.dumps(asdict(entry)))
+        except OSError as e:
+            logger.debug(f"Web cache update failed for {entry.url}: {e}")
+        return entry
+
+    def get_extracted(self, entry: CachedResponse, mode: str) -> dict[str, Any] | None:
+        try:
+            data = json.loads(self._path(entry.key, f".{mode}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return data if data.get("body_sha") == entry.body_sha else None
+
+    def put_extracted(self, entry: CachedResponse, mode: str, data: dict[str, Any]) -> None:
+        try:
+            atomic_write_text(
+                self._path(entry.key, f".{mode}.json"),
+                json.dumps({**data, "body_sha": entry.body_sha}, ensure_ascii=False),
+            )
+        except OSError as e:
+            logger.debug(f"Web cache write failed for {entry.url}: {e}")
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop least-recently-used URLs until the cache fits max_bytes. Returns bytes freed."""
+        groups: dict[str, list[tuple[Path, os.stat_result]]] = {}
+        try:
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    if entry.is_file():
+                        groups.setdefault(entry.name[:32], []).append((Path(entry.path), entry.stat()))
+        except OSError:
+            return 0
+        total = sum(st.st_size for files in groups.values() for _, st in files)
+        if total <= self.max_bytes:
+            return 0
+
+        def last_used(files: list[tuple[Path, os.stat_result]]) -> float:
+            return max(st.st_mtime for _, st in files)
+
+        freed = 0
+        target = int(self.max_bytes * 0.9)
+        for files in sorted(groups.values(), key=last_used):
+            if total - freed <= target:
+                break
+            for path, st in files:
+                try:
+                    path.unlink()
+                    freed += st.st_size
+                except OSError:
+                    pass
+        return freed
@@ -0,0 +1,236 @@
+"""Semantic retrieval over memory files with a local on-disk vector index."""
+
+import hashlib
+import math
+import re
+import sqlite3
+import threading
+from array import array
+from dataclasses import dataclass
+from operator import mul
+from pathlib import Path
+from typing import Protocol
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class Embedder(Protocol):
+    """Turns texts into fixed-size, L2-normalized vectors."""
+
+    name: str
+    dim: int
+
+    def embed(self, texts: list[str]) -> list[list[float]]: ...
+
+
+class HashingEmbedder:
+    """
+    Dependency-free embedder using the hashing trick over words and word bigrams.
+
+    Not semantic in the neural sense, but deterministic, fast and good enough
+    for keyword-level relevance; also the default for tests.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed_one(t) for t in texts]
+
+    def _embed_one(self, text: str) -> list[float]:
+        vec = [0.0] * self.dim
+        words = _WORD_RE.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for feature in features:
+            h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+            vec[h % self.dim] += 1.0 if (h >> 63) & 1 else -1.0
+        return _normalize(vec)
+
+
+class FastEmbedEmbedder:
+    """CPU-only local embedding model via the optional `fastembed` package (ONNX runtime)."""
+
+    def __init__(self, model_name: str = "BAAI/bge-small-en-v1.5"):
+        try:
+            from fastembed import TextEmbedding
+        except ImportError as e:
+            raise ImportError("fastembed is required for local embeddings: pip install fastembed") from e
+        self._model = TextEmbedding(model_name)
+        self.name = f"fastembed:{model_name}"
+        self.dim = len(next(iter(self._model.embed(["probe"]))))
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return [_normalize([float(x) for x in v]) for v in self._model.embed(texts)]
+
+
+def make_embedder(spec: str) -> Embedder:
+    """Build an embedder from a config string: "hashing", "hashing:512" or "fastembed[:model]"."""
+    kind, _, arg = spec.partition(":")
+    if kind == "hashing":
+        return HashingEmbedder(int(arg) if arg else 256)
+    if kind == "fastembed":
+        return FastEmbedEmbedder(arg) if arg else FastEmbedEmbedder()
+    raise ValueError(f"Unknown embedder: {spec}")
+
+
+@dataclass(frozen=True)
+class MemoryChunk:
+    """A retrieved piece of memory."""
+    source: str
+    text: str
+    score: float
+
+
+def chunk_markdown(text: str, max_chars: int = 600) -> list[str]:
+    """Split markdown into chunks at paragraph boundaries, prefixing each with its heading."""
+    chunks: list[str] = []
+    heading = ""
+    current: list[str] = []
+
+    def flush() -> None:
+        body = "\n\n".join(current).strip()
+        if body:
+            chunks.append(f"{heading}\n{body}" if heading and not body.startswith("#") else body)
+        current.clear()
+
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        if not block:
+            continue
+        if block.startswith("#"):
+            flush()
+            first, _, rest = block.partition("\n")
+            heading = first
+            block = rest.strip()
+            if not block:
+                continue
+        if current and sum(len(c) for c in current) + len(block) > max_chars:
+            flush()
+        while len(block) > max_chars:
+            current.append(block[:max_chars])
+            flush()
+            block = block[max_chars:]
+        current.append(block)
+    flush()
+    return chunks
+
+
+class VectorIndex:
+    """
+    Chunk-level vector index stored in SQLite.
+
+    Chunks are keyed by content hash, so re-syncing a source only embeds
+    chunks that are new; vanished chunks are deleted. Sources whose file
+    size/mtime did not change are skipped entirely. Scoring is a brute-force
+    cosine scan, which stays in the low milliseconds for thousands of chunks.
+    Safe to call from worker threads (prompts are built off the event loop).
+    """
+
+    def __init__(self, db_path: Path, embedder: Embedder):
+        self.db_path = db_path
+        self.embedder = embedder
+        self._conn: sqlite3.Connection | None = None
+        self._vectors: dict[str, list[tuple[str, array]]] | None = None
+        self._lock = threading.RLock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "source TEXT, hash TEXT, text TEXT, vec BLOB, PRIMARY KEY (source, hash))"
+        )
+        row = conn.execute("SELECT value FROM meta WHERE key = 'embedder'").fetchone()
+        if row is None or row[0] != self.embedder.name:
+            # Vectors from a different embedder are not comparable
+            conn.execute("DELETE FROM chunks")
+            conn.execute("DELETE FROM meta")
+            conn.execute("INSERT INTO meta (key, value) VALUES ('embedder', ?)", (self.embedder.name,))
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def sync_file(self, source: str, path: Path, splitter) -> int:
+        """Re-index `path` under `source` if it changed. Returns chunks embedded."""
+        with self._lock:
+            return self._sync_file(source, path, splitter)
+
+    def _sync_file(self, source: str, path: Path, splitter) -> int:
+        conn = self._connect()
+        stamp = f"{path.stat().st_mtime_ns}:{path.stat().st_size}" if path.exists() else ""
+        key = f"stamp:{source}"
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        if row is not None and row[0] == stamp:
+            return 0
+        text = path.read_text(encoding="utf-8") if path.exists() else ""
+        added = self._sync_chunks(source, splitter(text))
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, stamp))
+        conn.commit()
+        return added
+
+    def sync_chunks(self, source: str, chunks: list[str]) -> int:
+        """Make the stored chunks for `source` match `chunks`. Returns chunks embedded."""
+        with self._lock:
+            return self._sync_chunks(source, chunks)
+
+    def _sync_chunks(self, source: str, chunks: list[str]) -> int:
+        conn = self._connect()
+        wanted = {hashlib.sha1(c.encode("utf-8")).hexdigest(): c for c in chunks}
+        existing = {h for (h,) in conn.execute("SELECT hash FROM chunks WHERE source = ?", (source,))}
+
+        stale = existing - wanted.keys()
+        conn.executemany("DELETE FROM chunks WHERE source = ? AND hash = ?", [(source, h) for h in stale])
+
+        new = [h for h in wanted if h not in existing]
+        if new:
+            vectors = self.embedder.embed([wanted[h] for h in new])
+            conn.executemany(
+                "INSERT INTO chunks (source, hash, text, vec) VALUES (?, ?, ?, ?)",
+                [(source, h, wanted[h], array("f", v).tobytes()) for h, v in zip(new, vectors)],
+            )
+        if stale or new:
+            self._vectors = None
+        conn.commit()
+        return len(new)
+
+    def search(
+        self, query: str, k: int = 8, min_score: float = 0.0, sources: set[str] | None = None
+    ) -> list[MemoryChunk]:
+        """Top-k chunks by cosine similarity to the query, optionally limited to some sources."""
+        with self._lock:
+            if self._vectors is None:
+                self._load_vectors()
+            vectors = self._vectors or {}
+        qvec = self.embedder.embed([query])[0]
+        scored = []
+        for source, rows in vectors.items():
+            if sources is not None and source not in sources:
+                continue
+            for text, vec in rows:
+                score = sum(map(mul, qvec, vec))
+                if score > min_score:
+                    scored.append(MemoryChunk(source, text, score))
+        scored.sort(key=lambda c: c.score, reverse=True)
+        return scored[:k]
+
+    def _load_vectors(self) -> None:
+        vectors: dict[str, list[tuple[str, array]]] = {}
+        for source, text, blob in self._connect().execute("SELECT source, text, vec FROM chunks"):
+            vec = array("f")
+            vec.frombytes(blob)
+            vectors.setdefault(source, []).append((text, vec))
+        self._vectors = vectors
+
+
+def _normalize(vec: list[float]) -> list[float]:
+    norm = math.sqrt(sum(x * x for x in vec))
+    return [x / norm for x in vec] if norm else vec
@@ -7,6 +7,9 @@ from loguru import logger
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
+from nanobot.media import MediaStore
+from nanobot.metrics.registry import CHANNEL_MESSAGES
+from nanobot.utils.helpers import get_data_path
 
 
 class BaseChannel(ABC):
@@ -30,6 +33,22 @@ class BaseChannel(ABC):
         self.config = config
         self.bus = bus
         self._running = False
+        self._media: MediaStore | None = None
+
+    @property
+    def media(self) -> MediaStore:
+        """
+        Store for downloaded media. ChannelManager sets one shared store
+        configured from config.media; standalone channels create a default
+        one on first use (creating ~/.nanobot only then).
+        """
+        if self._media is None:
+            self._media = MediaStore(get_data_path() / "media")
+        return self._media
+
+    @media.setter
+    def media(self, store: MediaStore) -> None:
+        self._media = store
     
     @abstractmethod
     async def start(self) -> None:
@@ -119,6 +138,7 @@ class BaseChannel(ABC):
             metadata=metadata or {}
         )
         
+        CHANNEL_MESSAGES.inc(channel=self.name, direction="inbound")
         await self.bus.publish_inbound(msg)
     
     @property
@@ -13,6 +13,7 @@ from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import DiscordConfig
+from nanobot.media import MediaTooLargeError
 
 
 DISCORD_API_BASE = "https://discord.com/api/v10"
@@ -199,7 +200,6 @@ class DiscordChannel(BaseChannel):
 
         content_parts = [content] if content else []
         media_paths: list[str] = []
-        media_dir = Path.home() / ".nanobot" / "media"
 
         for attachment in payload.get("attachments") or []:
             url = attachment.get("url")
@@ -211,13 +211,13 @@ class DiscordChannel(BaseChannel):
                 content_parts.append(f"[attachment: {filename} - too large]")
                 continue
             try:
-                media_dir.mkdir(parents=True, exist_ok=True)
-                file_path = media_dir / f"{attachment.get('id', 'file')}_{filename.replace('/', '_')}"
-                resp = await self._http.get(url)
-                resp.raise_for_status()
-                file_path.write_bytes(resp.content)
+                file_path = await self.media.download(
+                    self._http, url, suffix=Path(filename).suffix, max_size=MAX_ATTACHMENT_BYTES
+                )
                 media_paths.append(str(file_path))
                 content_parts.append(f"[attachment: {file_path}]")
+            except MediaTooLargeError:
+                content_parts.append(f"[attachment: {filename} - too large]")
             except Exception as e:
                 logger.warning(f"Failed to download Discord attachment: {e}")
                 content_parts.append(f"[attachment: {filename} - download failed]")
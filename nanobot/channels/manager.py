@@ -11,6 +11,9 @@ from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import Config
+from nanobot.media import MediaStore
+from nanobot.metrics.registry import CHANNEL_MESSAGES
+from nanobot.utils.helpers import get_data_path
 
 
 class ChannelManager:
@@ -21,6 +24,9 @@ class ChannelManager:
     - Initialize enabled channels (Telegram, WhatsApp, etc.)
     - Start/stop channels
     - Route outbound messages
+
+    Channel modules (and their SDKs) are imported in start_all(), not at
+    construction, so building a manager for status/inspection stays cheap.
     """
     
     def __init__(self, config: Config, bus: MessageBus):
@@ -28,11 +34,18 @@ class ChannelManager:
         self.bus = bus
         self.channels: dict[str, BaseChannel] = {}
         self._dispatch_task: asyncio.Task | None = None
-        
-        self._init_channels()
+        self._initialized = False
+        self.media = MediaStore(
+            get_data_path() / "media",
+            max_bytes=config.media.max_size_mb * 1024 * 1024,
+            max_age_days=config.media.max_age_days,
+        )
     
     def _init_channels(self) -> None:
-        """Initialize channels based on config."""
+        """Initialize channels based on config (imports each enabled channel's SDK)."""
+        if self._initialized:
+            return
+        self._initialized = True
         
         # Telegram channel
         if self.config.channels.telegram.enabled:
@@ -136,6 +149,10 @@ class ChannelManager:
                 logger.info("QQ channel enabled")
             except ImportError as e:
                 logger.warning(f"QQ channel not available: {e}")
+
+        # All channels share one media store so quotas apply across them
+        for channel in self.channels.values():
+            channel.media = self.media
     
     async def _start_channel(self, name: str, channel: BaseChannel) -> None:
         """Start a channel and log any exceptions."""
@@ -146,9 +163,13 @@ class ChannelManager:
 
     async def start_all(self) -> None:
         """Start all channels and the outbound dispatcher."""
+        self._init_channels()
         if not self.channels:
             logger.warning("No channels enabled")
             return
+
+        # Apply age/size limits to media left over from previous runs
+        await asyncio.to_thread(self.media.evict)
         
         # Start outbound dispatcher
         self._dispatch_task = asyncio.create_task(self._dispatch_outbound())
@@ -197,6 +218,7 @@ class ChannelManager:
                 if channel:
                     try:
                         await channel.send(msg)
+                        CHANNEL_MESSAGES.inc(channel=msg.channel, direction="outbound")
                     except Exception as e:
                         logger.error(f"Error sending to {msg.channel}: {e}")
                 else:
@@ -223,5 +245,9 @@ class ChannelManager:
     
     @property
     def enabled_channels(self) -> list[str]:
-        """Get list of enabled channel names."""
-        return list(self.channels.keys())
+        """Get list of enabled channel names (from config, before SDKs are loaded)."""
+        enabled = [
+            name for name in type(self.config.channels).model_fields
+            if getattr(self.config.channels, name).enabled
+        ]
+        return enabled + [name for name in self.channels if name not in enabled]
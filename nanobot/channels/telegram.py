@@ -282,13 +282,14 @@ class TelegramChannel(BaseChannel):
                 file = await self._app.bot.get_file(media_file.file_id)
                 ext = self._get_extension(media_type, getattr(media_file, 'mime_type', None))
                 
-                # Save to workspace/media/
-                from pathlib import Path
-                media_dir = Path.home() / ".nanobot" / "media"
-                media_dir.mkdir(parents=True, exist_ok=True)
-                
-                file_path = media_dir / f"{media_file.file_id[:16]}{ext}"
-                await file.download_to_drive(str(file_path))
+                # Download next to the media store, then file it under its content hash
+                tmp_path = self.media.tmp_dir / f"{media_file.file_unique_id}-{message.message_id}{ext}"
+                try:
+                    await file.download_to_drive(str(tmp_path))
+                    file_path = await asyncio.to_thread(self.media.ingest, tmp_path, ext)
+                finally:
+                    # ingest() consumes the file; this only matters if the download failed
+                    tmp_path.unlink(missing_ok=True)
                 
                 media_paths.append(str(file_path))
                 
@@ -279,21 +279,13 @@ This file stores important information that should persist across sessions.
 
 
 def _make_provider(config):
-    """Create LiteLLMProvider from config. Exits if no API key found."""
-    from nanobot.providers.litellm_provider import LiteLLMProvider
-    p = config.get_provider()
-    model = config.agents.defaults.model
-    if not (p and p.api_key) and not model.startswith("bedrock/"):
-        console.print("[red]Error: No API key configured.[/red]")
-        console.print("Set one in ~/.nanobot/config.json under providers section")
+    """Create the LLM provider from config. Exits if no API key found."""
+    from nanobot.providers.factory import create_provider
+    try:
+        return create_provider(config)
+    except ValueError as e:
+        console.print(f"[red]Error: {e}[/red]")
         raise typer.Exit(1)
-    return LiteLLMProvider(
-        api_key=p.api_key if p else None,
-        api_base=config.get_api_base(),
-        default_model=model,
-        extra_headers=p.extra_headers if p else None,
-        provider_name=config.get_provider_name(),
-    )
 
 
 # ============================================================================
@@ -341,8 +333,11 @@ def gateway(
         max_tokens=config.agents.defaults.max_tokens,
         max_iterations=config.agents.defaults.max_tool_iterations,
         memory_window=config.agents.defaults.memory_window,
+        memory_config=config.agents.defaults.memory,
+        max_concurrent_consolidations=config.agents.defaults.memory.max_concurrent_consolidations,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
+        web_fetch_config=config.tools.web.fetch,
         cron_service=cron,
         restrict_to_workspace=config.tools.restrict_to_workspace,
         session_manager=session_manager,
@@ -392,9 +387,32 @@ def gateway(
         console.print(f"[green]✓[/green] Cron: {cron_status['jobs']} scheduled jobs")
     
     console.print(f"[green]✓[/green] Heartbeat: every 30m")
-    
+
+    metrics_server = None
+    if config.gateway.metrics.enabled:
+        from nanobot.metrics import REGISTRY, MetricsServer
+
+        gauges = {
+            "nanobot_bus_inbound_queue_depth": ("Pending inbound messages on the bus.", lambda: bus.inbound_size),
+            "nanobot_bus_outbound_queue_depth": ("Pending outbound messages on the bus.", lambda: bus.outbound_size),
+            "nanobot_session_cache_size": ("Sessions held in memory.", lambda: session_manager.cache_size),
+            "nanobot_consolidation_backlog": ("Memory consolidations queued or running.", lambda: agent.consolidation_backlog),
+            "nanobot_subagents_running": ("Subagents currently running.", agent.subagents.get_running_count),
+        }
+        for name, (help_text, fn) in gauges.items():
+            REGISTRY.gauge(name, help_text).set_function(fn)
+
+        metrics_server = MetricsServer(
+            host=config.gateway.host,
+            port=port,
+            path=config.gateway.metrics.path,
+        )
+        console.print(f"[green]✓[/green] Metrics: http://{config.gateway.host}:{port}{config.gateway.metrics.path}")
+
     async def run():
         try:
+            if metrics_server:
+                await metrics_server.start()
             await cron.start()
             await heartbeat.start()
             await asyncio.gather(
@@ -405,8 +423,10 @@ def gateway(
             console.print("\nShutting down...")
             heartbeat.stop()
             cron.stop()
-            agent.stop()
+            await agent.close()
             await channels.stop_all()
+            if metrics_server:
+                await metrics_server.stop()
     
     asyncio.run(run())
 
@@ -450,8 +470,11 @@ def agent(
         max_tokens=config.agents.defaults.max_tokens,
         max_iterations=config.agents.defaults.max_tool_iterations,
         memory_window=config.agents.defaults.memory_window,
+        memory_config=config.agents.defaults.memory,
+        max_concurrent_consolidations=config.agents.defaults.memory.max_concurrent_consolidations,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
+        web_fetch_config=config.tools.web.fetch,
         restrict_to_workspace=config.tools.restrict_to_workspace,
     )
     
@@ -469,6 +492,7 @@ def agent(
             with _thinking_ctx():
                 response = await agent_loop.process_direct(message, session_id)
             _print_agent_response(response, render_markdown=markdown)
+            await agent_loop.close()
         
         asyncio.run(run_once())
     else:
@@ -508,6 +532,7 @@ def agent(
                     _restore_terminal()
                     console.print("\nGoodbye!")
                     break
+            await agent_loop.close()
         
         asyncio.run(run_interactive())
 
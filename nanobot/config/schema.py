@@ -155,6 +155,20 @@ class ChannelsConfig(BaseModel):
     qq: QQConfig = Field(default_factory=QQConfig)
 
 
+class MemoryConfig(BaseModel):
+    """Long-term memory: prompt injection and history rollup."""
+    mode: str = "full"  # "full" (inject MEMORY.md) or "retrieval" (top-k relevant chunks)
+    scope: str = "global"  # "global" (one MEMORY.md) or "session" (global + per-chat MEMORY.md)
+    update_mode: str = "patch"  # Consolidation returns "patch" edits or the "full" MEMORY.md document
+    batch_window_s: float = 0  # >0: collect sessions for this long and consolidate them in one LLM call
+    batch_max_sessions: int = 8
+    max_concurrent_consolidations: int = 1  # Background consolidation jobs that may run at once
+    top_k: int = 8
+    embedder: str = "hashing"  # "hashing[:dim]" or "fastembed[:model]" (pip install fastembed)
+    rollup_after_days: int = 0  # >0: roll HISTORY.md entries older than this into weekly summaries
+    rollup_monthly_after_weeks: int = 8  # Roll weekly summaries older than this into monthly ones
+
+
 class AgentDefaults(BaseModel):
     """Default agent configuration."""
     workspace: str = "~/.nanobot/workspace"
@@ -163,6 +177,7 @@ class AgentDefaults(BaseModel):
     temperature: float = 0.7
     max_tool_iterations: int = 20
     memory_window: int = 50
+    memory: MemoryConfig = Field(default_factory=MemoryConfig)
 
 
 class AgentsConfig(BaseModel):
@@ -175,6 +190,7 @@ class ProviderConfig(BaseModel):
     api_key: str = ""
     api_base: str | None = None
     extra_headers: dict[str, str] | None = None  # Custom headers (e.g. APP-Code for AiHubMix)
+    backend: str = "litellm"  # "litellm" or "openai" (native client for OpenAI-compatible APIs)
 
 
 class ProvidersConfig(BaseModel):
@@ -194,10 +210,17 @@ class ProvidersConfig(BaseModel):
     aihubmix: ProviderConfig = Field(default_factory=ProviderConfig)  # AiHubMix API gateway
 
 
+class MetricsConfig(BaseModel):
+    """Prometheus metrics endpoint served by the gateway."""
+    enabled: bool = False
+    path: str = "/metrics"
+
+
 class GatewayConfig(BaseModel):
     """Gateway/server configuration."""
     host: str = "0.0.0.0"
     port: int = 18790
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
 
 
 class WebSearchConfig(BaseModel):
@@ -206,14 +229,40 @@ class WebSearchConfig(BaseModel):
     max_results: int = 5
 
 
+class WebFetchConfig(BaseModel):
+    """Web fetch tool configuration."""
+    max_chars: int = 50000
+    max_download_mb: int = 5  # Bytes read per page; longer pages are truncated
+    cache_mb: int = 64  # Disk cache for fetched pages (0 = disabled)
+
+
 class WebToolsConfig(BaseModel):
     """Web tools configuration."""
     search: WebSearchConfig = Field(default_factory=WebSearchConfig)
+    fetch: WebFetchConfig = Field(default_factory=WebFetchConfig)
+
+
+class ExecLimitsConfig(BaseModel):
+    """Per-command resource limits for the exec tool (0 = unlimited)."""
+    cpu_seconds: int = 0
+    memory_mb: int = 0
+    max_processes: int = 0  # RLIMIT_NPROC counts all processes of the user
+    max_file_size_mb: int = 0
+    cpu_percent: int = 0  # Needs a delegated cgroup v2 parent
+    nice: int = 0  # Added to the command's niceness (e.g. 10)
+    idle_io: bool = False  # Run commands in the idle I/O class (ionice -c 3)
+    cgroup_parent: str = ""  # Writable cgroup v2 directory for per-command groups (default: own cgroup)
 
 
 class ExecToolConfig(BaseModel):
     """Shell exec tool configuration."""
     timeout: int = 60
+    max_output_bytes: int = 10000  # Head + tail of stdout kept in the tool result
+    progress_interval: int = 30  # Seconds between "still running" updates to the chat (0 = off)
+    persistent_sessions: bool = False  # One long-lived shell per chat (cd/env/venv persist)
+    max_sessions: int = 8
+    session_idle_timeout: int = 900  # Seconds before an idle shell session is closed
+    limits: ExecLimitsConfig = Field(default_factory=ExecLimitsConfig)
 
 
 class ToolsConfig(BaseModel):
@@ -223,6 +272,12 @@ class ToolsConfig(BaseModel):
     restrict_to_workspace: bool = False  # If true, restrict all tool access to workspace directory
 
 
+class MediaConfig(BaseModel):
+    """Storage limits for media downloaded by channels (~/.nanobot/media)."""
+    max_size_mb: int = 1024  # Least-recently-used files are evicted above this
+    max_age_days: float = 30  # Files untouched for this long are removed (0 = keep)
+
+
 class Config(BaseSettings):
     """Root configuration for nanobot."""
     agents: AgentsConfig = Field(default_factory=AgentsConfig)
@@ -230,6 +285,7 @@ class Config(BaseSettings):
     providers: ProvidersConfig = Field(default_factory=ProvidersConfig)
     gateway: GatewayConfig = Field(default_factory=GatewayConfig)
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
+    media: MediaConfig = Field(default_factory=MediaConfig)
     
     @property
     def workspace_path(self) -> Path:
@@ -0,0 +1,5 @@
+"""Local storage for media downloaded by channels."""
+
+from nanobot.media.store import MediaStore, MediaTooLargeError
+
+__all__ = ["MediaStore", "MediaTooLargeError"]
@@ -0,0 +1,181 @@
+"""Content-addressed media store with quotas and eviction."""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator
+
+from loguru import logger
+
+from nanobot.utils.helpers import run_io
+
+if TYPE_CHECKING:
+    import httpx
+
+CHUNK_SIZE = 64 * 1024
+
+
+class MediaTooLargeError(Exception):
+    """Raised when a download exceeds the allowed size."""
+
+
+class MediaStore:
+    """
+    Stores downloaded media under content-hash names.
+
+    - Identical files are stored once (sha256 of the content names the file).
+    - Downloads stream to a temp file while hashing, never buffering the
+      whole payload in memory.
+    - Total size is kept under max_bytes by evicting least-recently-used files
+      (mtime is refreshed whenever a file is stored again or touched), and
+      files untouched for max_age_days are removed (0 disables the age limit).
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = 1024 * 1024 * 1024,
+        max_age_days: float = 30,
+        age_check_interval: float = 3600,
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self._age_check_interval = age_check_interval
+        self._last_age_check = 0.0
+        self._total: int | None = None
+        # Commits run on I/O worker threads; this keeps _total and eviction consistent
+        self._lock = threading.Lock()
+
+    @property
+    def tmp_dir(self) -> Path:
+        path = self.root / ".tmp"
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def usage(self) -> tuple[int, int]:
+        """(file count, total bytes) currently stored."""
+        files = self._files()
+        total = sum(st.st_size for _, st in files)
+        self._total = total
+        return len(files), total
+
+    async def save_stream(
+        self, chunks: AsyncIterator[bytes], suffix: str = "", max_size: int | None = None
+    ) -> Path:
+        """Write an async byte stream into the store. Returns the stored path."""
+        fd, tmp_name = tempfile.mkstemp(dir=self.tmp_dir)
+        tmp = Path(tmp_name)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise MediaTooLargeError(f"exceeds {max_size} bytes")
+                    digest.update(chunk)
+                    f.write(chunk)
+            # Moving the file and evicting touch the disk; keep both off the event loop
+            return await run_io(self._commit, tmp, digest.hexdigest(), suffix, size)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    async def download(
+        self,
+        client: "httpx.AsyncClient",
+        url: str,
+        suffix: str = "",
+        max_size: int | None = None,
+        **kwargs,
+    ) -> Path:
+        """Stream an HTTP download into the store."""
+        async with client.stream("GET", url, **kwargs) as resp:
+            resp.raise_for_status()
+            length = resp.headers.get("content-length")
+            if max_size is not None and length and length.isdigit() and int(length) > max_size:
+                raise MediaTooLargeError(f"{length} bytes exceeds {max_size}")
+            return await self.save_stream(resp.aiter_bytes(CHUNK_SIZE), suffix, max_size)
+
+    def ingest(self, src: Path, suffix: str | None = None) -> Path:
+        """Move an already-downloaded file (e.g. in tmp_dir) into the store."""
+        digest = hashlib.sha256()
+        with open(src, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                digest.update(chunk)
+        size = src.stat().st_size
+        try:
+            return self._commit(src, digest.hexdigest(), src.suffix if suffix is None else suffix, size)
+        finally:
+            src.unlink(missing_ok=True)
+
+    def touch(self, path: Path) -> None:
+        """Mark a stored file as recently used."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _commit(self, tmp: Path, digest: str, suffix: str, size: int) -> Path:
+        dest = self.root / f"{digest[:32]}{suffix}"
+        with self._lock:
+            if dest.exists():
+                self.touch(dest)
+                return dest
+            shutil.move(str(tmp), dest)
+            if self._total is not None:
+                self._total += size
+            self.evict()
+        return dest
+
+    def _files(self) -> list[tuple[Path, os.stat_result]]:
+        if not self.root.is_dir():
+            return []
+        out = []
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.startswith("."):
+                    out.append((Path(entry.path), entry.stat()))
+        return out
+
+    def evict(self, now: float | None = None) -> int:
+        """Apply age and size limits. Returns bytes freed."""
+        now = now or time.time()
+        check_age = now - self._last_age_check >= self._age_check_interval
+        if self._total is not None and self._total <= self.max_bytes and not check_age:
+            return 0
+
+        files = self._files()
+        total = sum(st.st_size for _, st in files)
+        freed = 0
+        victims: list[tuple[Path, int]] = []
+        if check_age and self.max_age_days > 0:
+            self._last_age_check = now
+            cutoff = now - self.max_age_days * 86400
+            victims += [(p, st.st_size) for p, st in files if st.st_mtime < cutoff]
+        if total - sum(s for _, s in victims) > self.max_bytes:
+            # Evict LRU down to 90% of the quota so we do not evict on every save
+            target = int(self.max_bytes * 0.9)
+            remaining = total - sum(s for _, s in victims)
+            chosen = {p for p, _ in victims}
+            for p, st in sorted(files, key=lambda item: item[1].st_mtime):
+                if remaining <= target:
+                    break
+                if p not in chosen:
+                    victims.append((p, st.st_size))
+                    remaining -= st.st_size
+
+        for path, size in victims:
+            try:
+                path.unlink()
+                freed += size
+            except OSError as e:
+                logger.debug(f"Media eviction failed for {path}: {e}")
+        self._total = total - freed
+        if freed:
+            logger.info(f"Media store evicted {len(victims)} files ({freed // 1024} KiB)")
+        return freed
@@ -0,0 +1,21 @@
+"""Runtime metrics for the gateway (Prometheus text format)."""
+
+from nanobot.metrics.registry import (
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    record_llm_call,
+)
+from nanobot.metrics.server import MetricsServer
+
+__all__ = [
+    "REGISTRY",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "MetricsServer",
+    "record_llm_call",
+]
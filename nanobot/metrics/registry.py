@@ -0,0 +1,271 @@
+"""In-process metrics registry with Prometheus text exposition."""
+
+import math
+import threading
+from typing import Callable, Iterable
+
+# Default latency buckets (seconds) — covers fast tool calls up to slow LLM turns.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+Sample = tuple[str, dict[str, str], float]  # (name suffix, labels, value)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+class Metric:
+    """Base class for a named metric with an optional fixed label set."""
+
+    type: str = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...]) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> list[Sample]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[Sample]:
+        with self._lock:
+            return [("", self._labels(k), v) for k, v in self._values.items()]
+
+
+class Gauge(Metric):
+    """Value that can go up and down, or be read from a callback at scrape time."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._functions: dict[tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], float], **labels: str) -> None:
+        """Evaluate fn on every scrape instead of storing a value."""
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = fn
+
+    def get(self, **labels: str) -> float:
+        key = self._key(labels)
+        if fn := self._functions.get(key):
+            return float(fn())
+        return self._values.get(key, 0.0)
+
+    def samples(self) -> list[Sample]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        out: list[Sample] = [("", self._labels(k), v) for k, v in values.items() if k not in functions]
+        for key, fn in functions.items():
+            try:
+                out.append(("", self._labels(key), float(fn())))
+            except Exception:
+                continue  # A broken callback must not break the whole scrape
+        return out
+
+
+class Histogram(Metric):
+    """Cumulative histogram of observed values."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., sum, count]
+        self._data: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            data = self._data.get(key)
+            if data is None:
+                data = self._data[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def count(self, **labels: str) -> float:
+        data = self._data.get(self._key(labels))
+        return data[-1] if data else 0.0
+
+    def samples(self) -> list[Sample]:
+        out: list[Sample] = []
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._data.items()]
+        for key, data in items:
+            labels = self._labels(key)
+            for bound, n in zip(self.buckets, data):
+                out.append(("_bucket", {**labels, "le": _format_value(bound)}, n))
+            out.append(("_bucket", {**labels, "le": "+Inf"}, data[-1]))
+            out.append(("_sum", labels, data[-2]))
+            out.append(("_count", labels, data[-1]))
+        return out
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together in Prometheus text format.
+
+    Metric factories are get-or-create, so modules can declare the metrics
+    they update without coordinating registration order.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type[Metric], name: str, *args, **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.type}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)  # type: ignore[return-value]
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets)  # type: ignore[return-value]
+
+    def get(self, name: str) -> Metric | None:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format (0.0.4)."""
+        lines: list[str] = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide default registry used by the gateway.
+REGISTRY = MetricsRegistry()
+
+# ---------------------------------------------------------------------------
+# Standard nanobot metrics
+# ---------------------------------------------------------------------------
+
+CHANNEL_MESSAGES = REGISTRY.counter(
+    "nanobot_channel_messages_total",
+    "Messages handled per channel and direction (inbound/outbound).",
+    ("channel", "direction"),
+)
+LLM_REQUESTS = REGISTRY.counter(
+    "nanobot_llm_requests_total",
+    "LLM chat requests by caller and finish reason.",
+    ("source", "finish_reason"),
+)
+LLM_LATENCY = REGISTRY.histogram(
+    "nanobot_llm_request_duration_seconds",
+    "LLM chat request latency in seconds.",
+    ("source",),
+)
+LLM_TOKENS = REGISTRY.counter(
+    "nanobot_llm_tokens_total",
+    "LLM tokens consumed, by caller and kind (prompt/completion).",
+    ("source", "kind"),
+)
+TOOL_CALLS = REGISTRY.counter(
+    "nanobot_tool_calls_total",
+    "Tool executions by tool name and outcome.",
+    ("tool", "status"),
+)
+TOOL_DURATION = REGISTRY.histogram(
+    "nanobot_tool_duration_seconds",
+    "Tool execution time in seconds.",
+    ("tool",),
+)
+
+
+def record_llm_call(source: str, seconds: float, finish_reason: str, usage: dict[str, int]) -> None:
+    """Record one LLM round-trip made by the given caller (agent, subagent, ...)."""
+    LLM_REQUESTS.inc(source=source, finish_reason=finish_reason or "unknown")
+    LLM_LATENCY.observe(seconds, source=source)
+    for kind in ("prompt", "completion"):
+        if tokens := usage.get(f"{kind}_tokens"):
+            LLM_TOKENS.inc(tokens, source=source, kind=kind)
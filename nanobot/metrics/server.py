@@ -0,0 +1,85 @@
+"""Minimal asyncio HTTP server exposing metrics for Prometheus scraping."""
+
+import asyncio
+
+from loguru import logger
+
+from nanobot.metrics.registry import REGISTRY, MetricsRegistry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsServer:
+    """
+    Serves GET <path> with the registry rendered in Prometheus text format.
+
+    Deliberately tiny: no routing beyond a single path and no keep-alive,
+    which is all a scraper needs.
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 18790,
+        path: str = "/metrics",
+        registry: MetricsRegistry | None = None,
+    ):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.registry = registry or REGISTRY
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> None:
+        """Bind the listening socket."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        sock = self._server.sockets[0] if self._server.sockets else None
+        if sock is not None:
+            self.port = sock.getsockname()[1]
+        logger.info(f"Metrics endpoint listening on http://{self.host}:{self.port}{self.path}")
+
+    async def stop(self) -> None:
+        """Close the listening socket."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+            # Drain headers; we don't need any of them
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+                if not line or line in (b"\r\n", b"\n"):
+                    break
+
+            parts = request_line.decode("latin-1").split()
+            method, target = (parts[0], parts[1]) if len(parts) >= 2 else ("", "")
+            path = target.split("?", 1)[0]
+
+            if method not in ("GET", "HEAD"):
+                status, body = "405 Method Not Allowed", b"method not allowed\n"
+            elif path != self.path:
+                status, body = "404 Not Found", b"not found\n"
+            else:
+                status, body = "200 OK", self.registry.render().encode("utf-8")
+
+            headers = (
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(headers.encode("latin-1"))
+            if method != "HEAD":
+                writer.write(body)
+            await writer.drain()
+        except Exception as e:
+            logger.debug(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
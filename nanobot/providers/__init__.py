@@ -1,6 +1,22 @@
 """LLM provider abstraction module."""
 
+from typing import TYPE_CHECKING
+
 from nanobot.providers.base import LLMProvider, LLMResponse
-from nanobot.providers.litellm_provider import LiteLLMProvider
 
-__all__ = ["LLMProvider", "LLMResponse", "LiteLLMProvider"]
+if TYPE_CHECKING:
+    from nanobot.providers.litellm_provider import LiteLLMProvider
+    from nanobot.providers.openai_provider import OpenAICompatProvider
+
+__all__ = ["LLMProvider", "LLMResponse", "LiteLLMProvider", "OpenAICompatProvider"]
+
+
+def __getattr__(name: str):
+    # Resolved lazily so importing nanobot.providers.base doesn't pull in LiteLLM/httpx.
+    if name == "LiteLLMProvider":
+        from nanobot.providers.litellm_provider import LiteLLMProvider
+        return LiteLLMProvider
+    if name == "OpenAICompatProvider":
+        from nanobot.providers.openai_provider import OpenAICompatProvider
+        return OpenAICompatProvider
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
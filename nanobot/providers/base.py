@@ -68,3 +68,6 @@ class LLMProvider(ABC):
     def get_default_model(self) -> str:
         """Get the default model for this provider."""
         pass
+
+    async def aclose(self) -> None:
+        """Release pooled connections. Providers without a client of their own do nothing."""
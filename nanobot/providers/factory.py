@@ -0,0 +1,40 @@
+"""Create the configured LLM provider."""
+
+from typing import TYPE_CHECKING
+
+from nanobot.providers.base import LLMProvider
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import Config
+
+
+def create_provider(config: "Config") -> LLMProvider:
+    """
+    Create the LLM provider for the default model.
+
+    Uses the native OpenAI-compatible client when the matched provider sets
+    backend "openai", LiteLLM otherwise. Raises ValueError if no API key is
+    configured or the openai backend has no apiBase.
+    """
+    p = config.get_provider()
+    model = config.agents.defaults.model
+    if not (p and p.api_key) and not model.startswith("bedrock/"):
+        raise ValueError("No API key configured. Set one in ~/.nanobot/config.json under providers")
+    if p and p.backend == "openai":
+        from nanobot.providers.openai_provider import OpenAICompatProvider
+        return OpenAICompatProvider(
+            api_key=p.api_key,
+            api_base=config.get_api_base(),
+            default_model=model,
+            extra_headers=p.extra_headers,
+            provider_name=config.get_provider_name(),
+        )
+
+    from nanobot.providers.litellm_provider import LiteLLMProvider
+    return LiteLLMProvider(
+        api_key=p.api_key if p else None,
+        api_base=config.get_api_base(),
+        default_model=model,
+        extra_headers=p.extra_headers if p else None,
+        provider_name=config.get_provider_name(),
+    )
@@ -1,14 +1,32 @@
 """LiteLLM provider implementation for multi-provider support."""
 
+import asyncio
 import json
 import os
+from types import ModuleType
 from typing import Any
 
-import litellm
-from litellm import acompletion
-
 from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
-from nanobot.providers.registry import find_by_model, find_gateway
+from nanobot.providers.registry import find_by_model, find_gateway, find_overrides, resolve_model
+
+_litellm: ModuleType | None = None
+
+
+def _get_litellm() -> ModuleType:
+    """Import and configure LiteLLM on first use.
+
+    Importing litellm takes hundreds of ms to seconds, so it is deferred until
+    the first chat call instead of being paid by every CLI command.
+    """
+    global _litellm
+    if _litellm is None:
+        import litellm
+        # Disable LiteLLM logging noise
+        litellm.suppress_debug_info = True
+        # Drop unsupported parameters for providers (e.g., gpt-5 rejects some params)
+        litellm.drop_params = True
+        _litellm = litellm
+    return _litellm
 
 
 class LiteLLMProvider(LLMProvider):
@@ -36,18 +54,14 @@ class LiteLLMProvider(LLMProvider):
         # provider_name (from config key) is the primary signal;
         # api_key / api_base are fallback for auto-detection.
         self._gateway = find_gateway(provider_name, api_key, api_base)
+        self._gateway_name = self._gateway.name if self._gateway else None
         
         # Configure environment variables
         if api_key:
             self._setup_env(api_key, api_base, default_model)
         
-        if api_base:
-            litellm.api_base = api_base
-        
-        # Disable LiteLLM logging noise
-        litellm.suppress_debug_info = True
-        # Drop unsupported parameters for providers (e.g., gpt-5 rejects some params)
-        litellm.drop_params = True
+        # litellm itself is configured lazily on the first chat call
+        self._litellm_configured = False
     
     def _setup_env(self, api_key: str, api_base: str | None, model: str) -> None:
         """Set environment variables based on detected provider."""
@@ -72,32 +86,11 @@ class LiteLLMProvider(LLMProvider):
     
     def _resolve_model(self, model: str) -> str:
         """Resolve model name by applying provider/gateway prefixes."""
-        if self._gateway:
-            # Gateway mode: apply gateway prefix, skip provider-specific prefixes
-            prefix = self._gateway.litellm_prefix
-            if self._gateway.strip_model_prefix:
-                model = model.split("/")[-1]
-            if prefix and not model.startswith(f"{prefix}/"):
-                model = f"{prefix}/{model}"
-            return model
-        
-        # Standard mode: auto-prefix for known providers
-        spec = find_by_model(model)
-        if spec and spec.litellm_prefix:
-            if not any(model.startswith(s) for s in spec.skip_prefixes):
-                model = f"{spec.litellm_prefix}/{model}"
-        
-        return model
+        return resolve_model(model, self._gateway_name).model
     
     def _apply_model_overrides(self, model: str, kwargs: dict[str, Any]) -> None:
         """Apply model-specific parameter overrides from the registry."""
-        model_lower = model.lower()
-        spec = find_by_model(model)
-        if spec:
-            for pattern, overrides in spec.model_overrides:
-                if pattern in model_lower:
-                    kwargs.update(overrides)
-                    return
+        kwargs.update(find_overrides(model))
     
     async def chat(
         self,
@@ -120,7 +113,8 @@ class LiteLLMProvider(LLMProvider):
         Returns:
             LLMResponse with content and/or tool calls.
         """
-        model = self._resolve_model(model or self.default_model)
+        resolved = resolve_model(model or self.default_model, self._gateway_name)
+        model = resolved.model
         
         # Clamp max_tokens to at least 1 — negative or zero values cause
         # LiteLLM to reject the request with "max_tokens must be at least 1".
@@ -134,7 +128,7 @@ class LiteLLMProvider(LLMProvider):
         }
         
         # Apply model-specific overrides (e.g. kimi-k2.5 temperature)
-        self._apply_model_overrides(model, kwargs)
+        kwargs.update(resolved.overrides)
         
         # Pass api_key directly — more reliable than env vars alone
         if self.api_key:
@@ -153,7 +147,13 @@ class LiteLLMProvider(LLMProvider):
             kwargs["tool_choice"] = "auto"
         
         try:
-            response = await acompletion(**kwargs)
+            # First call: import off the event loop so channels keep running
+            litellm = _litellm or await asyncio.to_thread(_get_litellm)
+            if not self._litellm_configured:
+                if self.api_base:
+                    litellm.api_base = self.api_base
+                self._litellm_configured = True
+            response = await litellm.acompletion(**kwargs)
             return self._parse_response(response)
         except Exception as e:
             # Return error as content for graceful handling
@@ -0,0 +1,228 @@
+"""Native OpenAI-compatible provider (vLLM, Ollama, custom gateways) without LiteLLM."""
+
+import json
+from typing import Any
+
+import httpx
+
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
+from nanobot.providers.registry import find_by_name, find_gateway, find_overrides
+
+DEFAULT_OPENAI_BASE = "https://api.openai.com/v1"
+
+
+class OpenAICompatProvider(LLMProvider):
+    """
+    LLM provider that talks to any OpenAI-compatible /chat/completions endpoint.
+
+    Skips LiteLLM's translation layer and import cost. Requests go through one
+    pooled keep-alive httpx client per provider instance and are streamed (SSE)
+    by default, then assembled into a regular LLMResponse.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        api_base: str | None = None,
+        default_model: str = "gpt-4o",
+        extra_headers: dict[str, str] | None = None,
+        provider_name: str | None = None,
+        stream: bool = True,
+        timeout: float = 300.0,
+        max_connections: int = 20,
+    ):
+        spec = (find_by_name(provider_name) if provider_name else None) or find_gateway(
+            provider_name, api_key, api_base
+        )
+        base = api_base or (spec.default_api_base if spec else "")
+        if not base and provider_name in (None, "openai"):
+            base = DEFAULT_OPENAI_BASE
+        if not base:
+            raise ValueError(f"Provider '{provider_name}' needs an apiBase for the openai backend")
+
+        super().__init__(api_key, base.rstrip("/"))
+        self.default_model = default_model
+        self.extra_headers = extra_headers or {}
+        self.stream = stream
+        self._spec = spec
+        self._timeout = httpx.Timeout(timeout, connect=10.0)
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=60.0,
+        )
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the pooled client on first use (inside the running event loop)."""
+        if self._client is None or self._client.is_closed:
+            headers = {"Content-Type": "application/json", **self.extra_headers}
+            if self.api_key:
+                headers["Authorization"] = f"Bearer {self.api_key}"
+            self._client = httpx.AsyncClient(
+                base_url=self.api_base,
+                headers=headers,
+                timeout=self._timeout,
+                limits=self._limits,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _resolve_model(self, model: str) -> str:
+        """Strip nanobot-side routing prefixes; the endpoint expects its own model name."""
+        spec = self._spec
+        if spec and spec.strip_model_prefix:
+            return model.split("/")[-1]
+        if spec and model.startswith(f"{spec.name}/"):
+            return model[len(spec.name) + 1:]
+        return model
+
+    async def chat(
+        self,
+        messages: list[dict[str, Any]],
+        tools: list[dict[str, Any]] | None = None,
+        model: str | None = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.7,
+    ) -> LLMResponse:
+        """
+        Send a chat completion request to the OpenAI-compatible endpoint.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'.
+            tools: Optional list of tool definitions in OpenAI format.
+            model: Model identifier as served by the endpoint.
+            max_tokens: Maximum tokens in response.
+            temperature: Sampling temperature.
+
+        Returns:
+            LLMResponse with content and/or tool calls.
+        """
+        model = model or self.default_model
+        body: dict[str, Any] = {
+            "model": self._resolve_model(model),
+            "messages": messages,
+            "max_tokens": max(1, max_tokens),
+            "temperature": temperature,
+        }
+        body.update(find_overrides(model))
+        if tools:
+            body["tools"] = tools
+            body["tool_choice"] = "auto"
+
+        try:
+            client = self._get_client()
+            if not self.stream:
+                r = await client.post("/chat/completions", json=body)
+                r.raise_for_status()
+                return self._parse_response(r.json())
+
+            body["stream"] = True
+            body["stream_options"] = {"include_usage": True}
+            async with client.stream("POST", "/chat/completions", json=body) as r:
+                if r.status_code >= 400:
+                    await r.aread()
+                    r.raise_for_status()
+                return await self._parse_stream(r)
+        except httpx.HTTPStatusError as e:
+            detail = e.response.text[:500] if e.response is not None else ""
+            return LLMResponse(content=f"Error calling LLM: {e} {detail}".strip(), finish_reason="error")
+        except Exception as e:
+            return LLMResponse(content=f"Error calling LLM: {str(e)}", finish_reason="error")
+
+    def _parse_response(self, data: dict[str, Any]) -> LLMResponse:
+        """Parse a non-streamed chat completion."""
+        choice = data["choices"][0]
+        message = choice.get("message") or {}
+        tool_calls = [
+            ToolCallRequest(
+                id=tc.get("id", ""),
+                name=tc["function"]["name"],
+                arguments=_parse_arguments(tc["function"].get("arguments")),
+            )
+            for tc in message.get("tool_calls") or []
+        ]
+        return LLMResponse(
+            content=message.get("content"),
+            tool_calls=tool_calls,
+            finish_reason=choice.get("finish_reason") or "stop",
+            usage=_parse_usage(data.get("usage")),
+            reasoning_content=message.get("reasoning_content"),
+        )
+
+    async def _parse_stream(self, response: httpx.Response) -> LLMResponse:
+        """Assemble SSE chunks (content, reasoning, tool-call fragments) into one response."""
+        content: list[str] = []
+        reasoning: list[str] = []
+        calls: dict[int, dict[str, Any]] = {}
+        finish_reason = "stop"
+        usage: dict[str, int] = {}
+
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            payload = line[5:].strip()
+            if payload == "[DONE]":
+                break
+            chunk = json.loads(payload)
+            if chunk.get("usage"):
+                usage = _parse_usage(chunk["usage"])
+            for choice in chunk.get("choices") or []:
+                delta = choice.get("delta") or {}
+                if delta.get("content"):
+                    content.append(delta["content"])
+                if delta.get("reasoning_content"):
+                    reasoning.append(delta["reasoning_content"])
+                for tc in delta.get("tool_calls") or []:
+                    slot = calls.setdefault(tc.get("index", len(calls)), {"id": "", "name": "", "arguments": []})
+                    if tc.get("id"):
+                        slot["id"] = tc["id"]
+                    fn = tc.get("function") or {}
+                    if fn.get("name"):
+                        slot["name"] += fn["name"]
+                    if fn.get("arguments"):
+                        slot["arguments"].append(fn["arguments"])
+                if choice.get("finish_reason"):
+                    finish_reason = choice["finish_reason"]
+
+        tool_calls = [
+            ToolCallRequest(id=c["id"], name=c["name"], arguments=_parse_arguments("".join(c["arguments"])))
+            for _, c in sorted(calls.items())
+        ]
+        return LLMResponse(
+            content="".join(content) if content else None,
+            tool_calls=tool_calls,
+            finish_reason=finish_reason,
+            usage=usage,
+            reasoning_content="".join(reasoning) if reasoning else None,
+        )
+
+    def get_default_model(self) -> str:
+        """Get the default model."""
+        return self.default_model
+
+
+def _parse_arguments(args: Any) -> dict[str, Any]:
+    if isinstance(args, dict):
+        return args
+    if not args:
+        return {}
+    try:
+        return json.loads(args)
+    except json.JSONDecodeError:
+        return {"raw": args}
+
+
+def _parse_usage(usage: dict[str, Any] | None) -> dict[str, int]:
+    if not usage:
+        return {}
+    return {
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": usage.get("completion_tokens", 0),
+        "total_tokens": usage.get("total_tokens", 0),
+    }
@@ -12,8 +12,10 @@ Every entry writes out all fields so you can copy-paste as a template.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping
 
 
 @dataclass(frozen=True)
@@ -318,22 +320,88 @@ PROVIDERS: tuple[ProviderSpec, ...] = (
 )
 
 
+# ---------------------------------------------------------------------------
+# Lookup indexes — built once at import time from PROVIDERS.
+# ---------------------------------------------------------------------------
+
+_BY_NAME: dict[str, ProviderSpec] = {spec.name: spec for spec in PROVIDERS}
+
+# (keyword, spec) pairs for standard providers, flattened in registry order so the
+# first hit is the same spec a nested scan over PROVIDERS would return.
+_STANDARD_KEYWORDS: tuple[tuple[str, ProviderSpec], ...] = tuple(
+    (kw, spec)
+    for spec in PROVIDERS
+    if not (spec.is_gateway or spec.is_local)
+    for kw in spec.keywords
+)
+
+_DETECTORS: tuple[ProviderSpec, ...] = tuple(
+    spec for spec in PROVIDERS if spec.detect_by_key_prefix or spec.detect_by_base_keyword
+)
+
+
+@dataclass(frozen=True)
+class ModelResolution:
+    """Result of resolving a configured model name for one gateway (or none)."""
+
+    model: str                                   # final LiteLLM model string
+    spec: ProviderSpec | None                    # standard provider matched on the final model
+    overrides: Mapping[str, Any] = field(default_factory=dict)  # read-only per-model params
+
+
 # ---------------------------------------------------------------------------
 # Lookup helpers
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=1024)
 def find_by_model(model: str) -> ProviderSpec | None:
     """Match a standard provider by model-name keyword (case-insensitive).
     Skips gateways/local — those are matched by api_key/api_base instead."""
     model_lower = model.lower()
-    for spec in PROVIDERS:
-        if spec.is_gateway or spec.is_local:
-            continue
-        if any(kw in model_lower for kw in spec.keywords):
+    for kw, spec in _STANDARD_KEYWORDS:
+        if kw in model_lower:
             return spec
     return None
 
 
+@lru_cache(maxsize=1024)
+def resolve_model(model: str, gateway: str | None = None) -> ModelResolution:
+    """Resolve a model name to its LiteLLM form plus per-model overrides.
+
+    Memoized per (model, gateway name), so the hot path of every chat call
+    costs a single cache lookup.
+
+    Gateway mode applies the gateway prefix and skips provider-specific
+    prefixes; standard mode auto-prefixes for the keyword-matched provider.
+    Overrides are matched against the final model string, as before.
+    """
+    gw = _BY_NAME.get(gateway) if gateway else None
+    if gw:
+        if gw.strip_model_prefix:
+            model = model.split("/")[-1]
+        if gw.litellm_prefix and not model.startswith(f"{gw.litellm_prefix}/"):
+            model = f"{gw.litellm_prefix}/{model}"
+    else:
+        spec = find_by_model(model)
+        if spec and spec.litellm_prefix:
+            if not any(model.startswith(s) for s in spec.skip_prefixes):
+                model = f"{spec.litellm_prefix}/{model}"
+
+    return ModelResolution(model=model, spec=find_by_model(model), overrides=find_overrides(model))
+
+
+@lru_cache(maxsize=1024)
+def find_overrides(model: str) -> Mapping[str, Any]:
+    """Per-model parameter overrides from the matched spec (read-only, may be empty)."""
+    spec = find_by_model(model)
+    if spec:
+        model_lower = model.lower()
+        for pattern, values in spec.model_overrides:
+            if pattern in model_lower:
+                return MappingProxyType(dict(values))
+    return MappingProxyType({})
+
+
 def find_gateway(
     provider_name: str | None = None,
     api_key: str | None = None,
@@ -356,7 +424,7 @@ def find_gateway(
             return spec
 
     # 2. Auto-detect by api_key prefix / api_base keyword
-    for spec in PROVIDERS:
+    for spec in _DETECTORS:
         if spec.detect_by_key_prefix and api_key and api_key.startswith(spec.detect_by_key_prefix):
             return spec
         if spec.detect_by_base_keyword and api_base and spec.detect_by_base_keyword in api_base:
@@ -367,7 +435,4 @@ def find_gateway(
 
 def find_by_name(name: str) -> ProviderSpec | None:
     """Find a provider spec by config field name, e.g. "dashscope"."""
-    for spec in PROVIDERS:
-        if spec.name == name:
-            return spec
-    return None
+    return _BY_NAME.get(name)
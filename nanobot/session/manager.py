@@ -149,6 +149,11 @@ class SessionManager:
     def invalidate(self, key: str) -> None:
         """Remove a session from the in-memory cache."""
         self._cache.pop(key, None)
+
+    @property
+    def cache_size(self) -> int:
+        """Number of sessions currently held in memory."""
+        return len(self._cache)
     
     def list_sessions(self) -> list[dict[str, Any]]:
         """
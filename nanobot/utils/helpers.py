@@ -1,7 +1,21 @@
 """Utility functions for nanobot."""
 
+import asyncio
+import contextlib
+import functools
+import os
+import tempfile
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+T = TypeVar("T")
+
+# mkstemp creates files as 0600; new files get the usual umask-derived mode instead
+_UMASK = os.umask(0)
+os.umask(_UMASK)
 
 
 def ensure_dir(path: Path) -> Path:
@@ -10,6 +24,82 @@ def ensure_dir(path: Path) -> Path:
     return path
 
 
+def atomic_write_text(path: Path, content: str, encoding: str = "utf-8") -> None:
+    """Write text to a temp file in the same directory, then rename it over path.
+
+    Readers see either the old or the new content, never a partial write.
+    The permission bits of an existing file are kept; a new file gets
+    0666 minus the umask, as open() would give it.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            mode = path.stat().st_mode & 0o7777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class _FileLock:
+    """An asyncio lock plus the number of tasks holding or waiting for it."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+_file_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[Path, _FileLock]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@contextlib.asynccontextmanager
+async def file_lock(path: Path) -> AsyncIterator[None]:
+    """Hold the lock guarding read-modify-write of a file in the running loop.
+
+    A file's lock is dropped once no task holds or waits for it, so the
+    table does not grow with every path ever written.
+    """
+    locks = _file_locks.setdefault(asyncio.get_running_loop(), {})
+    key = path.resolve()
+    entry = locks.get(key)
+    if entry is None:
+        entry = locks[key] = _FileLock()
+    entry.users += 1
+    try:
+        async with entry.lock:
+            yield
+    finally:
+        entry.users -= 1
+        if not entry.users:
+            del locks[key]
+
+
+# Shared by the filesystem tools; created on first use, bounded so a burst of
+# tool calls cannot spawn unbounded threads against a slow disk
+IO_MAX_WORKERS = 4
+_io_executor: ThreadPoolExecutor | None = None
+
+
+async def run_io(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run blocking disk I/O on the bounded I/O thread pool."""
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(max_workers=IO_MAX_WORKERS, thread_name_prefix="nanobot-io")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_executor, functools.partial(fn, *args, **kwargs))
+
+
 def get_data_path() -> Path:
     """Get the nanobot data directory (~/.nanobot)."""
     return ensure_dir(Path.home() / ".nanobot")
@@ -30,18 +30,13 @@ class GatewayWorker(QRunnable):
             from nanobot.bus.queue import MessageBus
             from nanobot.config.loader import load_config
             from nanobot.cron.service import CronService
-            from nanobot.providers.litellm_provider import LiteLLMProvider
+            from nanobot.providers.factory import create_provider
 
             config = load_config()
 
             # Create components
             bus = MessageBus()
-            provider = LiteLLMProvider(
-                api_key=config.providers.dashscope.api_key
-                if hasattr(config.providers, "dashscope")
-                else None,
-                default_model=config.agents.defaults.model,
-            )
+            provider = create_provider(config)
 
             agent = AgentLoop(
                 bus=bus,
@@ -62,7 +57,8 @@ class GatewayWorker(QRunnable):
             while not self.stop_event.is_set():
                 time.sleep(0.1)
 
-            agent.stop()
+            loop.run_until_complete(agent.close())
+            loop.close()
 
         except Exception as e:
             print(f"Gateway error: {e}")
@@ -69,7 +69,7 @@ class GatewayService(QObject):
             from nanobot.config.loader import load_config
             from nanobot.cron.service import CronService
             from nanobot.heartbeat.service import HeartbeatService
-            from nanobot.providers.litellm_provider import LiteLLMProvider
+            from nanobot.providers.factory import create_provider
 
             # Load config
             config = load_config()
@@ -81,20 +81,8 @@ class GatewayService(QObject):
             # Initialize components
             bus = MessageBus()
 
-            # Get provider
-            provider_name = config.agents.defaults.provider
-            provider_config = getattr(config.providers, provider_name, None)
-
-            if provider_config and provider_config.api_key:
-                provider = LiteLLMProvider(
-                    api_key=provider_config.api_key,
-                    api_base=provider_config.api_base or None,
-                    default_model=config.agents.defaults.model,
-                    provider_name=provider_name,
-                )
-            else:
-                # Fallback to default
-                provider = LiteLLMProvider(default_model=config.agents.defaults.model)
+            # Same provider selection as the CLI (LiteLLM or the native OpenAI-compatible backend)
+            provider = create_provider(config)
 
             # Create agent
             agent = AgentLoop(
@@ -143,7 +131,7 @@ class GatewayService(QObject):
                     await asyncio.sleep(0.1)
 
                 # Stop services
-                agent.stop()
+                await agent.close()
                 await channel_manager.stop()
                 if heartbeat_task:
                     heartbeat.stop()
@@ -0,0 +1,95 @@
+import json
+import re
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.queue import MessageBus
+from nanobot.config.schema import MemoryConfig
+from nanobot.providers.base import LLMProvider, LLMResponse
+
+
+class BatchProvider(LLMProvider):
+    def __init__(self) -> None:
+        super().__init__(api_key=None)
+        self.prompts: list[str] = []
+
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        keys = re.findall(r"^### Session (\S+)$", prompt, re.MULTILINE)
+        return LLMResponse(content=json.dumps({
+            "sessions": {k: {"history_entry": f"[2026-01-01 00:00] Talked in {k}."} for k in keys},
+            "memory_patch": [{"op": "add", "section": "Facts", "text": f"- {len(keys)} chats active"}],
+        }))
+
+    def get_default_model(self) -> str:
+        return "test"
+
+
+async def test_sessions_are_consolidated_in_one_call(tmp_path) -> None:
+    provider = BatchProvider()
+    agent = AgentLoop(
+        bus=MessageBus(), provider=provider, workspace=tmp_path, memory_window=4,
+        memory_config=MemoryConfig(batch_window_s=0.01, rollup_after_days=0),
+    )
+    sessions = []
+    for i in range(3):
+        session = agent.sessions.get_or_create(f"telegram:{i}")
+        for n in range(10):
+            session.add_message("user" if n % 2 == 0 else "assistant", f"message {n} in chat {i}")
+        sessions.append(session)
+        agent._request_consolidation(session)
+
+    await agent.drain()
+
+    assert len(provider.prompts) == 1
+    assert provider.prompts[0].count("## Current Long-term Memory") == 1
+    history = (tmp_path / "memory" / "HISTORY.md").read_text()
+    assert all(f"Talked in telegram:{i}." in history for i in range(3))
+    assert "- 3 chats active" in (tmp_path / "memory" / "MEMORY.md").read_text()
+    assert [s.last_consolidated for s in sessions] == [8, 8, 8]
+
+
+async def test_batch_respects_max_sessions(tmp_path) -> None:
+    provider = BatchProvider()
+    agent = AgentLoop(
+        bus=MessageBus(), provider=provider, workspace=tmp_path, memory_window=4,
+        memory_config=MemoryConfig(batch_window_s=0.01, batch_max_sessions=2, rollup_after_days=0),
+    )
+    for i in range(4):
+        session = agent.sessions.get_or_create(f"slack:{i}")
+        for n in range(10):
+            session.add_message("user", f"message {n}")
+        agent._request_consolidation(session)
+
+    await agent.drain()
+    assert len(provider.prompts) == 2
+
+
+class FullUpdateProvider(BatchProvider):
+    async def chat(self, messages, tools=None, model=None, max_tokens=4096, temperature=0.7) -> LLMResponse:
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        keys = re.findall(r"^### Session (\S+)$", prompt, re.MULTILINE)
+        return LLMResponse(content=json.dumps({
+            "sessions": {k: {"history_entry": f"[2026-01-01 00:00] Talked in {k}."} for k in keys},
+            "memory_update": "# Facts\n- rewritten in full\n",
+        }))
+
+
+async def test_batch_honors_full_update_mode(tmp_path) -> None:
+    provider = FullUpdateProvider()
+    agent = AgentLoop(
+        bus=MessageBus(), provider=provider, workspace=tmp_path, memory_window=4,
+        memory_config=MemoryConfig(batch_window_s=0.01, update_mode="full", rollup_after_days=0),
+    )
+    for i in range(2):
+        session = agent.sessions.get_or_create(f"cli:{i}")
+        for n in range(10):
+            session.add_message("user", f"message {n}")
+        agent._request_consolidation(session)
+
+    await agent.drain()
+
+    assert len(provider.prompts) == 1
+    assert '"memory_update"' in provider.prompts[0] and "memory_patch" not in provider.prompts[0]
+    assert (tmp_path / "memory" / "MEMORY.md").read_text() == "# Facts\n- rewritten in full\n"
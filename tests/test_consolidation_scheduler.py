@@ -0,0 +1,128 @@
+import asyncio
+
+from nanobot.agent.consolidation import ConsolidationScheduler
+from nanobot.config.loader import convert_keys
+from nanobot.config.schema import Config
+
+
+async def test_same_session_jobs_never_overlap_and_coalesce() -> None:
+    scheduler = ConsolidationScheduler(max_concurrent=4)
+    release = asyncio.Event()
+    runs: list[str] = []
+    active = 0
+    overlap = False
+
+    def job(tag: str):
+        async def run() -> None:
+            nonlocal active, overlap
+            active += 1
+            overlap = overlap or active > 1
+            runs.append(tag)
+            await release.wait()
+            active -= 1
+        return run
+
+    scheduler.submit("s", job("first"))
+    await asyncio.sleep(0)
+    for i in range(5):
+        scheduler.submit("s", job(f"trigger{i}"))
+    assert scheduler.backlog == 2  # one running, one coalesced follow-up
+
+    release.set()
+    await scheduler.join()
+    assert runs == ["first", "trigger4"]
+    assert not overlap
+    assert scheduler.backlog == 0
+
+
+async def test_non_coalescing_jobs_all_run_in_order() -> None:
+    scheduler = ConsolidationScheduler()
+    runs: list[int] = []
+
+    for i in range(3):
+        async def run(i: int = i) -> None:
+            runs.append(i)
+        scheduler.submit("s", run, coalesce=False)
+
+    await scheduler.join()
+    assert runs == [0, 1, 2]
+
+
+async def test_global_concurrency_cap() -> None:
+    scheduler = ConsolidationScheduler(max_concurrent=2)
+    active = peak = 0
+
+    async def run() -> None:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    for i in range(6):
+        scheduler.submit(f"s{i}", run)
+    await scheduler.join()
+    assert peak == 2
+
+
+async def test_jobs_wait_for_interactive_turns() -> None:
+    scheduler = ConsolidationScheduler(max_defer=5.0)
+    ran = asyncio.Event()
+
+    async def run() -> None:
+        ran.set()
+
+    with scheduler.interactive():
+        scheduler.submit("s", run)
+        await asyncio.sleep(0.02)
+        assert not ran.is_set()
+    await asyncio.wait_for(ran.wait(), timeout=1.0)
+
+
+async def test_failing_job_does_not_block_followups() -> None:
+    scheduler = ConsolidationScheduler()
+    runs: list[str] = []
+
+    async def boom() -> None:
+        raise RuntimeError("llm down")
+
+    async def ok() -> None:
+        runs.append("ok")
+
+    scheduler.submit("s", boom, coalesce=False)
+    scheduler.submit("s", ok)
+    await scheduler.join()
+    assert runs == ["ok"]
+
+
+async def test_multi_session_job_waits_for_session_jobs() -> None:
+    scheduler = ConsolidationScheduler(max_concurrent=4)
+    release = asyncio.Event()
+    events: list[str] = []
+
+    async def session_job() -> None:
+        events.append("a:start")
+        await release.wait()
+        events.append("a:end")
+
+    async def batch_job() -> None:
+        async with scheduler.hold(["a", "b"]):
+            events.append("batch")
+
+    scheduler.submit("a", session_job)
+    await asyncio.sleep(0)
+    scheduler.submit("memory:batch", batch_job)
+    await asyncio.sleep(0.01)
+    assert events == ["a:start"]
+
+    release.set()
+    await scheduler.join()
+    assert events == ["a:start", "a:end", "batch"]
+
+
+def test_max_concurrent_consolidations_is_configurable() -> None:
+    config = Config.model_validate(convert_keys(
+        {"agents": {"defaults": {"memory": {"maxConcurrentConsolidations": 3}}}}
+    ))
+    assert config.agents.defaults.memory.max_concurrent_consolidations == 3
+    assert Config().agents.defaults.memory.max_concurrent_consolidations == 1
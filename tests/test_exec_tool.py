@@ -0,0 +1,223 @@
+import os
+import signal
+import sys
+import time
+
+import pytest
+
+from nanobot.agent.tools.sandbox import ResourceLimits
+from nanobot.agent.tools.shell import ExecTool
+from nanobot.agent.tools.shell_session import ShellSessionPool
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="POSIX shell commands")
+
+
+async def test_exec_returns_output_and_exit_code(tmp_path) -> None:
+    result = await ExecTool(working_dir=str(tmp_path)).execute("echo hello; echo oops >&2; exit 3")
+
+    assert result == "hello\n\nSTDERR:\noops\n\n\nExit code: 3"
+
+
+async def test_exec_keeps_head_and_tail_of_long_output(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), max_output_bytes=100)
+
+    result = await tool.execute("seq 1 10000")
+
+    assert result.startswith("1\n2\n3\n")
+    assert result.rstrip().endswith("10000")
+    assert "bytes omitted" in result
+    assert len(result) < 300
+
+
+async def test_exec_kills_runaway_output(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), kill_after_bytes=256 * 1024, timeout=20)
+
+    start = time.monotonic()
+    result = await tool.execute("yes")
+
+    assert time.monotonic() - start < 10
+    assert result.startswith("Error: Command killed after producing more than 262144 bytes")
+
+
+async def test_exec_timeout_kills_process_group(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), timeout=1)
+
+    start = time.monotonic()
+    # The background sleep keeps stdout open; only a group kill ends it
+    result = await tool.execute("echo started; sleep 30 & sleep 30")
+
+    assert time.monotonic() - start < 5
+    assert result.startswith("Error: Command timed out after 1 seconds")
+    assert "started" in result
+
+
+async def test_exec_reports_progress_for_long_commands(tmp_path) -> None:
+    sent = []
+
+    async def capture(msg):
+        sent.append(msg)
+
+    tool = ExecTool(working_dir=str(tmp_path), progress_interval=0.2, progress_callback=capture)
+    tool.set_context("telegram", "42")
+
+    result = await tool.execute("echo step1; sleep 0.7; echo done")
+
+    assert result == "step1\ndone\n"
+    assert sent and sent[0].chat_id == "42"
+    assert "Still running" in sent[0].content and "step1" in sent[0].content
+
+
+@pytest.fixture()
+async def session_tool(tmp_path):
+    tool = ExecTool(working_dir=str(tmp_path), timeout=5, persistent_sessions=True)
+    tool.set_context("telegram", "42")
+    yield tool
+    await tool.sessions.close_all()
+
+
+async def test_persistent_session_keeps_cwd_and_env(session_tool, tmp_path) -> None:
+    (tmp_path / "sub").mkdir()
+
+    await session_tool.execute("cd sub && export GREETING=hi")
+    result = await session_tool.execute('pwd; echo "$GREETING"')
+
+    assert result == f"{tmp_path / 'sub'}\nhi\n"
+
+
+async def test_per_call_working_dir_does_not_move_the_session(session_tool, tmp_path) -> None:
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "other").mkdir()
+    await session_tool.execute("cd sub")
+
+    one_off = await session_tool.execute("pwd # where am I", working_dir=str(tmp_path / "other"))
+    after = await session_tool.execute("pwd")
+
+    assert one_off == f"{tmp_path / 'other'}\n"
+    assert after == f"{tmp_path / 'sub'}\n"
+
+
+async def test_persistent_session_reports_exit_codes_and_syntax_errors(session_tool) -> None:
+    failed = await session_tool.execute("echo partial; false")
+    broken = await session_tool.execute("echo 'unterminated")
+    after = await session_tool.execute("echo still alive")
+
+    assert failed == "partial\n\n\nExit code: 1"
+    assert "Exit code: 2" in broken
+    assert after == "still alive\n"
+
+
+async def test_persistent_session_restarts_after_timeout_and_exit(session_tool, tmp_path) -> None:
+    session_tool.timeout = 1
+    await session_tool.execute("export MARK=1")
+
+    timed_out = await session_tool.execute("sleep 30")
+    session_tool.timeout = 5
+    fresh = await session_tool.execute('echo "mark=$MARK"')
+    exited = await session_tool.execute("exit 4")
+    again = await session_tool.execute("echo back")
+
+    assert timed_out.startswith("Error: Command timed out after 1 seconds; the shell session was restarted")
+    assert fresh == "mark=\n"
+    assert "Exit code: 4 (the shell exited" in exited
+    assert again == "back\n"
+
+
+async def test_persistent_sessions_are_per_chat(session_tool) -> None:
+    await session_tool.execute("export WHO=first")
+    session_tool.set_context("telegram", "43")
+
+    result = await session_tool.execute('echo "who=$WHO"')
+
+    assert result == "who=\n"
+    assert len(session_tool.sessions) == 2
+
+
+async def test_persistent_session_returns_to_workspace_when_restricted(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), timeout=5, persistent_sessions=True, restrict_to_workspace=True)
+    tool.set_context("telegram", "42")
+    (tmp_path / "sub").mkdir()
+    try:
+        await tool.execute("cd ~")
+        reset = await tool.execute("pwd")
+        await tool.execute("cd sub")
+        kept = await tool.execute("pwd")
+    finally:
+        await tool.close()
+
+    assert reset.splitlines() == [f"(working directory reset to {tmp_path.resolve()})", str(tmp_path.resolve())]
+    assert kept == f"{tmp_path.resolve() / 'sub'}\n"
+
+
+async def test_session_pool_never_evicts_a_busy_shell(tmp_path) -> None:
+    pool = ShellSessionPool(max_sessions=1)
+    busy = await pool.get("a", str(tmp_path))
+    async with busy.lock:
+        await pool.get("b", str(tmp_path))
+        assert len(pool) == 2  # "a" is busy, so nothing could be evicted
+        await pool.get("c", str(tmp_path))
+        assert list(pool._sessions) == ["a", "c"]
+        assert pool._sessions["a"] is busy
+    await pool.close_all()
+
+
+async def test_exec_applies_rlimits_and_reports_usage(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), limits=ResourceLimits(max_file_size_mb=1, nice=5))
+
+    result = await tool.execute(
+        "ulimit -f; cut -d' ' -f19 /proc/self/stat; head -c 2000000 /dev/zero > big.bin"
+    )
+
+    lines = result.splitlines()
+    # ulimit -f reports 1024-byte blocks in bash, 512-byte blocks in dash
+    assert lines[0] in ("1024", "2048")
+    assert int(lines[1]) >= 5
+    assert "file size limit (1 MB) exceeded" in result
+    assert lines[-1].startswith("[usage: wall ")
+    assert (tmp_path / "big.bin").stat().st_size <= 1024 * 1024
+
+
+async def test_exec_cpu_limit_stops_busy_loop(tmp_path) -> None:
+    tool = ExecTool(working_dir=str(tmp_path), timeout=20, limits=ResourceLimits(cpu_seconds=1))
+
+    start = time.monotonic()
+    result = await tool.execute("while :; do :; done")
+
+    assert time.monotonic() - start < 10
+    assert "CPU time limit (1s) exceeded" in result
+
+
+def test_resource_limits_inactive_by_default() -> None:
+    limits = ResourceLimits()
+
+    assert not limits.active
+    assert limits.shell_prefix() == ""
+
+
+async def test_session_shell_applies_limits(tmp_path) -> None:
+    tool = ExecTool(
+        working_dir=str(tmp_path), persistent_sessions=True,
+        limits=ResourceLimits(max_file_size_mb=1, max_processes=4000, memory_mb=2048),
+    )
+    tool.set_context("cli", "direct", "cli:direct")
+
+    result = await tool.execute(
+        "python3 -c \"import resource as r; print(*(r.getrlimit(k)[0] for k in "
+        "(r.RLIMIT_FSIZE, r.RLIMIT_NPROC, r.RLIMIT_AS)))\""
+    )
+    await tool.close()
+
+    assert result.splitlines()[0] == f"{1024 * 1024} 4000 {2048 * 1024 * 1024}"
+
+
+async def test_timeout_keeps_output_when_a_child_escapes_the_group(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr("nanobot.agent.tools.shell.KILL_GRACE", 0.5)
+    tool = ExecTool(working_dir=str(tmp_path), timeout=1)
+
+    start = time.monotonic()
+    # The setsid child leaves the process group but keeps stdout open
+    result = await tool.execute("echo before; setsid sh -c 'echo $$ > escaped.pid; exec sleep 30' & sleep 30")
+    os.kill(int((tmp_path / "escaped.pid").read_text()), signal.SIGKILL)
+
+    assert time.monotonic() - start < 5
+    assert "timed out after 1 seconds" in result
+    assert "before" in result
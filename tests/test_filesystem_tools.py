@@ -0,0 +1,228 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from nanobot.agent.tools import filesystem
+from nanobot.agent.tools.filesystem import EditFileTool, ListDirTool, ReadFileTool, WriteFileTool
+
+
+@pytest.fixture()
+def numbered(tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 101)), encoding="utf-8")
+    return path
+
+
+async def test_read_file_small_file_is_returned_whole(numbered) -> None:
+    result = await ReadFileTool().execute(path=str(numbered))
+
+    assert result == numbered.read_text(encoding="utf-8")
+
+
+async def test_read_file_line_range(numbered) -> None:
+    result = await ReadFileTool().execute(path=str(numbered), offset=10, limit=3)
+
+    assert result.startswith("line 10\nline 11\nline 12\n")
+    assert "line 13" not in result
+    assert "Use offset=13 to continue" in result
+
+
+async def test_read_file_byte_range(numbered) -> None:
+    result = await ReadFileTool().execute(path=str(numbered), byte_offset=7, byte_limit=7)
+
+    assert result.startswith("line 2\n")
+    assert "byte_offset=14" in result
+
+
+async def test_read_file_large_file_gets_head_and_tail_preview(numbered) -> None:
+    result = await ReadFileTool(max_bytes=200).execute(path=str(numbered))
+
+    assert result.startswith("line 1\n")
+    assert result.rstrip().endswith("line 100")
+    assert "line 50\n" not in result
+    assert "showing the first and last" in result
+
+
+async def test_read_file_caps_line_range_at_max_bytes(numbered) -> None:
+    result = await ReadFileTool(max_bytes=30).execute(path=str(numbered), offset=1, limit=50)
+
+    assert result.startswith("line 1\nline 2\nline 3\nline 4\n")
+    assert "Use offset=5 to continue" in result
+
+
+async def test_read_file_uses_mmap_for_large_files(numbered, monkeypatch) -> None:
+    monkeypatch.setattr(filesystem, "MMAP_THRESHOLD", 1)
+
+    result = await ReadFileTool().execute(path=str(numbered), offset=99)
+
+    assert result == "line 99\nline 100\n"
+
+
+async def test_read_file_offset_past_last_line_is_an_error(tmp_path) -> None:
+    path = tmp_path / "two.txt"
+    path.write_text("a\nb\n", encoding="utf-8")
+    tool = ReadFileTool()
+
+    assert await tool.execute(path=str(path), offset=2) == "b\n"
+    assert await tool.execute(path=str(path), offset=3) == "Error: offset 3 is past the end of the file"
+    path.write_text("a\nb", encoding="utf-8")
+    assert await tool.execute(path=str(path), offset=3) == "Error: offset 3 is past the end of the file"
+
+
+async def test_read_file_rejects_binary(tmp_path) -> None:
+    path = tmp_path / "blob.bin"
+    path.write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00\x00")
+
+    result = await ReadFileTool().execute(path=str(path))
+
+    assert result.startswith("Error:") and "binary" in result
+
+
+async def test_filesystem_tools_run_off_the_event_loop(tmp_path, monkeypatch) -> None:
+    threads = []
+    original = ReadFileTool._read_file
+
+    def spy(self, *args):
+        threads.append(threading.current_thread().name)
+        return original(self, *args)
+
+    monkeypatch.setattr(ReadFileTool, "_read_file", spy)
+    path = tmp_path / "notes.md"
+
+    await WriteFileTool().execute(path=str(path), content="alpha beta\n")
+    edited = await EditFileTool().execute(path=str(path), old_text="beta", new_text="gamma")
+    reads = await asyncio.gather(*(ReadFileTool().execute(path=str(path)) for _ in range(3)))
+    listing = await ListDirTool().execute(path=str(tmp_path))
+
+    assert edited == f"Successfully edited {path}"
+    assert reads == ["alpha gamma\n"] * 3
+    assert "notes.md" in listing
+    assert threads and all(name.startswith("nanobot-io") for name in threads)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permission bits")
+async def test_write_file_new_file_gets_umask_mode(tmp_path) -> None:
+    umask = os.umask(0)
+    os.umask(umask)
+    new = tmp_path / "sub" / "new.txt"
+    existing = tmp_path / "script.sh"
+    existing.write_text("old", encoding="utf-8")
+    existing.chmod(0o750)
+
+    await WriteFileTool().execute(path=str(new), content="hello")
+    await WriteFileTool().execute(path=str(existing), content="new")
+
+    assert new.stat().st_mode & 0o777 == 0o666 & ~umask
+    assert existing.stat().st_mode & 0o777 == 0o750
+
+
+@pytest.fixture()
+def source(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text(
+        "import os\n\n\ndef load(name):\n    return open(name).read()\n\n\ndef save(name, data):\n"
+        "    open(name, 'w').write(data)\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+async def test_edit_file_applies_batch_edits(source) -> None:
+    result = await EditFileTool().execute(path=str(source), edits=[
+        {"old_text": "def load(name):", "new_text": "def load(name: str) -> str:"},
+        {"old_text": "def save(name, data):", "new_text": "def save(name: str, data: str) -> None:"},
+    ])
+
+    assert result == f"Successfully applied 2 edits to {source}"
+    text = source.read_text(encoding="utf-8")
+    assert "def load(name: str) -> str:" in text and "def save(name: str, data: str) -> None:" in text
+
+
+async def test_edit_file_batch_is_all_or_nothing(source) -> None:
+    before = source.read_text(encoding="utf-8")
+
+    result = await EditFileTool().execute(path=str(source), edits=[
+        {"old_text": "import os", "new_text": "import sys"},
+        {"old_text": "open(name", "new_text": "Path(name"},
+        {"old_text": "missing", "new_text": "x"},
+    ])
+
+    assert result == "Error: no changes made; edit 2: old_text appears 2 times; edit 3: old_text not found"
+    assert source.read_text(encoding="utf-8") == before
+
+
+async def test_edit_file_applies_unified_diff(source) -> None:
+    patch = (
+        "--- a/app.py\n+++ b/app.py\n"
+        "@@ -1,1 +1,2 @@\n import os\n+import sys\n"
+        # Line number is off by two; the hunk is found by its context
+        "@@ -10,2 +11,2 @@\n def save(name, data):\n-    open(name, 'w').write(data)\n+    os.write(name, data)\n"
+    )
+
+    result = await EditFileTool().execute(path=str(source), patch=patch)
+
+    assert result == f"Successfully applied 2 hunks to {source}"
+    assert source.read_text(encoding="utf-8").splitlines() == [
+        "import os", "import sys", "", "", "def load(name):", "    return open(name).read()",
+        "", "", "def save(name, data):", "    os.write(name, data)",
+    ]
+
+
+async def test_edit_file_rejects_mismatched_patch(source) -> None:
+    before = source.read_text(encoding="utf-8")
+    patch = "@@ -1 +1 @@\n-import os\n+import sys\n@@ -4 +4 @@\n-def nope():\n+def yes():\n"
+
+    result = await EditFileTool().execute(path=str(source), patch=patch)
+
+    assert result == "Error: no changes made; hunk 2 (@@ -4) does not match the file"
+    assert source.read_text(encoding="utf-8") == before
+
+
+async def test_edit_file_requires_one_mode(source) -> None:
+    result = await EditFileTool().execute(path=str(source), old_text="a", new_text="b", patch="@@")
+
+    assert result.startswith("Error: provide exactly one of")
+
+
+@pytest.fixture()
+def tree(tmp_path):
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / ".git" / "objects").mkdir(parents=True)
+    (tmp_path / "src" / "pkg" / "core.py").write_text("x = 1\n", encoding="utf-8")
+    (tmp_path / "src" / "main.py").write_text("print()\n", encoding="utf-8")
+    (tmp_path / "src" / "main.pyc").write_bytes(b"\x00")
+    (tmp_path / "README.md").write_text("#" * 2048, encoding="utf-8")
+    return tmp_path
+
+
+def _names(listing: str) -> list[str]:
+    return [line.split("  (")[0] for line in listing.splitlines()]
+
+
+async def test_list_dir_shows_sizes_and_one_level_by_default(tree) -> None:
+    result = await ListDirTool().execute(path=str(tree))
+
+    assert _names(result) == ["📁 .git/", "📄 README.md", "📁 src/"]
+    assert "2.0 KB" in result
+
+
+async def test_list_dir_recursive_with_ignores(tree) -> None:
+    result = await ListDirTool().execute(path=str(tree), depth=3, ignore=["*.pyc"])
+
+    assert _names(result) == [
+        "📁 .git/", "📄 README.md", "📁 src/", "📄 src/main.py", "📁 src/pkg/", "📄 src/pkg/core.py",
+    ]
+    assert "not expanded" in result.splitlines()[0]
+
+
+async def test_list_dir_paginates(tree) -> None:
+    tool = ListDirTool()
+
+    first = await tool.execute(path=str(tree), depth=3, limit=2)
+    second = await tool.execute(path=str(tree), depth=3, offset=2, limit=2)
+
+    assert _names(first)[:2] == ["📁 .git/", "📄 README.md"]
+    assert "use offset=2 to continue" in first
+    assert _names(second)[:2] == ["📁 src/", "📄 src/main.py"]
@@ -0,0 +1,131 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from nanobot.agent.history_rollup import HistoryRollup
+from nanobot.agent.memory import MemoryStore
+
+
+async def _summarize(level: str, period: str, entries: list[str]) -> str:
+    return f"{level} {period}: {len(entries)} items"
+
+
+def _store(tmp_path) -> MemoryStore:
+    store = MemoryStore(tmp_path)
+    for entry in [
+        "[2026-01-05 09:00] Planned the Lisbon trip.",   # ISO week 2026-W02
+        "[2026-01-07 10:00] Booked the hotel.",          # 2026-W02
+        "[2026-01-13 11:00] Fixed the deploy pipeline.",  # 2026-W03
+        "[2026-03-02 12:00] Recent chat about coffee.",
+    ]:
+        store.append_history(entry)
+    return store
+
+
+async def test_weekly_rollup_archives_raw_entries(tmp_path) -> None:
+    store = _store(tmp_path)
+    rollup = HistoryRollup(store, _summarize, keep_days=14)
+
+    assert await rollup.run(now=datetime(2026, 3, 5)) == 2
+
+    history = store.history_file.read_text()
+    assert history.startswith("[2026-W02] Weekly summary of 2 entries (detail: archive/2026-01.md). week 2026-W02: 2 items")
+    assert "[2026-W03] Weekly summary of 1 entries" in history
+    assert "Recent chat about coffee" in history
+    assert "Planned the Lisbon trip" not in history
+
+    archive = (store.archive_dir / "2026-01.md").read_text()
+    assert "Planned the Lisbon trip" in archive and "Fixed the deploy pipeline" in archive
+
+    manifest = json.loads(rollup.manifest_file.read_text())
+    assert [r["period"] for r in manifest["rollups"]] == ["2026-W02", "2026-W03"]
+    assert not rollup.due(now=datetime(2026, 3, 5, 12))
+    assert rollup.due(now=datetime(2026, 3, 6, 1))
+
+    # Archived detail is still searchable
+    hits = store.search_history("lisbon")
+    assert [h.source for h in hits] == ["archive/2026-01.md"]
+
+
+async def test_monthly_rollup_of_weekly_summaries(tmp_path) -> None:
+    store = _store(tmp_path)
+    rollup = HistoryRollup(store, _summarize, keep_days=14, keep_weeks=4)
+    await rollup.run(now=datetime(2026, 3, 5))
+    assert await rollup.run(now=datetime(2026, 3, 6)) == 1
+
+    history = store.history_file.read_text()
+    assert history.startswith("[2026-01] Monthly summary of 2 entries")
+    assert "[2026-W02]" not in history
+    assert "[2026-W02]" in (store.archive_dir / "2026-01.md").read_text()
+
+
+async def test_failed_summary_keeps_entries(tmp_path) -> None:
+    store = _store(tmp_path)
+
+    async def failing(level: str, period: str, entries: list[str]) -> None:
+        return None
+
+    assert await HistoryRollup(store, failing).run(now=datetime(2026, 3, 5)) == 0
+    assert "Planned the Lisbon trip" in store.history_file.read_text()
+
+
+async def test_summaries_are_dated_for_search_filters(tmp_path) -> None:
+    store = _store(tmp_path)
+    await HistoryRollup(store, _summarize, keep_days=14).run(now=datetime(2026, 3, 5))
+
+    hits = store.search_history("weekly summary", since="2026-01-12", until="2026-01-18")
+    assert [h.timestamp for h in hits if h.source == "HISTORY.md"] == ["2026-01-12"]
+
+
+async def test_interrupted_run_is_completed_without_duplicates(tmp_path, monkeypatch) -> None:
+    store = _store(tmp_path)
+    rollup = HistoryRollup(store, _summarize, keep_days=14)
+
+    async def crash(rollups) -> None:
+        raise RuntimeError("killed")
+
+    monkeypatch.setattr(rollup, "_rewrite_history", crash)
+    with pytest.raises(RuntimeError):
+        await rollup.run(now=datetime(2026, 3, 5))
+    assert rollup.pending_file.exists()
+    monkeypatch.undo()
+
+    calls = []
+
+    async def counting(level: str, period: str, entries: list[str]) -> str:
+        calls.append(period)
+        return "again"
+
+    assert await HistoryRollup(store, counting, keep_days=14).run(now=datetime(2026, 3, 6)) == 0
+    assert calls == []
+    assert not rollup.pending_file.exists()
+    assert (store.archive_dir / "2026-01.md").read_text().count("Planned the Lisbon trip") == 1
+    assert "[2026-W02] Weekly summary" in store.history_file.read_text()
+    assert len(json.loads(rollup.manifest_file.read_text())["rollups"]) == 2
+
+
+async def test_session_namespace_rolls_up_its_own_history(tmp_path) -> None:
+    store = MemoryStore(tmp_path)
+    store.append_history("[2026-03-02 12:00] Global chat about coffee.")
+    for entry in [
+        "[2026-01-05 09:00] Planned the Lisbon trip.",
+        "[2026-03-02 12:00] Recent chat about tea.",
+    ]:
+        store.append_history(entry, session_key="telegram:42")
+    rollup = HistoryRollup(store, _summarize, keep_days=14, session_key="telegram:42")
+
+    assert await rollup.run(now=datetime(2026, 3, 5)) == 1
+
+    history = store.session_history_file("telegram:42").read_text()
+    assert history.startswith("[2026-W02] Weekly summary of 1 entries")
+    assert "Planned the Lisbon trip" not in history
+    archive_dir = store.session_archive_dir("telegram:42")
+    assert "Planned the Lisbon trip" in (archive_dir / "2026-01.md").read_text()
+    assert rollup.manifest_file == archive_dir / "manifest.json" and rollup.manifest_file.exists()
+    assert not store.archive_dir.exists()
+    assert store.history_file.read_text().strip() == "[2026-03-02 12:00] Global chat about coffee."
+
+    hits = store.search_history("lisbon", session_key="telegram:42")
+    assert [h.source for h in hits] == ["archive/2026-01.md"]
+    assert store.search_history("lisbon") == []
@@ -0,0 +1,54 @@
+import base64
+
+import pytest
+
+from nanobot.agent.context import ContextBuilder
+from nanobot.agent.images import ImageEncoder
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _decode(url: str) -> bytes:
+    return base64.b64decode(url.split(",", 1)[1])
+
+
+def test_large_photo_is_downscaled_and_cached(tmp_path) -> None:
+    src = tmp_path / "photo.png"
+    Image.effect_noise((1200, 800), 64).convert("RGB").save(src, compress_level=1)
+    encoder = ImageEncoder(tmp_path / "cache", max_edge=600)
+
+    url = encoder.data_url(src)
+    assert url.startswith("data:image/jpeg;base64,")
+    with Image.open(__import__("io").BytesIO(_decode(url))) as img:
+        assert img.size == (600, 400)
+    assert len(_decode(url)) < src.stat().st_size
+    assert len(list((tmp_path / "cache").glob("*.jpg"))) == 1
+
+    # A fresh encoder (new process) reuses the disk cache
+    assert ImageEncoder(tmp_path / "cache", max_edge=600).data_url(src) == url
+
+
+def test_small_image_with_alpha_stays_png(tmp_path) -> None:
+    src = tmp_path / "icon.png"
+    Image.new("RGBA", (32, 32), (255, 0, 0, 128)).save(src)
+    url = ImageEncoder(tmp_path / "cache").data_url(src)
+    assert url.startswith("data:image/png;base64,")
+
+
+def test_non_images_are_skipped(tmp_path) -> None:
+    (tmp_path / "notes.txt").write_text("hi")
+    builder = ContextBuilder(tmp_path, image_cache_dir=tmp_path / "cache")
+    assert builder._build_user_content("hello", [str(tmp_path / "notes.txt"), "/missing.png"]) == "hello"
+
+
+def test_disk_cache_is_bounded(tmp_path) -> None:
+    cache = tmp_path / "cache"
+    encoder = ImageEncoder(cache, max_edge=200, max_cache_bytes=60 * 1024)
+    for i in range(8):
+        src = tmp_path / f"photo{i}.png"
+        Image.effect_noise((400, 400), 64 + i).convert("RGB").save(src, compress_level=1)
+        encoder.data_url(src)
+
+    files = list(cache.iterdir())
+    assert sum(f.stat().st_size for f in files) <= 60 * 1024
+    assert 0 < len(files) < 8
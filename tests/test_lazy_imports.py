@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.manager import ChannelManager
+from nanobot.config.schema import Config
+
+
+def test_startup_modules_do_not_import_litellm() -> None:
+    code = (
+        "import sys\n"
+        "import nanobot.cli.commands, nanobot.agent.loop, nanobot.channels.manager\n"
+        "import nanobot.providers, nanobot.providers.litellm_provider\n"
+        "print('litellm' in sys.modules)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+
+def test_providers_package_exposes_litellm_provider_lazily() -> None:
+    import nanobot.providers as providers
+    from nanobot.providers.litellm_provider import LiteLLMProvider
+
+    assert providers.LiteLLMProvider is LiteLLMProvider
+
+
+def test_channel_manager_defers_channel_init() -> None:
+    config = Config()
+    config.channels.telegram.enabled = True
+    manager = ChannelManager(config, MessageBus())
+
+    assert manager.enabled_channels == ["telegram"]
+    assert manager.channels == {}
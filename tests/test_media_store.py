@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from nanobot.bus.queue import MessageBus
+from nanobot.channels.base import BaseChannel
+from nanobot.media import MediaStore, MediaTooLargeError
+
+
+async def _chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def test_identical_content_is_stored_once(tmp_path) -> None:
+    store = MediaStore(tmp_path)
+
+    first = await store.save_stream(_chunks(b"hello ", b"world"), ".txt")
+    second = await store.save_stream(_chunks(b"hello world"), ".txt")
+
+    assert first == second
+    assert first.read_bytes() == b"hello world"
+    assert store.usage() == (1, 11)
+    assert list(store.tmp_dir.iterdir()) == []
+
+
+async def test_stream_over_max_size_is_rejected(tmp_path) -> None:
+    store = MediaStore(tmp_path)
+
+    with pytest.raises(MediaTooLargeError):
+        await store.save_stream(_chunks(b"x" * 10, b"x" * 10), max_size=15)
+
+    assert store.usage() == (0, 0)
+    assert list(store.tmp_dir.iterdir()) == []
+
+
+def test_ingest_moves_file_into_store(tmp_path) -> None:
+    store = MediaStore(tmp_path / "media")
+    src = store.tmp_dir / "download.bin"
+    src.write_bytes(b"payload")
+
+    path = store.ingest(src, ".ogg")
+
+    assert path.suffix == ".ogg"
+    assert path.parent == store.root
+    assert not src.exists()
+
+
+async def test_quota_evicts_least_recently_used(tmp_path) -> None:
+    store = MediaStore(tmp_path, max_bytes=250)
+    old = await store.save_stream(_chunks(b"a" * 100))
+    mid = await store.save_stream(_chunks(b"b" * 100))
+    now = time.time()
+    os.utime(old, (now - 300, now - 300))
+    os.utime(mid, (now - 200, now - 200))
+    # Storing the old file again refreshes it, so the middle one goes first
+    await store.save_stream(_chunks(b"a" * 100))
+
+    new = await store.save_stream(_chunks(b"c" * 100))
+
+    assert old.exists() and new.exists()
+    assert not mid.exists()
+    assert store.usage()[1] <= 250
+
+
+async def test_commit_and_eviction_run_off_the_event_loop(tmp_path, monkeypatch) -> None:
+    store = MediaStore(tmp_path, max_bytes=150)
+    threads = []
+    evict = store.evict
+
+    def recording_evict(now=None):
+        threads.append(threading.current_thread())
+        return evict(now)
+
+    monkeypatch.setattr(store, "evict", recording_evict)
+    await store.save_stream(_chunks(b"a" * 100))
+    await store.save_stream(_chunks(b"b" * 100))
+
+    assert threads and threading.main_thread() not in threads
+    assert store.usage()[1] <= 150
+
+
+async def test_age_limit_removes_stale_files(tmp_path) -> None:
+    store = MediaStore(tmp_path, max_age_days=1)
+    stale = await store.save_stream(_chunks(b"stale"))
+    fresh = await store.save_stream(_chunks(b"fresh"))
+    old = time.time() - 3 * 86400
+    os.utime(stale, (old, old))
+
+    freed = store.evict(now=time.time() + 7200)
+
+    assert freed == 5
+    assert not stale.exists() and fresh.exists()
+
+
+async def test_download_streams_response_into_store(tmp_path) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=b"image-bytes")
+
+    store = MediaStore(tmp_path)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        path = await store.download(client, "https://cdn.example/a.png", suffix=".png")
+        with pytest.raises(MediaTooLargeError):
+            await store.download(client, "https://cdn.example/b.png", max_size=4)
+
+    assert path.read_bytes() == b"image-bytes"
+    assert store.usage() == (1, 11)
+
+
+def test_channel_creates_default_store_lazily(tmp_path, monkeypatch) -> None:
+    class Channel(BaseChannel):
+        async def start(self) -> None: ...
+        async def stop(self) -> None: ...
+        async def send(self, msg) -> None: ...
+
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    channel = Channel(None, MessageBus())
+    assert not (tmp_path / ".nanobot").exists()
+
+    shared = MediaStore(tmp_path / "shared")
+    channel.media = shared
+    assert channel.media is shared
+    assert not (tmp_path / ".nanobot").exists()
@@ -0,0 +1,84 @@
+from nanobot.agent.context import ContextBuilder
+from nanobot.agent.memory import MemoryStore
+from nanobot.agent.tools.memory import MemorySearchTool
+from nanobot.agent.vector_memory import HashingEmbedder
+from nanobot.config.schema import MemoryConfig
+
+
+def test_session_namespaces_are_isolated(tmp_path) -> None:
+    store = MemoryStore(tmp_path)
+    store.write_long_term("Bot speaks English.")
+    store.write_long_term("Alice likes tea.", session_key="telegram:1")
+    store.write_long_term("Bob likes coffee.", session_key="slack:C2/thread")
+
+    assert store.session_memory_file("telegram:1") == tmp_path / "memory" / "sessions" / "telegram_1" / "MEMORY.md"
+    assert store.read_long_term() == "Bot speaks English."
+
+    ctx = store.get_memory_context(session_key="telegram:1")
+    assert "Bot speaks English." in ctx
+    assert "Alice likes tea." in ctx
+    assert "Bob" not in ctx
+    assert "Alice" not in store.get_memory_context()
+
+
+async def test_update_long_term_in_session_scope(tmp_path) -> None:
+    store = MemoryStore(tmp_path)
+    base, version = store.read_long_term_versioned("cli:direct")
+    assert await store.update_long_term("- fact\n", base, version, session_key="cli:direct")
+    assert store.read_long_term("cli:direct") == "- fact\n"
+    assert store.read_long_term() == ""
+
+
+def test_retrieval_only_sees_own_session(tmp_path) -> None:
+    store = MemoryStore(tmp_path, embedder=HashingEmbedder(), top_k=5)
+    store.write_long_term("Alice likes green tea.", session_key="telegram:1")
+    store.write_long_term("Bob likes green tea too.", session_key="telegram:2")
+
+    store.retrieve("green tea", session_key="telegram:2")
+    texts = [c.text for c in store.retrieve("green tea", session_key="telegram:1")]
+    assert texts == ["Alice likes green tea."]
+
+
+def test_context_builder_composes_scopes(tmp_path) -> None:
+    MemoryStore(tmp_path).write_long_term("Alice likes tea.", session_key="telegram:1")
+    builder = ContextBuilder(tmp_path, memory_config=MemoryConfig(scope="session"))
+
+    messages = builder.build_messages(
+        history=[], current_message="hi", channel="telegram", chat_id="1", memory_scope="telegram:1"
+    )
+    assert "## Memory for This Chat\nAlice likes tea." in messages[0]["content"]
+    assert "sessions/telegram_1/MEMORY.md" in messages[0]["content"]
+
+
+def test_identity_points_at_the_chat_memory_file(tmp_path) -> None:
+    builder = ContextBuilder(tmp_path, memory_config=MemoryConfig(scope="session"))
+    chat_dir = (tmp_path / "memory" / "sessions" / "telegram_1").resolve()
+
+    prompt = builder.build_system_prompt(memory_scope="telegram:1")
+    assert f"important, write to {chat_dir / 'MEMORY.md'}" in prompt
+    assert f"History log: {chat_dir / 'HISTORY.md'}" in prompt
+
+    shared = (tmp_path / "memory" / "MEMORY.md").resolve()
+    assert f"important, write to {shared}" in builder.build_system_prompt()
+
+
+async def test_session_history_is_not_shared(tmp_path) -> None:
+    store = MemoryStore(tmp_path, embedder=HashingEmbedder(), top_k=5)
+    await store.append_history_locked("[2026-01-02 10:00] Alice planned a trip to Lisbon.", session_key="telegram:1")
+    await store.append_history_locked("[2026-01-03 10:00] Bob booked a trip to Oslo.", session_key="telegram:2")
+
+    assert not store.history_file.exists()
+    assert [h.text for h in store.search_history("trip", session_key="telegram:1")] == [
+        "[2026-01-02 10:00] Alice planned a trip to Lisbon."
+    ]
+    assert all("Alice" not in h.text for h in store.search_history("trip Lisbon", session_key="telegram:2"))
+    assert store.search_history("Lisbon") == []
+
+    texts = [c.text for c in store.retrieve("trip Lisbon", session_key="telegram:2")]
+    assert texts and all("Alice" not in t for t in texts)
+
+    tool = MemorySearchTool(store)
+    tool.set_context("telegram:2")
+    assert "Lisbon" not in await tool.execute("trip Lisbon")
+    tool.set_context("telegram:1")
+    assert "Lisbon" in await tool.execute("trip Lisbon")
@@ -0,0 +1,46 @@
+from nanobot.agent.history_index import HistoryIndex
+from nanobot.agent.memory import MemoryStore
+from nanobot.agent.tools.memory import MemorySearchTool
+
+
+def _store(tmp_path) -> MemoryStore:
+    store = MemoryStore(tmp_path)
+    store.append_history("[2026-01-05 09:00] Planned a trip to Lisbon with Alice.")
+    store.append_history("[2026-01-20 18:30] Fixed the deploy pipeline; deadline moved to Friday.")
+    store.append_history("[2026-02-02 12:00] Booked flights to Lisbon; Alice prefers window seats.")
+    return store
+
+
+def test_ranked_search_and_date_filters(tmp_path) -> None:
+    store = _store(tmp_path)
+
+    hits = store.search_history("lisbon alice window")
+    assert [h.timestamp for h in hits] == ["2026-02-02 12:00", "2026-01-05 09:00"]
+
+    hits = store.search_history("lisbon", until="2026-01-31")
+    assert [h.timestamp for h in hits] == ["2026-01-05 09:00"]
+    assert store.search_history("lisbon", since="2026-02-01")[0].timestamp == "2026-02-02 12:00"
+    assert store.search_history("nonexistent") == []
+
+
+def test_index_is_incremental_and_rebuilds_on_rewrite(tmp_path) -> None:
+    store = _store(tmp_path)
+    index = HistoryIndex(store.history_file, tmp_path / "idx.db")
+    assert index.sync() == 3
+    assert index.sync() == 0
+
+    store.append_history("[2026-02-03 08:00] Discussed the deadline again.")
+    assert index.sync() == 1
+    assert len(index.search("deadline")) == 2
+
+    store.history_file.write_text("[2026-03-01 10:00] Fresh log after rotation.\n\n")
+    assert index.sync() == 1
+    assert index.search("lisbon") == []
+    assert len(index.search("rotation")) == 1
+
+
+async def test_memory_search_tool(tmp_path) -> None:
+    tool = MemorySearchTool(_store(tmp_path))
+    result = await tool.execute(query="deadline")
+    assert "deploy pipeline" in result
+    assert "No history entries" in await tool.execute(query="kangaroo")
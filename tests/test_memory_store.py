@@ -0,0 +1,103 @@
+import asyncio
+
+from nanobot.agent.memory import MemoryStore, apply_memory_patch, merge_update
+from nanobot.utils import helpers
+from nanobot.utils.helpers import atomic_write_text, file_lock
+
+
+def test_merge_keeps_both_sides() -> None:
+    base = "# Facts\n- likes tea\n- lives in Paris\n"
+    ours = "# Facts\n- likes tea\n- lives in Berlin\n- works on nanobot\n"
+    theirs = "# Facts\n- likes tea\n- lives in Paris\n- has a cat\n"
+
+    merged = merge_update(base, ours, theirs)
+
+    assert "- lives in Paris" not in merged
+    assert "- lives in Berlin" in merged
+    assert "- works on nanobot" in merged
+    assert "- has a cat" in merged
+    assert merged.startswith("# Facts\n- likes tea\n")
+
+
+def test_merge_trivial_cases() -> None:
+    assert merge_update("a\n", "b\n", "a\n") == "b\n"
+    assert merge_update("a\n", "a\n", "c\n") == "c\n"
+
+
+async def test_update_long_term_detects_concurrent_write(tmp_path) -> None:
+    store = MemoryStore(tmp_path)
+    store.write_long_term("- one\n")
+    base, version = store.read_long_term_versioned()
+
+    assert await store.update_long_term("- one\n- two\n", base, version)
+
+    # Someone else writes while our stale consolidation is in flight
+    stale_base, stale_version = base, version
+    assert not await store.update_long_term("- one\n- three\n", stale_base, stale_version)
+    assert store.read_long_term() == "- one\n- two\n- three\n"
+    assert not list(store.memory_dir.glob(".MEMORY.md.*"))
+
+
+async def test_history_appends_wait_for_locked_rewrite(tmp_path) -> None:
+    store = MemoryStore(tmp_path)
+    store.append_history("old entry")
+
+    async def rewrite() -> None:
+        # Like the history rollup: read, await, write back
+        async with file_lock(store.history_file):
+            text = store.history_file.read_text()
+            await asyncio.sleep(0.01)
+            atomic_write_text(store.history_file, text.replace("old", "rewritten"))
+
+    await asyncio.gather(rewrite(), *(store.append_history_locked(f"entry {i}") for i in range(20)))
+
+    text = store.history_file.read_text()
+    assert text.startswith("rewritten entry")
+    assert all(f"entry {i}\n" in text for i in range(20))
+    assert not helpers._file_locks[asyncio.get_running_loop()]  # Released locks are dropped
+
+
+MEMORY_DOC = """# Long-term Memory
+
+## User
+- Name: Dana
+- Location: Paris
+
+## Preferences
+- Likes tea
+"""
+
+
+def test_apply_memory_patch_ops() -> None:
+    patched, applied = apply_memory_patch(MEMORY_DOC, [
+        {"op": "update", "section": "User", "old": "- Location:", "text": "- Location: Berlin"},
+        {"op": "add", "section": "Preferences", "text": "- Dark mode"},
+        {"op": "add", "section": "Preferences", "text": "- likes tea"},  # duplicate, skipped
+        {"op": "delete", "section": "Preferences", "old": "Likes tea"},
+        {"op": "add", "section": "Projects", "text": "- nanobot"},
+        {"op": "update", "section": "User", "old": "- Pets:", "text": "- Pets: cat"},  # no match -> add
+        {"op": "delete", "old": "- Not there"},
+    ])
+
+    assert applied == 5
+    assert patched == (
+        "# Long-term Memory\n\n"
+        "## User\n- Name: Dana\n- Location: Berlin\n- Pets: cat\n\n"
+        "## Preferences\n- Dark mode\n\n"
+        "## Projects\n- nanobot\n"
+    )
+
+
+def test_apply_memory_patch_delete_section_and_empty_doc() -> None:
+    patched, _ = apply_memory_patch(MEMORY_DOC, [{"op": "delete", "section": "Preferences"}])
+    assert "Preferences" not in patched and "Likes tea" not in patched
+    assert apply_memory_patch("", [{"op": "add", "section": "User", "text": "- Name: Dana"}])[0] == "## User\n- Name: Dana\n"
+
+
+async def test_patch_long_term_applies_to_latest_content(tmp_path) -> None:
+    store = MemoryStore(tmp_path)
+    store.write_long_term(MEMORY_DOC, session_key="cli:direct")
+    assert await store.patch_long_term(
+        [{"op": "add", "section": "User", "text": "- Age: 30"}], session_key="cli:direct"
+    ) == 1
+    assert "- Location: Paris\n- Age: 30\n" in store.read_long_term("cli:direct")
@@ -0,0 +1,96 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from nanobot.agent.tools.base import Tool
+from nanobot.agent.tools.registry import ToolRegistry
+from nanobot.metrics import MetricsRegistry, MetricsServer
+from nanobot.metrics.registry import TOOL_CALLS
+
+
+class EchoTool(Tool):
+    @property
+    def name(self) -> str:
+        return "echo_metrics"
+
+    @property
+    def description(self) -> str:
+        return "echo"
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return {"type": "object", "properties": {"text": {"type": "string"}}, "required": ["text"]}
+
+    async def execute(self, text: str, **kwargs: Any) -> str:
+        return text
+
+
+def test_counter_and_gauge_render() -> None:
+    reg = MetricsRegistry()
+    c = reg.counter("demo_total", "Demo counter.", ("channel",))
+    c.inc(channel="telegram")
+    c.inc(2, channel="telegram")
+    reg.gauge("demo_depth", "Demo gauge.").set_function(lambda: 7)
+
+    text = reg.render()
+    assert "# TYPE demo_total counter" in text
+    assert 'demo_total{channel="telegram"} 3' in text
+    assert "demo_depth 7" in text
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    reg = MetricsRegistry()
+    h = reg.histogram("demo_seconds", "Demo histogram.", buckets=(0.1, 1.0))
+    h.observe(0.05)
+    h.observe(0.5)
+    h.observe(5)
+
+    text = reg.render()
+    assert 'demo_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{le="1"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+    assert "demo_seconds_count 3" in text
+
+
+def test_label_mismatch_rejected() -> None:
+    reg = MetricsRegistry()
+    c = reg.counter("demo_total", "Demo.", ("channel",))
+    with pytest.raises(ValueError):
+        c.inc(direction="inbound")
+
+
+async def test_tool_registry_records_calls() -> None:
+    reg = ToolRegistry()
+    reg.register(EchoTool())
+    before_ok = TOOL_CALLS.get(tool="echo_metrics", status="ok")
+    before_invalid = TOOL_CALLS.get(tool="echo_metrics", status="invalid")
+
+    await reg.execute("echo_metrics", {"text": "hi"})
+    await reg.execute("echo_metrics", {})
+
+    assert TOOL_CALLS.get(tool="echo_metrics", status="ok") == before_ok + 1
+    assert TOOL_CALLS.get(tool="echo_metrics", status="invalid") == before_invalid + 1
+
+
+async def test_metrics_server_serves_registry() -> None:
+    reg = MetricsRegistry()
+    reg.counter("served_total", "Served.").inc()
+    server = MetricsServer(host="127.0.0.1", port=0, registry=reg)
+    await server.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+        await writer.drain()
+        response = (await reader.read()).decode()
+        writer.close()
+        assert response.startswith("HTTP/1.1 200")
+        assert "served_total 1" in response
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(b"GET /other HTTP/1.1\r\n\r\n")
+        await writer.drain()
+        assert (await reader.read()).startswith(b"HTTP/1.1 404")
+        writer.close()
+    finally:
+        await server.stop()
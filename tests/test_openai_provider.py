@@ -0,0 +1,103 @@
+import json
+
+import httpx
+import pytest
+
+from nanobot.config.schema import Config
+from nanobot.providers.factory import create_provider
+from nanobot.providers.openai_provider import OpenAICompatProvider
+
+
+def _provider(handler, **kwargs) -> OpenAICompatProvider:
+    provider = OpenAICompatProvider(
+        api_key="sk-test", api_base="http://vllm.local/v1", provider_name="vllm", **kwargs
+    )
+    provider._client = httpx.AsyncClient(
+        base_url=provider.api_base, transport=httpx.MockTransport(handler)
+    )
+    return provider
+
+
+def _sse(*chunks: dict) -> bytes:
+    lines = [f"data: {json.dumps(c)}\n\n" for c in chunks]
+    return ("".join(lines) + "data: [DONE]\n\n").encode()
+
+
+async def test_streaming_assembles_content_and_tool_calls() -> None:
+    seen: dict = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.update(json.loads(request.content))
+        body = _sse(
+            {"choices": [{"delta": {"content": "Hel"}}]},
+            {"choices": [{"delta": {"content": "lo", "tool_calls": [
+                {"index": 0, "id": "call_1", "function": {"name": "read_file", "arguments": '{"pa'}}
+            ]}}]},
+            {"choices": [{"delta": {"tool_calls": [
+                {"index": 0, "function": {"arguments": 'th": "a.txt"}'}}
+            ]}, "finish_reason": "tool_calls"}]},
+            {"choices": [], "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}},
+        )
+        return httpx.Response(200, content=body, headers={"content-type": "text/event-stream"})
+
+    provider = _provider(handler)
+    response = await provider.chat(
+        messages=[{"role": "user", "content": "hi"}],
+        tools=[{"type": "function", "function": {"name": "read_file"}}],
+        model="vllm/Llama-3-8B",
+    )
+
+    assert seen["model"] == "Llama-3-8B"
+    assert seen["stream"] is True
+    assert seen["tool_choice"] == "auto"
+    assert response.content == "Hello"
+    assert response.finish_reason == "tool_calls"
+    assert response.tool_calls[0].name == "read_file"
+    assert response.tool_calls[0].arguments == {"path": "a.txt"}
+    assert response.usage["total_tokens"] == 15
+    await provider.aclose()
+
+
+async def test_non_streaming_response() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert "stream" not in json.loads(request.content)
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": "ok", "reasoning_content": "thinking"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        })
+
+    provider = _provider(handler, stream=False)
+    response = await provider.chat(messages=[{"role": "user", "content": "hi"}], model="Llama-3-8B")
+
+    assert response.content == "ok"
+    assert response.reasoning_content == "thinking"
+    assert not response.has_tool_calls
+
+
+async def test_http_error_returned_as_content() -> None:
+    provider = _provider(lambda request: httpx.Response(500, text="boom"))
+    response = await provider.chat(messages=[{"role": "user", "content": "hi"}])
+
+    assert response.finish_reason == "error"
+    assert "boom" in response.content
+
+
+def test_requires_api_base_for_non_openai_provider() -> None:
+    with pytest.raises(ValueError):
+        OpenAICompatProvider(api_key="k", provider_name="vllm")
+    assert OpenAICompatProvider(api_key="k").api_base == "https://api.openai.com/v1"
+
+
+async def test_factory_selects_backend_and_closes_client() -> None:
+    config = Config.model_validate({
+        "agents": {"defaults": {"model": "openai/gpt-4o-mini"}},
+        "providers": {"openai": {"api_key": "sk-test", "backend": "openai"}},
+    })
+    provider = create_provider(config)
+    assert isinstance(provider, OpenAICompatProvider)
+    provider._get_client()
+    await provider.aclose()
+    assert provider._client is None
+
+    with pytest.raises(ValueError):
+        create_provider(Config())
@@ -0,0 +1,62 @@
+import pytest
+
+from nanobot.providers.registry import (
+    PROVIDERS,
+    find_by_model,
+    find_by_name,
+    find_gateway,
+    resolve_model,
+)
+
+
+def _linear_find_by_model(model: str):
+    model_lower = model.lower()
+    for spec in PROVIDERS:
+        if spec.is_gateway or spec.is_local:
+            continue
+        if any(kw in model_lower for kw in spec.keywords):
+            return spec
+    return None
+
+
+@pytest.mark.parametrize("model", [
+    "anthropic/claude-opus-4-5", "gpt-4o", "deepseek-chat", "GLM-4", "qwen-max",
+    "kimi-k2.5", "MiniMax-M2.1", "llama3-8b-8192", "groq/llama3", "unknown-model",
+])
+def test_find_by_model_matches_linear_scan(model: str) -> None:
+    assert find_by_model(model) is _linear_find_by_model(model)
+
+
+def test_find_by_name() -> None:
+    assert find_by_name("dashscope").name == "dashscope"
+    assert find_by_name("nope") is None
+
+
+def test_resolve_standard_prefixing() -> None:
+    assert resolve_model("deepseek-chat").model == "deepseek/deepseek-chat"
+    assert resolve_model("deepseek/deepseek-chat").model == "deepseek/deepseek-chat"
+    assert resolve_model("claude-opus-4-5").model == "claude-opus-4-5"
+    assert resolve_model("glm-4").model == "zai/glm-4"
+
+
+def test_resolve_gateway_prefixing() -> None:
+    assert resolve_model("anthropic/claude-3", "openrouter").model == "openrouter/anthropic/claude-3"
+    assert resolve_model("anthropic/claude-3", "aihubmix").model == "openai/claude-3"
+    assert resolve_model("Llama-3-8B", "vllm").model == "hosted_vllm/Llama-3-8B"
+
+
+def test_resolve_overrides_and_memoization() -> None:
+    first = resolve_model("kimi-k2.5")
+    assert first.model == "moonshot/kimi-k2.5"
+    assert dict(first.overrides) == {"temperature": 1.0}
+    assert resolve_model("kimi-k2.5") is first
+    with pytest.raises(TypeError):
+        first.overrides["temperature"] = 0.1  # type: ignore[index]
+    assert dict(resolve_model("gpt-4o").overrides) == {}
+
+
+def test_find_gateway_detection() -> None:
+    assert find_gateway(provider_name="vllm").name == "vllm"
+    assert find_gateway(api_key="sk-or-abc").name == "openrouter"
+    assert find_gateway(api_base="https://aihubmix.com/v1").name == "aihubmix"
+    assert find_gateway(provider_name="deepseek", api_key="sk-123") is None
@@ -0,0 +1,108 @@
+import os
+import time
+
+from nanobot.agent.tools.search import FileIndex, GlobFilesTool, GrepFilesTool, glob_to_regex
+
+
+def _make_tree(root):
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "node_modules" / "dep").mkdir(parents=True)
+    (root / "build").mkdir()
+    (root / ".gitignore").write_text("build/\n*.log\n", encoding="utf-8")
+    (root / "src" / "pkg" / "core.py").write_text("def connect():\n    return 'TODO: retry'\n", encoding="utf-8")
+    (root / "src" / "main.py").write_text("import pkg\n# todo later\n", encoding="utf-8")
+    (root / "README.md").write_text("# Project\nSee TODO list.\n", encoding="utf-8")
+    (root / "node_modules" / "dep" / "index.js").write_text("// TODO vendored\n", encoding="utf-8")
+    (root / "build" / "out.py").write_text("# TODO generated\n", encoding="utf-8")
+    (root / "debug.log").write_text("TODO in a log\n", encoding="utf-8")
+    (root / "blob.bin").write_bytes(b"TODO\x00\x01")
+
+
+def test_glob_to_regex() -> None:
+    assert glob_to_regex("*.py").match("a/b/c.py")
+    assert glob_to_regex("src/**/*.py").match("src/main.py")
+    assert glob_to_regex("src/**/*.py").match("src/pkg/core.py")
+    assert not glob_to_regex("src/*.py").match("src/pkg/core.py")
+
+
+def test_file_index_applies_ignore_rules(tmp_path) -> None:
+    _make_tree(tmp_path)
+
+    paths = {e.path for e in FileIndex(tmp_path).files()}
+
+    assert paths == {".gitignore", "README.md", "blob.bin", "src/main.py", "src/pkg/core.py"}
+
+
+def test_file_index_picks_up_new_files_on_refresh(tmp_path) -> None:
+    _make_tree(tmp_path)
+    index = FileIndex(tmp_path, ttl=0)
+    index.files()
+    pkg = tmp_path / "src" / "pkg"
+    (pkg / "extra.py").write_text("x = 1\n", encoding="utf-8")
+    # Make sure the directory mtime moves even on coarse-grained filesystems
+    later = time.time() + 5
+    os.utime(pkg, (later, later))
+
+    assert "src/pkg/extra.py" in {e.path for e in index.files()}
+
+
+async def test_glob_files_lists_matches(tmp_path) -> None:
+    _make_tree(tmp_path)
+    tool = GlobFilesTool(tmp_path)
+
+    result = await tool.execute(pattern="*.py")
+
+    assert set(result.splitlines()) == {"src/main.py", "src/pkg/core.py"}
+    assert await tool.execute(pattern="*.py", path=str(tmp_path / "src" / "pkg")) == "core.py"
+
+
+async def test_grep_files_finds_lines(tmp_path) -> None:
+    _make_tree(tmp_path)
+    tool = GrepFilesTool(tmp_path)
+
+    result = await tool.execute(pattern="todo", ignore_case=True)
+
+    assert result.splitlines() == [
+        "README.md:2: See TODO list.",
+        "src/main.py:2: # todo later",
+        "src/pkg/core.py:2: return 'TODO: retry'",
+    ]
+    assert (await tool.execute(pattern="TODO", glob="*.md")).splitlines() == ["README.md:2: See TODO list."]
+
+
+async def test_grep_files_respects_limit_and_bad_regex(tmp_path) -> None:
+    _make_tree(tmp_path)
+    tool = GrepFilesTool(tmp_path)
+
+    limited = await tool.execute(pattern="todo", ignore_case=True, limit=1)
+
+    assert len(limited.splitlines()) == 2
+    assert "stopped at 1 matches" in limited
+    assert (await tool.execute(pattern="(")).startswith("Error: invalid regex")
+
+
+async def test_grep_files_limit_keeps_first_matches_in_path_order(tmp_path) -> None:
+    for i in range(20):
+        (tmp_path / f"f{i:02d}.txt").write_text("hit\nhit\n", encoding="utf-8")
+    tool = GrepFilesTool(tmp_path)
+
+    for _ in range(3):
+        result = await tool.execute(pattern="hit", limit=5)
+        assert result.splitlines()[:5] == [
+            "f00.txt:1: hit", "f00.txt:2: hit", "f01.txt:1: hit", "f01.txt:2: hit", "f02.txt:1: hit",
+        ]
+
+
+async def test_glob_order_reflects_in_place_edits(tmp_path) -> None:
+    _make_tree(tmp_path)
+    tool = GlobFilesTool(tmp_path, FileIndex(tmp_path, ttl=60))
+    old = time.time() - 100
+    os.utime(tmp_path / "src" / "main.py", (old, old))
+    os.utime(tmp_path / "src" / "pkg" / "core.py", (old - 10, old - 10))
+    assert (await tool.execute(pattern="*.py")).splitlines()[0] == "src/main.py"
+
+    # Editing a file in place leaves its directory mtime unchanged
+    with open(tmp_path / "src" / "pkg" / "core.py", "a", encoding="utf-8") as f:
+        f.write("# edited\n")
+
+    assert (await tool.execute(pattern="*.py")).splitlines()[0] == "src/pkg/core.py"
@@ -0,0 +1,65 @@
+from nanobot.agent.context import ContextBuilder
+from nanobot.agent.memory import MemoryStore
+from nanobot.agent.vector_memory import HashingEmbedder, VectorIndex, chunk_markdown
+from nanobot.config.schema import MemoryConfig
+from nanobot.utils.helpers import run_io
+
+MEMORY = """# User
+Name is Dana. Lives in Lisbon.
+
+# Preferences
+Prefers dark roast coffee and short answers.
+
+# Projects
+Works on a Rust parser for config files.
+"""
+
+
+def test_chunk_markdown_keeps_headings() -> None:
+    chunks = chunk_markdown(MEMORY)
+    assert chunks[1] == "# Preferences\nPrefers dark roast coffee and short answers."
+    assert all(len(c) <= 620 for c in chunk_markdown("word " * 500))
+
+
+def test_retrieval_returns_relevant_chunks(tmp_path) -> None:
+    store = MemoryStore(tmp_path, embedder=HashingEmbedder(), top_k=2)
+    store.write_long_term(MEMORY)
+    store.append_history("[2026-01-03 10:00] Debugged the Rust parser with Dana.")
+
+    chunks = store.retrieve("what coffee do I like?")
+    assert "coffee" in chunks[0].text
+
+    sources = {c.source for c in store.retrieve("rust parser")}
+    assert sources == {"MEMORY.md", "HISTORY.md"}
+
+
+def test_index_only_embeds_changed_chunks(tmp_path) -> None:
+    embedder = HashingEmbedder()
+    index = VectorIndex(tmp_path / "v.db", embedder)
+    assert index.sync_chunks("m", ["a b", "c d"]) == 2
+    assert index.sync_chunks("m", ["a b", "c d", "e f"]) == 1
+    assert index.sync_chunks("m", ["e f"]) == 0
+    assert [c.text for c in index.search("a b c d e f", k=5)] == ["e f"]
+
+
+def test_context_builder_modes(tmp_path) -> None:
+    MemoryStore(tmp_path).write_long_term(MEMORY)
+
+    full = ContextBuilder(tmp_path).build_system_prompt(query="coffee")
+    assert "Rust parser" in full
+
+    cfg = MemoryConfig(mode="retrieval", top_k=1)
+    prompt = ContextBuilder(tmp_path, memory_config=cfg).build_system_prompt(query="coffee preferences")
+    assert "## Relevant Memory" in prompt
+    assert "dark roast" in prompt
+    assert "Rust parser" not in prompt
+
+
+async def test_retrieval_prompt_can_be_built_off_the_event_loop(tmp_path) -> None:
+    MemoryStore(tmp_path).write_long_term(MEMORY)
+    builder = ContextBuilder(tmp_path, memory_config=MemoryConfig(mode="retrieval", top_k=1))
+
+    # The index connection is opened on a worker thread and reused from this one
+    first = await run_io(builder.build_system_prompt, query="coffee preferences")
+    second = builder.build_system_prompt(query="coffee preferences")
+    assert "dark roast" in first and first == second
@@ -0,0 +1,61 @@
+import json
+
+import httpx
+
+from nanobot.agent.tools.web import WebFetchTool, _html_to_text
+from nanobot.agent.tools.web_cache import WebCache
+
+
+def test_markdown_preserves_structure() -> None:
+    html = """<div><h2>Setup &amp; use</h2>
+    <p>Run   <code>make</code> and see <a href="https://x.dev/docs">the <b>docs</b></a>.<a href="#top"></a></p>
+    <ul><li>one</li><li>two<ol><li>nested</li></ol></li></ul>
+    <pre><code class="language-python">def f():
+    return 1
+</code></pre>
+    <table><tr><th>Name</th><th>a|b</th></tr><tr><td>x</td><td>1</td></tr></table>
+    <blockquote><p>q1</p><p>q2</p></blockquote>
+    <script>ignored()</script></div>"""
+
+    assert _html_to_text(html) == "\n".join([
+        "## Setup & use",
+        "",
+        "Run `make` and see [the **docs**](https://x.dev/docs).",
+        "",
+        "- one",
+        "- two",
+        "  1. nested",
+        "",
+        "```python",
+        "def f():",
+        "    return 1",
+        "```",
+        "",
+        "| Name | a\\|b |",
+        "| --- | --- |",
+        "| x | 1 |",
+        "",
+        "> q1",
+        ">",
+        "> q2",
+    ])
+
+
+def test_text_mode_drops_markup() -> None:
+    html = "<p>Hello <b>there</b>, <a href='https://x.dev'>link</a></p><table><tr><td>a</td><td>b</td></tr></table>"
+    assert _html_to_text(html, markdown=False) == "Hello there, link\n\na | b"
+
+
+async def test_body_is_capped_and_not_cached(tmp_path) -> None:
+    page = "<html><body><article><p>" + "word " * 20000 + "</p></article></body></html>"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text=page, headers={"content-type": "text/html", "cache-control": "max-age=60"})
+
+    tool = WebFetchTool(cache=WebCache(tmp_path), max_bytes=4096)
+    tool._client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    result = json.loads(await tool.execute("https://example.com/big"))
+
+    assert result["truncated"] is True
+    assert 0 < result["length"] < 4096
+    assert not any(tmp_path.iterdir())
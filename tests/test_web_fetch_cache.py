@@ -0,0 +1,106 @@
+import json
+import time
+
+import httpx
+
+from nanobot.agent.tools.web import WebFetchTool
+from nanobot.agent.tools.web_cache import WebCache, freshness
+
+HTML = "<html><head><title>Hi</title></head><body><article><p>Hello cached world</p></article></body></html>"
+
+
+def _tool(tmp_path, handler, max_bytes: int = 1024 * 1024) -> WebFetchTool:
+    tool = WebFetchTool(cache=WebCache(tmp_path / "web", max_bytes=max_bytes))
+    tool._client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return tool
+
+
+def test_freshness_rules() -> None:
+    now = time.time()
+    assert freshness({"cache-control": "no-store, max-age=60"}, now) is None
+    assert freshness({"cache-control": "max-age=60", "age": "10"}, now) == (50, False)
+    assert freshness({"cache-control": "no-cache"}, now) == (0, True)
+    assert freshness({}, now) == (0, False)
+    lifetime, _ = freshness({"last-modified": "Mon, 01 Jan 2001 00:00:00 GMT"}, now)
+    assert lifetime == 24 * 3600
+
+
+async def test_fresh_response_served_from_cache(tmp_path) -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, text=HTML, headers={"content-type": "text/html", "cache-control": "max-age=300"})
+
+    tool = _tool(tmp_path, handler)
+    first = json.loads(await tool.execute("https://example.com/a"))
+    second = json.loads(await tool.execute("https://example.com/a"))
+
+    assert len(calls) == 1
+    assert first["cache"] == "miss" and second["cache"] == "hit"
+    assert "Hello cached world" in second["text"]
+    assert second["text"] == first["text"]
+
+
+def test_responses_varying_on_request_headers_are_not_stored(tmp_path) -> None:
+    cache = WebCache(tmp_path / "web")
+    base = {"cache-control": "max-age=300"}
+
+    def store(url: str, vary: str):
+        return cache.store(url, url, 200, {**base, "vary": vary}, b"body")
+
+    assert store("https://example.com/star", "*") is None
+    assert store("https://example.com/lang", "Accept-Language") is None
+    assert store("https://example.com/cookie", "Accept-Encoding, Cookie") is None
+    assert store("https://example.com/enc", "Accept-Encoding, User-Agent") is not None
+    assert cache.lookup("https://example.com/enc") is not None
+    assert cache.lookup("https://example.com/star") is None
+
+
+async def test_stale_response_revalidated_with_etag(tmp_path) -> None:
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"'})
+        return httpx.Response(200, text=HTML, headers={"content-type": "text/html", "etag": '"v1"'})
+
+    tool = _tool(tmp_path, handler)
+    await tool.execute("https://example.com/b")
+    result = json.loads(await tool.execute("https://example.com/b", extractMode="markdown"))
+
+    assert seen == [None, '"v1"']
+    assert result["cache"] == "revalidated"
+    assert result["status"] == 200
+    assert "Hello cached world" in result["text"]
+
+
+async def test_no_store_is_not_cached(tmp_path) -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, text="plain", headers={"cache-control": "no-store", "etag": '"x"'})
+
+    tool = _tool(tmp_path, handler)
+    await tool.execute("https://example.com/c")
+    result = json.loads(await tool.execute("https://example.com/c"))
+
+    assert len(calls) == 2
+    assert result["cache"] == "miss"
+    assert not (tmp_path / "web").exists() or not any((tmp_path / "web").iterdir())
+
+
+def test_eviction_drops_least_recently_used(tmp_path) -> None:
+    cache = WebCache(tmp_path, max_bytes=64 * 1024)
+    headers = {"cache-control": "max-age=300"}
+    old = cache.store("https://example.com/old", "https://example.com/old", 200, headers, b"a" * 6000)
+    time.sleep(0.01)
+    for i in range(12):
+        cache.store(f"https://example.com/{i}", f"https://example.com/{i}", 200, headers, b"b" * 6000)
+
+    total = sum(p.stat().st_size for p in tmp_path.iterdir())
+    assert total <= 64 * 1024
+    assert old is not None and cache.lookup("https://example.com/old") is None
+    assert cache.lookup("https://example.com/11") is not None